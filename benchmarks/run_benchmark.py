@@ -0,0 +1,296 @@
+"""
+Benchmark runner
+-----------------
+Generates a synthetic gold source and noisy input, runs the enhanced matcher and/or the
+legacy script against them, and writes throughput, latency, index build time, peak RSS and
+per-tier precision/recall to JSON so results can be compared between versions.
+
+Usage:
+    python -m benchmarks.run_benchmark --gold-rows 100000 --input-rows 10000 --output bench.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import REPO_ROOT, load_enhanced_module, load_legacy_module
+from benchmarks.synthetic import generate_gold_source, generate_noisy_input
+
+CONFIDENCE_TIERS = ('high', 'medium')
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def git_commit():
+    """Commit hash of the benchmarked tree, or None outside a git checkout."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def latency_summary(latencies):
+    """Per-record latency percentiles in milliseconds."""
+    if not len(latencies):
+        return {'p50_ms': None, 'p95_ms': None, 'p99_ms': None, 'mean_ms': None}
+    latencies_ms = np.asarray(latencies) * 1000
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    return {
+        'p50_ms': float(p50),
+        'p95_ms': float(p95),
+        'p99_ms': float(p99),
+        'mean_ms': float(latencies_ms.mean())
+    }
+
+
+def _names_match(first_names, last_names, input_df):
+    """Case-insensitive comparison of predicted names with the ground truth."""
+    def normalize(values):
+        return pd.Series(values, index=input_df.index).fillna('').astype(str).str.strip().str.lower()
+
+    return (
+        (normalize(first_names) == normalize(input_df['true_first_name']))
+        & (normalize(last_names) == normalize(input_df['true_last_name']))
+    )
+
+
+def tier_accuracy(input_df, confidences, first_names, last_names):
+    """
+    Precision and recall per confidence tier.
+
+    A prediction is correct when both corrected names equal the ground truth. Recall is
+    measured against matchable records (those with a company, since records without one
+    are never matched). Cumulative figures count every tier down to and including the
+    given one.
+
+    Parameters:
+    -----------
+    input_df : pandas.DataFrame
+        Noisy input with ground truth columns
+    confidences : array-like
+        Confidence tier assigned to each record
+    first_names : array-like
+        Corrected first names
+    last_names : array-like
+        Corrected last names
+
+    Returns:
+    --------
+    dict
+        Per-tier and cumulative counts, precision and recall
+    """
+    confidences = pd.Series(confidences, index=input_df.index).astype(str)
+    correct = _names_match(first_names, last_names, input_df)
+    matchable = int((input_df['Company'].fillna('').astype(str).str.strip() != '').sum())
+
+    def summarize(mask):
+        predicted = int(mask.sum())
+        true_positives = int((mask & correct).sum())
+        return {
+            'predicted': predicted,
+            'correct': true_positives,
+            'precision': true_positives / predicted if predicted else None,
+            'recall': true_positives / matchable if matchable else None
+        }
+
+    tiers = {}
+    cumulative = pd.Series(False, index=input_df.index)
+    for tier in CONFIDENCE_TIERS:
+        mask = confidences == tier
+        cumulative |= mask
+        tiers[tier] = summarize(mask)
+        tiers[tier]['cumulative'] = summarize(cumulative)
+
+    return {
+        'matchable_records': matchable,
+        'no_match': int((confidences == 'no_match').sum()),
+        'tiers': tiers
+    }
+
+
+def benchmark_enhanced(module, gold_df, input_df, args):
+    """Benchmark EnhancedNameMatcher: index build, per-record latency, batch throughput and accuracy."""
+    dist_list_df = gold_df.rename(columns={'Company': 'company'})
+
+    start = time.perf_counter()
+    matcher = module.EnhancedNameMatcher(dist_list_df)
+    index_build_time = time.perf_counter() - start
+    rss_after_build = peak_rss_mb()
+
+    rows = list(zip(
+        input_df['Attendee First Name'], input_df['Attendee Last Name'], input_df['Company']
+    ))
+    latency_rows = rows[:args.latency_sample] if args.latency_sample else rows
+    latencies = []
+    for first_name, last_name, company in latency_rows:
+        start = time.perf_counter()
+        matcher.match_name(first_name, last_name, company, args.threshold, args.medium_threshold)
+        latencies.append(time.perf_counter() - start)
+
+    # Profile the batch run only, on versions of the matcher that have a profiler
+    if getattr(matcher, 'profiler', None) is not None:
+        matcher.profiler = type(matcher.profiler)()
+    # Blocking diagnostics, on versions of the matcher that have them
+    diagnostics_class = getattr(module, 'BlockingDiagnostics', None)
+    if args.blocking_diagnostics and diagnostics_class is not None:
+        matcher.blocking_diagnostics = diagnostics_class()
+
+    df = pd.DataFrame({
+        'first_name': input_df['Attendee First Name'],
+        'last_name': input_df['Attendee Last Name'],
+        'company': input_df['Company']
+    })
+    start = time.perf_counter()
+    result_df = matcher.correct_names_df(
+        df, args.threshold, args.medium_threshold,
+        batch_size=args.batch_size, workers=args.workers, deduplicate=not args.no_deduplicate
+    )
+    processing_time = time.perf_counter() - start
+
+    return {
+        'index_build_seconds': index_build_time,
+        'processing_seconds': processing_time,
+        'rows_per_second': len(df) / processing_time if processing_time else None,
+        'latency': dict(latency_summary(latencies), records=len(latencies)),
+        'peak_rss_mb_after_index_build': rss_after_build,
+        'peak_rss_mb': peak_rss_mb(),
+        'run_stats': matcher.last_run_stats,
+        'profile': matcher.profiler.report() if getattr(matcher, 'profiler', None) is not None else None,
+        'blocking_diagnostics': (
+            matcher.blocking_diagnostics.report() if args.blocking_diagnostics and diagnostics_class is not None else None
+        ),
+        'accuracy': tier_accuracy(
+            input_df, result_df['match_confidence'],
+            result_df['corrected_first_name'], result_df['corrected_last_name']
+        )
+    }
+
+
+def benchmark_legacy(module, gold_df, input_df, args):
+    """
+    Benchmark name_correction.correct_names end to end through Parquet files.
+
+    The legacy script has no confidence tiers or per-record API, so every record whose
+    corrected names differ from the input counts as a 'corrected' prediction and latency
+    is the mean over the whole run.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        gold_path = os.path.join(tmp_dir, 'gold.parquet')
+        input_path = os.path.join(tmp_dir, 'input.parquet')
+        gold_df.to_parquet(gold_path, index=False)
+        input_df[['Attendee First Name', 'Attendee Last Name', 'Company']].to_parquet(input_path, index=False)
+
+        start = time.perf_counter()
+        output_path = module.correct_names(input_path, gold_path, os.path.join(tmp_dir, 'corrected.parquet'))
+        processing_time = time.perf_counter() - start
+        result_df = pd.read_parquet(output_path)
+
+    changed = (
+        (result_df['Corrected First Name'].fillna('') != result_df['Attendee First Name'].fillna(''))
+        | (result_df['Corrected Last Name'].fillna('') != result_df['Attendee Last Name'].fillna(''))
+    )
+    confidences = np.where(changed, 'high', 'no_match')
+    accuracy = tier_accuracy(
+        input_df, confidences, result_df['Corrected First Name'], result_df['Corrected Last Name']
+    )
+    accuracy['tiers'] = {'corrected': accuracy['tiers']['high']}
+    accuracy['unchanged'] = accuracy.pop('no_match')
+    accuracy['exact_after_correction'] = float(_names_match(
+        result_df['Corrected First Name'], result_df['Corrected Last Name'], input_df
+    ).mean()) if len(input_df) else None
+
+    mean_latency_ms = processing_time / len(input_df) * 1000 if len(input_df) else None
+    return {
+        'index_build_seconds': None,
+        'processing_seconds': processing_time,
+        'rows_per_second': len(input_df) / processing_time if processing_time else None,
+        'latency': {'p50_ms': None, 'p95_ms': None, 'p99_ms': None, 'mean_ms': mean_latency_ms},
+        'peak_rss_mb': peak_rss_mb(),
+        'accuracy': accuracy
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the name correction scripts on synthetic data")
+    parser.add_argument('--gold-rows', type=int, default=100000, help="Number of gold source records")
+    parser.add_argument('--input-rows', type=int, default=10000, help="Number of noisy input records")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed for data generation")
+    parser.add_argument('--target', choices=['enhanced', 'legacy', 'both'], default='enhanced',
+                        help="Which implementation to benchmark")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes for the enhanced matcher")
+    parser.add_argument('--batch-size', type=int, default=5000, help="Batch size for the enhanced matcher")
+    parser.add_argument('--no-deduplicate', action='store_true', help="Match every input row separately")
+    parser.add_argument('--threshold', type=float, default=0.95, help="High confidence threshold")
+    parser.add_argument('--medium-threshold', type=float, default=0.80, help="Medium confidence threshold")
+    parser.add_argument('--latency-sample', type=int, default=0,
+                        help="Records timed individually for latency percentiles (0 = all)")
+    parser.add_argument('--blocking-diagnostics', action='store_true',
+                        help="Record blocking tier and candidate set size histograms of the batch run")
+    parser.add_argument('--output', help="JSON file to write results to (printed to stdout if omitted)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    enhanced = load_enhanced_module()
+    # Silence per-batch logging and progress output during timing
+    enhanced.logger.setLevel(logging.WARNING)
+
+    start = time.perf_counter()
+    gold_df = generate_gold_source(args.gold_rows, enhanced.NICKNAME_MAP, enhanced.COMPANY_MAP, seed=args.seed)
+    input_df = generate_noisy_input(
+        gold_df, args.input_rows, enhanced.NICKNAME_MAP, enhanced.COMPANY_MAP, seed=args.seed + 1
+    )
+    generation_time = time.perf_counter() - start
+
+    report = {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': vars(args),
+        'data': {
+            'gold_rows': len(gold_df),
+            'input_rows': len(input_df),
+            'generation_seconds': generation_time,
+            'noise_counts': input_df['noise'].value_counts().to_dict()
+        },
+        'results': {}
+    }
+
+    if args.target in ('enhanced', 'both'):
+        report['results']['enhanced'] = benchmark_enhanced(enhanced, gold_df, input_df, args)
+    if args.target in ('legacy', 'both'):
+        report['results']['legacy'] = benchmark_legacy(load_legacy_module(), gold_df, input_df, args)
+
+    output = json.dumps(report, indent=2, default=str)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+        print(f"Benchmark results saved to {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Synthetic gold sources and noisy inputs with ground truth.
+
+Gold sources are built from canonical first names (the targets of NICKNAME_MAP plus common
+given names), generated surnames and canonical company names (the targets of COMPANY_MAP).
+Noisy inputs sample gold records and apply the kinds of errors seen in expense extracts:
+typos, first/last swaps, initials, nicknames, company aliases and missing companies.
+"""
+
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+# Given names added to the NICKNAME_MAP targets so that first names are not all nickname-able
+EXTRA_FIRST_NAMES = [
+    'aaron', 'adam', 'alan', 'amanda', 'amy', 'angela', 'anna', 'arthur', 'brandon', 'brenda',
+    'brian', 'bruce', 'carl', 'carol', 'carolyn', 'cheryl', 'christina', 'cynthia', 'dennis',
+    'diane', 'donna', 'dorothy', 'douglas', 'emily', 'emma', 'eric', 'evelyn', 'frank', 'gary',
+    'george', 'gloria', 'grace', 'heather', 'helen', 'henry', 'jacob', 'janet', 'jason', 'jean',
+    'jerry', 'jonathan', 'jose', 'joshua', 'joyce', 'judith', 'julie', 'justin', 'karen', 'keith',
+    'kevin', 'kyle', 'laura', 'linda', 'lisa', 'louis', 'marie', 'mark', 'martha', 'mary',
+    'melissa', 'michelle', 'olivia', 'paul', 'peter', 'philip', 'rachel', 'rebecca', 'roger',
+    'rose', 'russell', 'ruth', 'ryan', 'sandra', 'sara', 'scott', 'sean', 'sharon', 'shirley',
+    'sophia', 'stephanie', 'teresa', 'terry', 'tyler', 'virginia', 'wayne', 'zachary'
+]
+
+# Surname building blocks; combinations give tens of thousands of distinct surnames
+SURNAME_PREFIXES = [
+    'ab', 'al', 'an', 'ar', 'bak', 'bar', 'bel', 'ben', 'ber', 'bla', 'bra', 'bro', 'cal', 'car',
+    'cha', 'cla', 'col', 'cor', 'cra', 'dal', 'dav', 'del', 'dor', 'ed', 'el', 'fa', 'fer', 'fin',
+    'fos', 'gal', 'gar', 'gil', 'gor', 'gra', 'gre', 'hal', 'har', 'hen', 'her', 'hol', 'hug',
+    'jac', 'jen', 'joh', 'kel', 'ken', 'kim', 'kin', 'lam', 'lan', 'lar', 'law', 'lew', 'lin',
+    'mac', 'mar', 'mc', 'mil', 'mit', 'mor', 'nel', 'nor', 'ol', 'par', 'pat', 'pen', 'per',
+    'pet', 'ram', 'ras', 'ray', 'ric', 'rob', 'rod', 'ros', 'rus', 'sal', 'san', 'sch', 'sha',
+    'sim', 'sta', 'ste', 'sul', 'tay', 'tho', 'tor', 'tur', 'val', 'van', 'wal', 'war', 'wat',
+    'web', 'whi', 'wil', 'win', 'wri', 'yo', 'zim'
+]
+SURNAME_SUFFIXES = [
+    '', 'a', 'ard', 'berg', 'by', 'dell', 'den', 'der', 'dez', 'dle', 'er', 'ers', 'ett', 'ey',
+    'field', 'ford', 'gan', 'ger', 'ham', 'ing', 'ins', 'is', 'ison', 'kins', 'land', 'ley',
+    'lin', 'lo', 'low', 'man', 'mer', 'more', 'nes', 'ney', 'o', 'on', 'ows', 'per', 'ris',
+    'row', 'sen', 'ski', 'son', 'ston', 'ter', 'ton', 'tt', 'ver', 'well', 'wood', 'worth', 'y'
+]
+SURNAME_MIDDLES = ['', '', '', 'a', 'e', 'i', 'o', 'u', 'en', 'er', 'in', 'an', 'el', 'ol']
+
+NOISE_TYPES = (
+    'clean', 'first_typo', 'last_typo', 'swap', 'initial', 'nickname', 'company_alias', 'missing_company'
+)
+
+DEFAULT_NOISE_RATES = {
+    'clean': 0.30,
+    'first_typo': 0.12,
+    'last_typo': 0.12,
+    'swap': 0.08,
+    'initial': 0.10,
+    'nickname': 0.10,
+    'company_alias': 0.13,
+    'missing_company': 0.05
+}
+
+_LETTERS = np.array(list('abcdefghijklmnopqrstuvwxyz'))
+
+
+def generate_gold_source(n_rows, nickname_map, company_map, seed=0):
+    """
+    Generate a synthetic gold source.
+
+    Parameters:
+    -----------
+    n_rows : int
+        Number of reference records (10k to 5M are practical)
+    nickname_map : dict
+        NICKNAME_MAP of the script under test
+    company_map : dict
+        COMPANY_MAP of the script under test
+    seed : int, default=0
+        Random seed
+
+    Returns:
+    --------
+    pandas.DataFrame
+        'first_name', 'last_name' and 'Company' columns
+    """
+    rng = np.random.default_rng(seed)
+
+    first_names = np.array(sorted(set(nickname_map.values()) | set(EXTRA_FIRST_NAMES)), dtype=object)
+    companies = np.array(sorted(set(company_map.values())), dtype=object)
+
+    prefixes = np.array(SURNAME_PREFIXES, dtype=object)
+    middles = np.array(SURNAME_MIDDLES, dtype=object)
+    suffixes = np.array(SURNAME_SUFFIXES, dtype=object)
+    last_names = (
+        prefixes[rng.integers(len(prefixes), size=n_rows)]
+        + middles[rng.integers(len(middles), size=n_rows)]
+        + suffixes[rng.integers(len(suffixes), size=n_rows)]
+    )
+
+    gold_df = pd.DataFrame({
+        'first_name': [name.title() for name in first_names[rng.integers(len(first_names), size=n_rows)]],
+        'last_name': [name.title() for name in last_names],
+        # Skew company sizes like a real distribution list: a few very large firms
+        'Company': companies[np.minimum(rng.zipf(1.3, size=n_rows) - 1, len(companies) - 1)]
+    })
+    return gold_df
+
+
+def _typo(text, rng):
+    """Apply one random substitution, deletion, insertion or transposition."""
+    if len(text) < 3:
+        return text
+    pos = int(rng.integers(1, len(text)))
+    letter = str(rng.choice(_LETTERS))
+    operation = int(rng.integers(4))
+    if operation == 0:
+        return text[:pos] + letter + text[pos + 1:]
+    if operation == 1:
+        return text[:pos] + text[pos + 1:]
+    if operation == 2:
+        return text[:pos] + letter + text[pos:]
+    pos = min(pos, len(text) - 2)
+    return text[:pos] + text[pos + 1] + text[pos] + text[pos + 2:]
+
+
+def generate_noisy_input(gold_df, n_rows, nickname_map, company_map, noise_rates=None, seed=1):
+    """
+    Generate names to correct by sampling gold records and applying noise.
+
+    Parameters:
+    -----------
+    gold_df : pandas.DataFrame
+        Gold source from generate_gold_source
+    n_rows : int
+        Number of input records
+    nickname_map : dict
+        NICKNAME_MAP of the script under test
+    company_map : dict
+        COMPANY_MAP of the script under test
+    noise_rates : dict, default=None
+        Mapping of noise type to probability (DEFAULT_NOISE_RATES when None)
+    seed : int, default=1
+        Random seed
+
+    Returns:
+    --------
+    pandas.DataFrame
+        'Attendee First Name', 'Attendee Last Name' and 'Company' input columns, and ground
+        truth columns 'true_index', 'true_first_name', 'true_last_name', 'true_company' and 'noise'
+    """
+    rng = np.random.default_rng(seed)
+    noise_rates = dict(noise_rates or DEFAULT_NOISE_RATES)
+    noise_types = list(noise_rates)
+    probabilities = np.array([noise_rates[noise] for noise in noise_types], dtype=float)
+    probabilities /= probabilities.sum()
+
+    nicknames = defaultdict(list)
+    for nickname, name in nickname_map.items():
+        nicknames[name].append(nickname)
+    aliases = defaultdict(list)
+    for alias, company in company_map.items():
+        if alias != company:
+            aliases[company].append(alias)
+
+    true_index = rng.integers(len(gold_df), size=n_rows)
+    noise = np.array(noise_types, dtype=object)[rng.choice(len(noise_types), size=n_rows, p=probabilities)]
+
+    gold_first = gold_df['first_name'].to_numpy(dtype=object)
+    gold_last = gold_df['last_name'].to_numpy(dtype=object)
+    gold_company = gold_df['Company'].to_numpy(dtype=object)
+
+    rows = []
+    for idx, noise_type in zip(true_index.tolist(), noise.tolist()):
+        first_name, last_name, company = gold_first[idx], gold_last[idx], gold_company[idx]
+
+        if noise_type == 'first_typo':
+            first_name = _typo(first_name, rng)
+        elif noise_type == 'last_typo':
+            last_name = _typo(last_name, rng)
+        elif noise_type == 'swap':
+            first_name, last_name = last_name, first_name
+        elif noise_type == 'initial':
+            first_name = first_name[0] + ('.' if rng.random() < 0.5 else '')
+        elif noise_type == 'nickname' and nicknames.get(first_name.lower()):
+            options = nicknames[first_name.lower()]
+            first_name = options[int(rng.integers(len(options)))].title()
+        elif noise_type == 'company_alias' and aliases.get(company):
+            options = aliases[company]
+            company = options[int(rng.integers(len(options)))]
+        elif noise_type == 'missing_company':
+            company = ""
+
+        rows.append((first_name, last_name, company))
+
+    input_df = pd.DataFrame(rows, columns=['Attendee First Name', 'Attendee Last Name', 'Company'])
+    input_df['true_index'] = true_index
+    input_df['true_first_name'] = gold_first[true_index]
+    input_df['true_last_name'] = gold_last[true_index]
+    input_df['true_company'] = gold_company[true_index]
+    input_df['noise'] = noise
+    return input_df
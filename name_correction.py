@@ -3,6 +3,7 @@ import numpy as np
 from fuzzywuzzy import fuzz, process
 import re
 import os
+import time
 from datetime import datetime
 
 # Common nickname mappings
@@ -665,25 +666,70 @@ def clean_name(name):
     # Convert to lowercase and strip
     return name.lower().strip()
 
+def normalize_whitespace(text):
+    """Collapse runs of whitespace to single spaces and strip the ends."""
+    return " ".join(text.split())
+
+def compile_company_map(company_map):
+    """
+    Compile a company map into lookup dictionaries for standardize_company.
+    
+    Args:
+        company_map: Mapping of company name variants to standard names
+    
+    Returns:
+        Tuple of (exact, lowercased, lowercased and whitespace-normalized) dictionaries.
+        Where several keys collide after lowercasing or normalizing, the first key in the
+        map wins, as with a scan of the map in order.
+    """
+    exact = dict(company_map)
+    lowered = {}
+    normalized = {}
+    for key, value in company_map.items():
+        lowered.setdefault(key.lower(), value)
+        normalized.setdefault(normalize_whitespace(key.lower()), value)
+    return exact, lowered, normalized
+
+# Company map lookups, compiled once at import
+COMPANY_LOOKUPS = compile_company_map(COMPANY_MAP)
+
 def standardize_company(company):
     """Standardize company name using COMPANY_MAP."""
     if pd.isna(company) or company == "":
         return ""
     
     company_str = str(company).strip()
+    exact, lowered, normalized = COMPANY_LOOKUPS
     
     # Check if company exists in mapping (exact match)
-    if company_str in COMPANY_MAP:
-        return COMPANY_MAP[company_str]
+    if company_str in exact:
+        return exact[company_str]
     
     # Try case-insensitive match
     company_lower = company_str.lower()
-    for key, value in COMPANY_MAP.items():
-        if key.lower() == company_lower:
-            return value
+    if company_lower in lowered:
+        return lowered[company_lower]
+    
+    # Try case-insensitive match ignoring repeated whitespace
+    company_normalized = normalize_whitespace(company_lower)
+    if company_normalized in normalized:
+        return normalized[company_normalized]
     
     return company_str
 
+def standardize_companies(companies):
+    """
+    Standardize a Series of company names, calling standardize_company once per distinct value.
+    
+    Args:
+        companies: Series of company names
+    
+    Returns:
+        Series of standardized company names with the same index
+    """
+    mapping = {company: standardize_company(company) for company in companies.dropna().unique()}
+    return companies.map(mapping).fillna("").astype(object)
+
 
 def standardize_first_name(first_name):
     """Standardize first name using NICKNAME_MAP."""
@@ -711,23 +757,115 @@ def find_best_match(name, reference_list, threshold=80):
         return matches[0][0]
     return None
 
+# Tabular file formats supported for input and output, by file extension
+FILE_FORMATS = {
+    '.xlsx': 'excel',
+    '.xlsm': 'excel',
+    '.xls': 'excel',
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.feather': 'feather'
+}
+
+def read_table(path, excel_engine=None):
+    """
+    Read an Excel, CSV, Parquet or Feather file, chosen by file extension.
+    
+    Args:
+        path: Path to the input file
+        excel_engine: pandas engine for Excel files ('calamine' or 'openpyxl'); None picks the fastest installed one
+    
+    Returns:
+        DataFrame with the file contents
+    """
+    file_format = FILE_FORMATS.get(os.path.splitext(path)[1].lower())
+    if file_format == 'csv':
+        return pd.read_csv(path)
+    if file_format == 'parquet':
+        return pd.read_parquet(path)
+    if file_format == 'feather':
+        return pd.read_feather(path)
+    
+    if excel_engine is None:
+        try:
+            import python_calamine  # noqa: F401
+            excel_engine = 'calamine'
+        except ImportError:
+            excel_engine = 'openpyxl'
+    return pd.read_excel(path, engine=excel_engine)
+
+def write_table(df, path):
+    """
+    Write a DataFrame to an Excel, CSV, Parquet or Feather file, chosen by file extension.
+    Excel files are written row by row with xlsxwriter's constant-memory mode,
+    or openpyxl's write-only mode when xlsxwriter is not installed.
+    
+    Args:
+        df: DataFrame to write
+        path: Path to the output file
+    """
+    file_format = FILE_FORMATS.get(os.path.splitext(path)[1].lower())
+    if file_format == 'csv':
+        df.to_csv(path, index=False)
+        return
+    if file_format == 'parquet':
+        df.to_parquet(path, index=False)
+        return
+    if file_format == 'feather':
+        df.reset_index(drop=True).to_feather(path)
+        return
+    
+    header = [str(column) for column in df.columns]
+    rows = df.astype(object).where(df.notna(), None).to_numpy()
+    try:
+        import xlsxwriter
+    except ImportError:
+        import openpyxl
+        workbook = openpyxl.Workbook(write_only=True)
+        worksheet = workbook.create_sheet()
+        worksheet.append(header)
+        for row in rows:
+            worksheet.append(list(row))
+        workbook.save(path)
+        return
+    
+    workbook = xlsxwriter.Workbook(path, {
+        'constant_memory': True,
+        'strings_to_formulas': False,
+        'strings_to_urls': False,
+        'nan_inf_to_errors': True
+    })
+    worksheet = workbook.add_worksheet()
+    datetime_format = workbook.add_format({'num_format': 'yyyy-mm-dd hh:mm:ss'})
+    worksheet.write_row(0, 0, header)
+    for row_num, row in enumerate(rows, start=1):
+        for col_num, value in enumerate(row):
+            if isinstance(value, datetime):
+                worksheet.write_datetime(row_num, col_num, value, datetime_format)
+            elif value is not None:
+                worksheet.write(row_num, col_num, value)
+    workbook.close()
+
 def correct_names(input_file, gold_source_file, output_file=None):
     """
     Correct names in the input file based on the gold source file.
     
     Args:
-        input_file: Path to the input Excel file with names to correct
-        gold_source_file: Path to the gold source Excel file with correct names
-        output_file: Path to save the corrected file (if None, will generate one)
+        input_file: Path to the input file with names to correct (Excel, CSV, Parquet or Feather)
+        gold_source_file: Path to the gold source file with correct names (Excel, CSV, Parquet or Feather)
+        output_file: Path to save the corrected file (if None, will generate one).
+            A timestamp is added to the name; the format follows the extension, defaulting to Excel.
     
     Returns:
         Path to the output file
     """
+    io_start = time.time()
     print(f"Loading input file: {input_file}")
-    input_df = pd.read_excel(input_file)
+    input_df = read_table(input_file)
     
     print(f"Loading gold source file: {gold_source_file}")
-    gold_df = pd.read_excel(gold_source_file)
+    gold_df = read_table(gold_source_file)
+    read_time = time.time() - io_start
     
     # Create clean versions of the gold source names for matching
     gold_df['clean_first_name'] = gold_df['first_name'].apply(clean_name)
@@ -761,75 +899,49 @@ def correct_names(input_file, gold_source_file, output_file=None):
         'company': 0
     }
     
-    # Process each record
-    for idx, row in input_df.iterrows():
-        # Skip records with no company name
-        if pd.isna(row['Company']) or row['Company'] == "":
-            continue
-        
-        # Standardize company name using COMPANY_MAP
-        standardized_company = standardize_company(row['Company'])
-        input_df.at[idx, 'Corrected Company'] = standardized_company
-        if standardized_company != row['Company']:
-            corrections['company'] += 1
-        
-        # Standardize first name using NICKNAME_MAP
-        if not pd.isna(row['Attendee First Name']) and row['Attendee First Name'] != "":
-            standardized_first_name = standardize_first_name(row['Attendee First Name'])
-            input_df.at[idx, 'Corrected First Name'] = standardized_first_name
-            if standardized_first_name != row['Attendee First Name']:
-                corrections['first_name'] += 1
-        
-        # Create a subset of gold_df with matching last name and company
-        last_name_clean = row['clean_last_name']
-        company_clean = clean_name(standardized_company)
-        
-        if last_name_clean and company_clean:
-            # Find records with matching last name and company
-            matching_records = gold_df[
-                (gold_df['clean_last_name'] == last_name_clean) & 
-                (gold_df['clean_company'] == company_clean)
-            ]
-            
-            # If we found matching records, use them to correct first name
-            if not matching_records.empty:
-                # Get the first name from the first matching record
-                correct_first_name = matching_records.iloc[0]['first_name']
-                current_first_name = input_df.at[idx, 'Corrected First Name']
-                
-                # Check if first name is blank or needs correction
-                if pd.isna(current_first_name) or current_first_name == "":
-                    # If first name is blank, use the one from matching record
-                    input_df.at[idx, 'Corrected First Name'] = correct_first_name
-                    corrections['first_name'] += 1
-                else:
-                    # Check if first 4 letters match
-                    current_clean = clean_name(current_first_name)
-                    correct_clean = clean_name(correct_first_name)
-                    
-                    if len(current_clean) >= 4 and len(correct_clean) >= 4:
-                        if current_clean[:4] != correct_clean[:4]:
-                            # Check if first 3 letters match
-                            if len(current_clean) >= 3 and len(correct_clean) >= 3:
-                                if current_clean[:3] != correct_clean[:3]:
-                                    # No match, keep the standardized first name
-                                    pass
-                                else:
-                                    # First 3 letters match, use correct name
-                                    input_df.at[idx, 'Corrected First Name'] = correct_first_name
-                                    corrections['first_name'] += 1
-                            else:
-                                # Names too short for 3-letter comparison, keep standardized
-                                pass
-                        else:
-                            # First 4 letters match, use correct name
-                            input_df.at[idx, 'Corrected First Name'] = correct_first_name
-                            corrections['first_name'] += 1
-                    elif len(current_clean) >= 3 and len(correct_clean) >= 3:
-                        # Names too short for 4-letter comparison, check 3 letters
-                        if current_clean[:3] == correct_clean[:3]:
-                            input_df.at[idx, 'Corrected First Name'] = correct_first_name
-                            corrections['first_name'] += 1
+    # Standardize company names using COMPANY_MAP, once per distinct company
+    has_company = input_df['Company'].notna() & (input_df['Company'] != "")
+    standardized_companies = standardize_companies(input_df['Company'])
+    input_df.loc[has_company, 'Corrected Company'] = standardized_companies[has_company]
+    corrections['company'] = int((standardized_companies != input_df['Company'].astype(object))[has_company].sum())
+    
+    # Standardize first names using NICKNAME_MAP
+    first_names = input_df['Attendee First Name'].astype(object)
+    has_first_name = has_company & first_names.notna() & (first_names != "")
+    standardized_first_names = first_names[has_first_name].apply(standardize_first_name).astype(object)
+    input_df.loc[has_first_name, 'Corrected First Name'] = standardized_first_names
+    corrections['first_name'] += int((standardized_first_names != first_names[has_first_name]).sum())
+    
+    # Map each (clean last name, clean company) key to the first gold record carrying it
+    gold_keys = gold_df.loc[
+        (gold_df['clean_last_name'] != "") & (gold_df['clean_company'] != ""),
+        ['clean_last_name', 'clean_company', 'first_name']
+    ].drop_duplicates(['clean_last_name', 'clean_company'], keep='first')
+    
+    # Join records with a company, last name and standardized company to their gold record
+    input_keys = pd.DataFrame({
+        'clean_last_name': input_df['clean_last_name'],
+        'clean_company': standardized_companies.apply(clean_name)
+    })
+    input_keys = input_keys[has_company & (input_keys['clean_last_name'] != "") & (input_keys['clean_company'] != "")]
+    merged = input_keys.merge(gold_keys, on=['clean_last_name', 'clean_company'], how='left', indicator=True)
+    merged.index = input_keys.index
+    merged = merged[merged['_merge'] == 'both']
+    
+    # Use the gold first name if the current first name is blank, or if the names agree
+    # on their first 3 letters (names agreeing on 4 letters also agree on 3, and names
+    # shorter than 3 letters are never corrected)
+    current_first_names = input_df.loc[merged.index, 'Corrected First Name'].astype(object)
+    correct_first_names = merged['first_name'].astype(object)
+    current_clean = current_first_names.apply(clean_name).astype(object)
+    correct_clean = correct_first_names.apply(clean_name).astype(object)
+    prefixes_match = (
+        (current_clean.str.len() >= 3) & (correct_clean.str.len() >= 3)
+        & (current_clean.str[:3] == correct_clean.str[:3])
+    )
+    use_gold_first_name = current_first_names.isna() | (current_first_names == "") | prefixes_match
+    input_df.loc[use_gold_first_name[use_gold_first_name].index, 'Corrected First Name'] = correct_first_names[use_gold_first_name]
+    corrections['first_name'] += int(use_gold_first_name.sum())
     
     # Generate output filename if not provided
     if output_file is None:
@@ -837,12 +949,17 @@ def correct_names(input_file, gold_source_file, output_file=None):
         output_file = os.path.join(os.path.dirname(input_file), f"Corrected_Wholesaler_Data_{timestamp}.xlsx")
     else:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_file = os.path.join(os.path.dirname(input_file), f"{output_file}_{timestamp}.xlsx")
+        output_root, output_ext = os.path.splitext(output_file)
+        if output_ext.lower() not in FILE_FORMATS:
+            output_root, output_ext = output_file, '.xlsx'
+        output_file = os.path.join(os.path.dirname(input_file), f"{output_root}_{timestamp}{output_ext}")
     
     # Save the corrected data
     print(f"Saving corrected data to: {output_file}")
     result_df = input_df.drop(['clean_first_name', 'clean_last_name', 'clean_company'], axis=1)
-    result_df.to_excel(output_file, index=False)
+    io_start = time.time()
+    write_table(result_df, output_file)
+    write_time = time.time() - io_start
     
     # Print summary
     print("\nCorrection Summary:")
@@ -851,6 +968,7 @@ def correct_names(input_file, gold_source_file, output_file=None):
     print(f"Companies Corrected: {corrections['company']}")
     print(f"Total Records Processed: {len(input_df)}")
     print(f"Records Skipped (No Company): {len(input_df[input_df['Company'].isna() | (input_df['Company'] == '')])}")
+    print(f"I/O Time: read {read_time:.2f}s, write {write_time:.2f}s")
     
     return output_file
 
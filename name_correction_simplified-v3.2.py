@@ -29,13 +29,33 @@ Improvements:
 import pandas as pd
 import numpy as np
 import re
-from collections import defaultdict
+import sys
+import bisect
+import math
+from collections import defaultdict, OrderedDict, Counter
 import jellyfish
 from rapidfuzz import fuzz, process
+from rapidfuzz.distance import JaroWinkler, Levenshtein
 import time
+import datetime
 import pickle
+import hashlib
+import json
+import tempfile
+import glob
+import shutil
 import os
 import logging
+import multiprocessing
+import threading
+import contextlib
+import sqlite3
+import argparse
+import asyncio
+from http import HTTPStatus
+from urllib.parse import urlsplit
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
 from tqdm import tqdm
 
 # Set up logging
@@ -697,9 +717,158 @@ COMPANY_MAP = {
 'Woodbury Financial Services.':'Woodbury Financial'
 }
 
-# Cache for standardized names and companies
-name_standardization_cache = {}
-company_standardization_cache = {}
+# Version of the on-disk index format; bump whenever cached indices change shape or meaning
+INDEX_FORMAT_VERSION = 4
+
+# Separator joining the parts of exact match lookup keys
+LOOKUP_KEY_SEPARATOR = '\x1f'
+
+# Cascade scoring: candidates scored exactly before pruning by composite score bounds,
+# and slack allowing for floating point rounding in the exact scores
+PRUNING_SEED_SIZE = 16
+SCORE_BOUND_TOLERANCE = 1e-9
+
+# Number of evenly spaced records scored when no blocking key finds candidates
+FALLBACK_SAMPLE_SIZE = 500
+
+# Timing histograms of MatchProfiler: buckets per doubling of a duration in microseconds
+PROFILE_BUCKETS_PER_DOUBLING = 4
+
+# Blocking steps of EnhancedNameMatcher._get_candidate_indices, by the tier they assign
+BLOCKING_TIER_NAMES = {
+    0: 'last_name_initial_prefix',
+    1: 'first_last_two_chars',
+    2: 'first_last_soundex',
+    3: 'last_initial_first_soundex',
+    4: 'first_initial_last_soundex',
+    5: 'last_name_trigram',
+    6: 'last_initial',
+    7: 'first_initial',
+    8: 'initial_expansion',
+    9: 'company_words',
+    10: 'last_soundex_fallback',
+    11: 'first_soundex_fallback',
+    12: 'trigram_fallback',
+    13: 'sample_fallback'
+}
+
+# Version of the SQLite reference database schema
+SQLITE_SCHEMA_VERSION = 1
+
+# Building a SQLite reference database: distribution list records preprocessed at a time,
+# and KiB of SQLite page cache for grouping the staged postings
+SQLITE_BUILD_CHUNK_SIZE = 50000
+SQLITE_BUILD_CACHE_KB = 16384
+
+# Character n-gram retrieval: n-gram length, number of most similar distinct values
+# whose records become candidates, and minimum Jaccard similarity of their n-gram sets
+NGRAM_SIZE = 3
+NGRAM_CANDIDATE_VALUES = 20
+NGRAM_MIN_SIMILARITY = 0.2
+
+def file_content_hash(path):
+    """Compute the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def dataframe_content_hash(df):
+    """Compute a SHA-256 hex digest of the name and company values of a distribution list."""
+    digest = hashlib.sha256()
+    row_hashes = pd.util.hash_pandas_object(df[['first_name', 'last_name', 'company']], index=False)
+    digest.update(row_hashes.to_numpy().tobytes())
+    return digest.hexdigest()
+
+def index_cache_key(content_hash, column_mapping=None):
+    """
+    Build the cache key of a distribution list's indices.
+    
+    The key covers the distribution list contents, the column mapping, the company and
+    nickname maps used for standardization, and the index format version.
+    
+    Parameters:
+    -----------
+    content_hash : str
+        Hash of the distribution list contents
+    column_mapping : dict, default=None
+        Mapping of source columns to internal column names
+        
+    Returns:
+    --------
+    str
+        Hex digest identifying the cached indices
+    """
+    digest = hashlib.sha256()
+    for part in (
+        content_hash,
+        json.dumps(column_mapping or {}, sort_keys=True),
+        json.dumps(COMPANY_MAP, sort_keys=True),
+        json.dumps(NICKNAME_MAP, sort_keys=True),
+        str(INDEX_FORMAT_VERSION)
+    ):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def diff_distribution_lists(old_df, new_df):
+    """
+    Find the records added and deleted between two versions of a distribution list.
+    
+    Records are compared on their 'first_name', 'last_name' and 'company' values; repeated
+    records are paired up one to one, so a changed record shows up as one deletion and one
+    addition.
+    
+    Parameters:
+    -----------
+    old_df : pandas.DataFrame
+        The old version
+    new_df : pandas.DataFrame
+        The new version
+        
+    Returns:
+    --------
+    tuple
+        (added_df, deleted) where added_df holds the rows of new_df missing from old_df
+        and deleted lists the index labels of the rows of old_df missing from new_df
+    """
+    columns = ['first_name', 'last_name', 'company']
+    old_values = old_df[columns].astype(object)
+    new_values = new_df[columns].astype(object)
+    
+    # Pair records by a hash of their values; the pairs are verified below
+    row_hash = np.concatenate([
+        pd.util.hash_pandas_object(old_values, index=False).to_numpy(),
+        pd.util.hash_pandas_object(new_values, index=False).to_numpy()
+    ])
+    is_new = np.arange(len(row_hash)) >= len(old_df)
+    
+    # A stable sort groups equal hashes with old rows before new rows, each in row order;
+    # the k-th old and k-th new row of a group are paired
+    order = np.argsort(row_hash, kind='stable')
+    sorted_hash, sorted_new = row_hash[order], is_new[order]
+    group_start = np.ones(len(order), dtype=bool)
+    group_start[1:] = sorted_hash[1:] != sorted_hash[:-1]
+    group = np.cumsum(group_start) - 1
+    start = np.flatnonzero(group_start)
+    old_count = np.bincount(group, weights=~sorted_new).astype(np.int64)
+    new_count = np.bincount(group, weights=sorted_new).astype(np.int64)
+    occurrence = np.arange(len(order)) - start[group] - np.where(sorted_new, old_count[group], 0)
+    paired = occurrence < np.where(sorted_new, old_count[group], new_count[group])
+    
+    # Hash collisions pair different records; treat them as a deletion and an addition
+    pair_old = order[paired & ~sorted_new]
+    pair_new = order[paired & sorted_new] - len(old_df)
+    collided = np.zeros(len(pair_old), dtype=bool)
+    for column in columns:
+        old_column = old_values[column].to_numpy()[pair_old]
+        new_column = new_values[column].to_numpy()[pair_new]
+        collided |= ~((old_column == new_column) | (pd.isna(old_column) & pd.isna(new_column)))
+    
+    deleted = np.sort(np.concatenate([order[~paired & ~sorted_new], pair_old[collided]]))
+    added = np.sort(np.concatenate([order[~paired & sorted_new] - len(old_df), pair_new[collided]]))
+    return new_df.iloc[added], old_df.index[deleted].tolist()
 
 class EnhancedNameCorrectionSystem:
     """
@@ -719,13 +888,53 @@ class EnhancedNameCorrectionSystem:
             - batch_size: Size of batches for processing
             - threshold: Threshold for high confidence matches
             - medium_threshold: Threshold for medium confidence matches
+            - workers: Number of worker processes for matching
+            - deduplicate: Match each distinct input name and company only once
+            - streaming: Read input in chunks of batch_size records
+              and append each corrected chunk to the output file
+            - excel_read_engine: pandas engine for reading Excel files ('calamine' or 'openpyxl', None for fastest installed)
+            - excel_write_engine: Excel writer ('xlsxwriter' or 'openpyxl', None for fastest installed)
+            - max_cached_indices: Number of cached index sets kept in cache_dir
+            - standardization_cache_size: Number of standardized input names and companies
+              kept in each of the matcher's LRU caches
+            - candidate_budget: Maximum number of candidates scored per input name
+            - incremental_index_updates: Build the indices of a changed distribution list by
+              applying its differences to the most recently used cached indices
+            - max_incremental_change_fraction: Rebuild the indices from scratch instead when more
+              than this fraction of the records were added or deleted
+            - backend: 'memory' to hold the reference records and indices in memory, or 'sqlite'
+              to serve them from a SQLite database in cache_dir (incremental updates are memory only)
+            - hot_set_size: Number of records and posting lists the sqlite backend keeps in memory
+            - profiling: Time the matching stages and count match types, blocking tiers and
+              candidates during correct_names, and write them to a JSON report
+            - profile_report_path: Path of the JSON report; None writes it next to the output
+              file as <output name>.profile.json
+            - blocking_diagnostics: Add histograms of the blocking steps fired per fuzzy match,
+              the candidates they contribute and the tiers of best matches to the JSON report
+        
+        Input and output files may be Excel, CSV, Parquet, Feather or JSONL, chosen by file extension.
         """
         # Default configuration
         self.config = {
             'cache_dir': './name_correction_cache',
             'batch_size': 5000,
             'threshold': 0.95,  # Increased threshold for high confidence
-            'medium_threshold': 0.80  # Threshold for medium confidence
+            'medium_threshold': 0.80,  # Threshold for medium confidence
+            'workers': 1,  # Number of worker processes for matching
+            'deduplicate': True,  # Match repeated input rows only once
+            'streaming': False,  # Process input in chunks of batch_size records
+            'excel_read_engine': None,  # Fastest installed Excel reader
+            'excel_write_engine': None,  # Fastest installed Excel writer
+            'max_cached_indices': 5,  # Least recently used index sets beyond this are evicted
+            'standardization_cache_size': 100000,  # Entries per standardization cache
+            'candidate_budget': 1000,  # Best ranked candidates scored per input name
+            'incremental_index_updates': True,  # Apply distribution list changes to cached indices
+            'max_incremental_change_fraction': 0.2,  # Larger changes rebuild the indices
+            'backend': 'memory',  # Reference records and indices in memory or in SQLite
+            'hot_set_size': 100000,  # Records and posting lists cached by the sqlite backend
+            'profiling': True,  # Stage timers and counters, reported as JSON
+            'profile_report_path': None,  # Next to the output file by default
+            'blocking_diagnostics': False  # Blocking tier histograms in the profile report
         }
         
         # Update with provided configuration
@@ -738,6 +947,9 @@ class EnhancedNameCorrectionSystem:
         
         # Initialize matcher
         self.matcher = None
+        
+        # Time spent reading and writing files, in seconds
+        self.io_times = defaultdict(float)
     
     def preprocess_distribution_list(self, dist_list_path, first_name_col, last_name_col, company_col=None):
         """
@@ -746,7 +958,7 @@ class EnhancedNameCorrectionSystem:
         Parameters:
         -----------
         dist_list_path : str
-            Path to the distribution list Excel file
+            Path to the distribution list file (Excel, CSV, Parquet, Feather or JSONL)
         first_name_col : str
             Column name for first names in the distribution list
         last_name_col : str
@@ -762,8 +974,45 @@ class EnhancedNameCorrectionSystem:
         logger.info(f"Preprocessing distribution list: {dist_list_path}")
         
         try:
+            # Reuse cached indices if this exact distribution list was preprocessed before
+            cache_key = index_cache_key(
+                file_content_hash(dist_list_path),
+                {'first_name': first_name_col, 'last_name': last_name_col, 'company': company_col}
+            )
+            self.matcher = EnhancedNameMatcher.from_cache(
+                self.config['cache_dir'], cache_key, max_cache_entries=self.config['max_cached_indices'],
+                standardization_cache_size=self.config['standardization_cache_size'],
+                candidate_budget=self.config['candidate_budget'],
+                backend=self.config['backend'], hot_set_size=self.config['hot_set_size']
+            )
+            if self.matcher is not None:
+                logger.info("Distribution list preprocessing completed successfully (cached indices)")
+                return True
+            
+            # Build the SQLite reference database reading the distribution list one chunk at a time
+            if self.config['backend'] == 'sqlite':
+                self.matcher = EnhancedNameMatcher(
+                    None,
+                    cache_dir=self.config['cache_dir'],
+                    cache_key=cache_key,
+                    max_cache_entries=self.config['max_cached_indices'],
+                    standardization_cache_size=self.config['standardization_cache_size'],
+                    candidate_budget=self.config['candidate_budget'],
+                    backend='sqlite',
+                    hot_set_size=self.config['hot_set_size'],
+                    dist_list_chunks=self._distribution_list_chunks(
+                        dist_list_path, first_name_col, last_name_col, company_col
+                    )
+                )
+                logger.info(f"Distribution list read in {self.io_times['read_distribution_list']:.2f} seconds")
+                logger.info("Distribution list preprocessing completed successfully")
+                return True
+            
             # Load distribution list
-            dist_list_df = pd.read_excel(dist_list_path)
+            read_start = time.time()
+            dist_list_df = read_table(dist_list_path, excel_engine=self.config['excel_read_engine'])
+            self.io_times['read_distribution_list'] = time.time() - read_start
+            logger.info(f"Distribution list read in {self.io_times['read_distribution_list']:.2f} seconds")
             
             # Validate required columns
             required_cols = [first_name_col, last_name_col]
@@ -790,10 +1039,23 @@ class EnhancedNameCorrectionSystem:
             if not has_company:
                 dist_list_df['company'] = ""
             
+            # Apply only the changes since the most recently cached distribution list
+            if self.config['incremental_index_updates'] and self.config['backend'] == 'memory':
+                self.matcher = self._update_cached_matcher(dist_list_df, cache_key)
+                if self.matcher is not None:
+                    logger.info("Distribution list preprocessing completed successfully (updated cached indices)")
+                    return True
+            
             # Initialize matcher
             self.matcher = EnhancedNameMatcher(
                 dist_list_df,
-                cache_dir=self.config['cache_dir']
+                cache_dir=self.config['cache_dir'],
+                cache_key=cache_key,
+                max_cache_entries=self.config['max_cached_indices'],
+                standardization_cache_size=self.config['standardization_cache_size'],
+                candidate_budget=self.config['candidate_budget'],
+                backend=self.config['backend'],
+                hot_set_size=self.config['hot_set_size']
             )
             
             logger.info("Distribution list preprocessing completed successfully")
@@ -803,6 +1065,281 @@ class EnhancedNameCorrectionSystem:
             logger.error(f"Error preprocessing distribution list: {str(e)}")
             return False
     
+    def _distribution_list_chunks(self, dist_list_path, first_name_col, last_name_col, company_col=None):
+        """
+        Read a distribution list in chunks of SQLITE_BUILD_CHUNK_SIZE records, with its
+        columns renamed to the internal names. Reading time is added to io_times.
+        
+        Parameters:
+        -----------
+        dist_list_path : str
+            Path to the distribution list file (Excel, CSV, Parquet, Feather or JSONL)
+        first_name_col : str
+            Column name for first names in the distribution list
+        last_name_col : str
+            Column name for last names in the distribution list
+        company_col : str, default=None
+            Column name for company names in the distribution list
+            
+        Yields:
+        -------
+        pandas.DataFrame
+            The next chunk, with columns 'first_name', 'last_name', and 'company'
+        """
+        chunks = iter_input_chunks(dist_list_path, SQLITE_BUILD_CHUNK_SIZE)
+        while True:
+            read_start = time.time()
+            chunk = next(chunks, None)
+            self.io_times['read_distribution_list'] += time.time() - read_start
+            if chunk is None:
+                return
+            
+            for col in (first_name_col, last_name_col):
+                if col not in chunk.columns:
+                    raise ValueError(f"Required column '{col}' not found in distribution list")
+            
+            column_mapping = {first_name_col: 'first_name', last_name_col: 'last_name'}
+            has_company = company_col is not None and company_col in chunk.columns
+            if has_company:
+                column_mapping[company_col] = 'company'
+            chunk = chunk.rename(columns=column_mapping)
+            if not has_company:
+                chunk['company'] = ""
+            yield chunk
+    
+    def _update_cached_matcher(self, dist_list_df, cache_key):
+        """
+        Load the most recently used cached indices and apply the records added and deleted
+        since, saving the result under the new cache key.
+        
+        Parameters:
+        -----------
+        dist_list_df : pandas.DataFrame
+            The new distribution list with columns 'first_name', 'last_name', and 'company'
+        cache_key : str
+            Cache key of the new distribution list
+            
+        Returns:
+        --------
+        EnhancedNameMatcher
+            The updated matcher, or None if there are no cached indices or too many changes
+        """
+        base_cache_key = EnhancedNameMatcher.latest_cache_key(self.config['cache_dir'])
+        if base_cache_key is None:
+            return None
+        
+        try:
+            matcher = EnhancedNameMatcher.from_cache(
+                self.config['cache_dir'], base_cache_key, max_cache_entries=self.config['max_cached_indices'],
+                standardization_cache_size=self.config['standardization_cache_size'],
+                candidate_budget=self.config['candidate_budget']
+            )
+            if matcher is None:
+                return None
+            
+            changes = matcher.apply_distribution_list(
+                dist_list_df, cache_key=cache_key,
+                max_changed_fraction=self.config['max_incremental_change_fraction']
+            )
+        except Exception as e:
+            logger.warning(f"Could not update cached indices, rebuilding: {str(e)}")
+            return None
+        
+        if changes is None:
+            logger.info("Distribution list changed too much for an incremental update, rebuilding indices")
+            return None
+        
+        logger.info(
+            f"Updated cached indices: {changes['added']} records added, {changes['deleted']} deleted, "
+            f"{changes['unchanged']} unchanged"
+        )
+        return matcher
+    
+    def _prepare_input_df(self, input_df, first_name_col, last_name_col, company_col=None):
+        """
+        Validate an input DataFrame and rename its columns to the internal names.
+        
+        Parameters:
+        -----------
+        input_df : pandas.DataFrame
+            DataFrame with names to correct
+        first_name_col : str
+            Column name for first names in the input file
+        last_name_col : str
+            Column name for last names in the input file
+        company_col : str, default=None
+            Column name for company names in the input file
+        
+        Returns:
+        --------
+        tuple
+            (prepared DataFrame or None if a required column is missing, has_company)
+        """
+        # Validate required columns
+        required_cols = [first_name_col, last_name_col]
+        for col in required_cols:
+            if col not in input_df.columns:
+                logger.error(f"Required column '{col}' not found in input file")
+                return None, False
+        
+        # Check if company column exists
+        has_company = company_col is not None and company_col in input_df.columns
+        
+        # Rename columns to standard names for internal processing
+        column_mapping = {
+            first_name_col: 'first_name',
+            last_name_col: 'last_name'
+        }
+        
+        if has_company:
+            column_mapping[company_col] = 'company'
+        
+        input_df = input_df.rename(columns=column_mapping)
+        
+        # Add empty company column if not provided
+        if not has_company:
+            input_df['company'] = ""
+        
+        return input_df, has_company
+    
+    def _restore_column_names(self, result_df, first_name_col, last_name_col, company_col, has_company):
+        """
+        Rename result columns back to the input file's column names.
+        
+        Parameters:
+        -----------
+        result_df : pandas.DataFrame
+            DataFrame returned by EnhancedNameMatcher.correct_names_df
+        first_name_col : str
+            Column name for first names in the input file
+        last_name_col : str
+            Column name for last names in the input file
+        company_col : str
+            Column name for company names in the input file
+        has_company : bool
+            Whether the input file has a company column
+        
+        Returns:
+        --------
+        pandas.DataFrame
+            DataFrame with original column names
+        """
+        # Rename columns back to original names
+        result_df = result_df.rename(columns={
+            'first_name': first_name_col,
+            'last_name': last_name_col
+        })
+        
+        if has_company:
+            result_df = result_df.rename(columns={
+                'company': company_col,
+                'corrected_company': f"corrected_{company_col}"
+            })
+        else:
+            # Remove company-related columns if not needed
+            result_df = result_df.drop(columns=['company', 'corrected_company'], errors='ignore')
+        
+        return result_df
+    
+    def _log_summary(self, total_records, confidence_counts, processing_time, run_stats):
+        """
+        Log summary statistics of a correction run.
+        
+        Parameters:
+        -----------
+        total_records : int
+            Number of records processed
+        confidence_counts : pandas.Series
+            Number of records per match confidence
+        processing_time : float
+            Matching time in seconds
+        run_stats : dict
+            Deduplication statistics with 'matched_records' and 'distinct_match_keys',
+            and candidate pruning statistics with 'scored_candidates' and 'pruned_candidates'
+        
+        File read and write times are taken from self.io_times.
+        """
+        high_confidence = confidence_counts.get('high', 0)
+        medium_confidence = confidence_counts.get('medium', 0)
+        no_match = confidence_counts.get('no_match', 0)
+        dedup_ratio = (
+            1 - run_stats['distinct_match_keys'] / run_stats['matched_records'] if run_stats['matched_records'] else 0.0
+        )
+        
+        # Log summary
+        logger.info(f"Processing completed in {processing_time:.2f} seconds")
+        logger.info(f"Total records processed: {total_records}")
+        logger.info(f"High confidence matches: {high_confidence} ({high_confidence/total_records:.1%})")
+        logger.info(f"Medium confidence matches: {medium_confidence} ({medium_confidence/total_records:.1%})")
+        logger.info(f"No matches: {no_match} ({no_match/total_records:.1%})")
+        logger.info(
+            f"Distinct match keys: {run_stats['distinct_match_keys']} of {run_stats['matched_records']} "
+            f"rows with a company (dedup ratio {dedup_ratio:.1%})"
+        )
+        total_candidates = run_stats['scored_candidates'] + run_stats['pruned_candidates']
+        logger.info(
+            f"Candidates pruned by score bounds: {run_stats['pruned_candidates']} of {total_candidates}"
+            + (f" ({run_stats['pruned_candidates'] / total_candidates:.1%})" if total_candidates else "")
+        )
+        logger.info(
+            "I/O time: " + ", ".join(f"{step} {seconds:.2f}s" for step, seconds in self.io_times.items())
+        )
+        if self.matcher.profiler is not None:
+            logger.info(
+                "Stage time: " + ", ".join(
+                    f"{stage} {timer[1]:.2f}s" for stage, timer in self.matcher.profiler.stages.items()
+                )
+            )
+        for cache_name, stats in self.matcher.cache_stats().items():
+            logger.info(
+                f"{cache_name.capitalize()} standardization cache: {stats['hits']} hits, {stats['misses']} misses, "
+                f"{stats['evictions']} evictions ({stats['size']}/{stats['maxsize']} entries)"
+            )
+    
+    def _write_profile_report(self, input_path, output_path, total_records, confidence_counts, processing_time, run_stats):
+        """
+        Write the matcher's profiler and blocking diagnostics and the run's summary
+        statistics to a JSON report.
+        
+        Parameters:
+        -----------
+        input_path : str
+            Path of the input file
+        output_path : str
+            Path of the output file
+        total_records : int
+            Number of records processed
+        confidence_counts : pandas.Series
+            Number of records per match confidence
+        processing_time : float
+            Matching time in seconds
+        run_stats : dict
+            Deduplication and candidate pruning statistics, as passed to _log_summary
+        """
+        report_path = self.config['profile_report_path'] or f"{os.path.splitext(output_path)[0]}.profile.json"
+        report = {
+            'input_path': input_path,
+            'output_path': output_path,
+            'created': datetime.datetime.now().isoformat(),
+            'total_records': total_records,
+            'confidence_counts': {confidence: int(count) for confidence, count in confidence_counts.items()},
+            'processing_seconds': processing_time,
+            'ms_per_record': processing_time / total_records * 1000 if total_records else None,
+            'io_seconds': dict(self.io_times),
+            'run_stats': run_stats,
+            'cache_stats': self.matcher.cache_stats()
+        }
+        if self.matcher.profiler is not None:
+            report.update(self.matcher.profiler.report())
+        if self.matcher.blocking_diagnostics is not None:
+            report['blocking_diagnostics'] = self.matcher.blocking_diagnostics.report()
+        try:
+            with open(report_path, 'w') as f:
+                json.dump(report, f, indent=2, default=_json_default)
+            logger.info(f"Profile report saved to: {report_path}")
+        except OSError as e:
+            logger.warning(f"Could not write profile report {report_path}: {str(e)}")
+    
     def correct_names(self, input_path, output_path, first_name_col, last_name_col, company_col=None):
         """
         Correct names in the input file and save results to the output file.
@@ -810,9 +1347,9 @@ class EnhancedNameCorrectionSystem:
         Parameters:
         -----------
         input_path : str
-            Path to the input Excel file with names to correct
+            Path to the input file with names to correct (Excel, CSV, Parquet, Feather or JSONL)
         output_path : str
-            Path to save the output Excel file with corrected names
+            Path to save the output file with corrected names, in the format given by its extension
         first_name_col : str
             Column name for first names in the input file
         last_name_col : str
@@ -833,33 +1370,21 @@ class EnhancedNameCorrectionSystem:
                 logger.error("Matcher not initialized. Run preprocess_distribution_list first.")
                 return False
             
-            # Load input data
-            input_df = pd.read_excel(input_path)
-            
-            # Validate required columns
-            required_cols = [first_name_col, last_name_col]
-            for col in required_cols:
-                if col not in input_df.columns:
-                    logger.error(f"Required column '{col}' not found in input file")
-                    return False
-            
-            # Check if company column exists
-            has_company = company_col is not None and company_col in input_df.columns
-            
-            # Rename columns to standard names for internal processing
-            column_mapping = {
-                first_name_col: 'first_name',
-                last_name_col: 'last_name'
-            }
+            # Profile this run only
+            self.matcher.profiler = MatchProfiler() if self.config['profiling'] else None
+            self.matcher.blocking_diagnostics = BlockingDiagnostics() if self.config['blocking_diagnostics'] else None
             
-            if has_company:
-                column_mapping[company_col] = 'company'
+            if self.config['streaming']:
+                return self._correct_names_streaming(input_path, output_path, first_name_col, last_name_col, company_col)
             
-            input_df = input_df.rename(columns=column_mapping)
+            # Load input data
+            read_start = time.time()
+            input_df = read_table(input_path, excel_engine=self.config['excel_read_engine'])
+            self.io_times['read_input'] = time.time() - read_start
             
-            # Add empty company column if not provided
-            if not has_company:
-                input_df['company'] = ""
+            input_df, has_company = self._prepare_input_df(input_df, first_name_col, last_name_col, company_col)
+            if input_df is None:
+                return False
             
             # Correct names
             start_time = time.time()
@@ -867,324 +1392,3206 @@ class EnhancedNameCorrectionSystem:
                 input_df,
                 threshold=self.config['threshold'],
                 medium_threshold=self.config['medium_threshold'],
-                batch_size=self.config['batch_size']
+                batch_size=self.config['batch_size'],
+                workers=self.config['workers'],
+                deduplicate=self.config['deduplicate']
             )
             processing_time = time.time() - start_time
             
-            # Rename columns back to original names
-            result_df = result_df.rename(columns={
-                'first_name': first_name_col,
-                'last_name': last_name_col
-            })
+            result_df = self._restore_column_names(result_df, first_name_col, last_name_col, company_col, has_company)
             
-            if has_company:
-                result_df = result_df.rename(columns={
-                    'company': company_col,
-                    'corrected_company': f"corrected_{company_col}"
-                })
-            else:
-                # Remove company-related columns if not needed
-                result_df = result_df.drop(columns=['company', 'corrected_company'], errors='ignore')
+            # Save results
+            write_start = time.time()
+            write_table(result_df, output_path, excel_engine=self.config['excel_write_engine'])
+            self.io_times['write_output'] = time.time() - write_start
+            logger.info(f"Results saved to: {output_path}")
             
             # Generate summary statistics
-            total_records = len(result_df)
             confidence_counts = result_df['match_confidence'].value_counts()
-            high_confidence = confidence_counts.get('high', 0)
-            medium_confidence = confidence_counts.get('medium', 0)
-            no_match = confidence_counts.get('no_match', 0)
-            
-            # Log summary
-            logger.info(f"Processing completed in {processing_time:.2f} seconds")
-            logger.info(f"Total records processed: {total_records}")
-            logger.info(f"High confidence matches: {high_confidence} ({high_confidence/total_records:.1%})")
-            logger.info(f"Medium confidence matches: {medium_confidence} ({medium_confidence/total_records:.1%})")
-            logger.info(f"No matches: {no_match} ({no_match/total_records:.1%})")
-            
-            # Save results
-            result_df.to_excel(output_path, index=False)
-            logger.info(f"Results saved to: {output_path}")
+            self._log_summary(len(result_df), confidence_counts, processing_time, self.matcher.last_run_stats)
+            if self.matcher.profiler is not None or self.matcher.blocking_diagnostics is not None:
+                self._write_profile_report(
+                    input_path, output_path, len(result_df), confidence_counts, processing_time, self.matcher.last_run_stats
+                )
             
             return True
             
         except Exception as e:
             logger.error(f"Error correcting names: {str(e)}")
             return False
+    
+    def _correct_names_streaming(self, input_path, output_path, first_name_col, last_name_col, company_col=None):
+        """
+        Correct names chunk by chunk, appending each corrected chunk to the output file.
+        Memory use is bounded by the chunk size (the batch_size setting) rather than the input size.
+        
+        Parameters:
+        -----------
+        input_path : str
+            Path to the input file with names to correct
+        output_path : str
+            Path to the output file
+        first_name_col : str
+            Column name for first names in the input file
+        last_name_col : str
+            Column name for last names in the input file
+        company_col : str, default=None
+            Column name for company names in the input file
+        
+        Returns:
+        --------
+        bool
+            True if correction was successful
+        """
+        chunk_size = self.config['batch_size']
+        logger.info(f"Streaming input in chunks of {chunk_size} records")
+        
+        total_records = 0
+        confidence_counts = pd.Series(dtype='int64')
+        run_stats = {'matched_records': 0, 'distinct_match_keys': 0, 'scored_candidates': 0, 'pruned_candidates': 0}
+        processing_time = 0.0
+        
+        self.io_times['read_input'] = 0.0
+        self.io_times['write_output'] = 0.0
+        
+        # Name and match columns are text whatever the first chunk holds
+        string_columns = [
+            first_name_col, last_name_col, company_col, f"corrected_{company_col}",
+            'corrected_first_name', 'corrected_last_name', 'match_confidence'
+        ]
+        writer = ChunkedOutputWriter(
+            output_path, excel_engine=self.config['excel_write_engine'], string_columns=string_columns
+        )
+        chunks = iter_input_chunks(input_path, chunk_size)
+        # Start worker processes once for all chunks
+        with self.matcher.worker_pool(self.config['workers']):
+            try:
+                chunk_num = 0
+                while True:
+                    read_start = time.time()
+                    input_df = next(chunks, None)
+                    self.io_times['read_input'] += time.time() - read_start
+                    if input_df is None:
+                        break
+                    chunk_num += 1
+                
+                    input_df, has_company = self._prepare_input_df(input_df, first_name_col, last_name_col, company_col)
+                    if input_df is None:
+                        return False
+                
+                    logger.info(f"Processing chunk {chunk_num} ({len(input_df)} records)...")
+                    start_time = time.time()
+                    result_df = self.matcher.correct_names_df(
+                        input_df,
+                        threshold=self.config['threshold'],
+                        medium_threshold=self.config['medium_threshold'],
+                        batch_size=self.config['batch_size'],
+                        workers=self.config['workers'],
+                        deduplicate=self.config['deduplicate']
+                    )
+                    processing_time += time.time() - start_time
+                
+                    result_df = self._restore_column_names(result_df, first_name_col, last_name_col, company_col, has_company)
+                
+                    # Accumulate summary statistics
+                    total_records += len(result_df)
+                    confidence_counts = confidence_counts.add(result_df['match_confidence'].value_counts(), fill_value=0)
+                    for key in run_stats:
+                        run_stats[key] += self.matcher.last_run_stats[key]
+                
+                    write_start = time.time()
+                    writer.write(result_df)
+                    self.io_times['write_output'] += time.time() - write_start
+            finally:
+                chunks.close()
+                write_start = time.time()
+                writer.close()
+                self.io_times['write_output'] += time.time() - write_start
+        
+        if total_records == 0:
+            logger.warning(f"No records found in: {input_path}")
+            return True
+        
+        self._log_summary(total_records, confidence_counts.astype('int64'), processing_time, run_stats)
+        logger.info(f"Results saved to: {output_path}")
+        if self.matcher.profiler is not None or self.matcher.blocking_diagnostics is not None:
+            self._write_profile_report(
+                input_path, output_path, total_records, confidence_counts.astype('int64'), processing_time, run_stats
+            )
+        
+        return True
 
-class EnhancedNameMatcher:
+# Tabular file formats supported for input and output, by file extension
+FILE_FORMATS = {
+    '.xlsx': 'excel',
+    '.xlsm': 'excel',
+    '.xls': 'excel',
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.feather': 'feather',
+    '.arrow': 'feather',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl'
+}
+
+def _file_format(path):
+    """Get the tabular file format of a path from its extension."""
+    extension = os.path.splitext(str(path))[1].lower()
+    if extension not in FILE_FORMATS:
+        raise ValueError(
+            f"Unsupported file format: {path} (use one of {', '.join(sorted(FILE_FORMATS))})"
+        )
+    return FILE_FORMATS[extension]
+
+def _default_excel_read_engine():
+    """Use the calamine reader when python-calamine is installed, otherwise openpyxl."""
+    try:
+        import python_calamine  # noqa: F401
+        return 'calamine'
+    except ImportError:
+        return 'openpyxl'
+
+def _default_excel_write_engine():
+    """Use the xlsxwriter writer when it is installed, otherwise openpyxl."""
+    try:
+        import xlsxwriter  # noqa: F401
+        return 'xlsxwriter'
+    except ImportError:
+        return 'openpyxl'
+
+def read_table(path, excel_engine=None):
     """
-    An enhanced class to match and correct wholesaler agent names against a standard distribution list.
-    Incorporates company name mapping and improved name swap detection.
+    Read a whole Excel, CSV, Parquet, Feather or JSONL file, chosen by file extension.
+    
+    Parameters:
+    -----------
+    path : str
+        Path to the input file
+    excel_engine : str, default=None
+        pandas engine for Excel files ('calamine' or 'openpyxl'); None picks the fastest installed one
+        
+    Returns:
+    --------
+    pandas.DataFrame
+        The file contents
+    """
+    file_format = _file_format(path)
+    
+    if file_format == 'excel':
+        return pd.read_excel(path, engine=excel_engine or _default_excel_read_engine())
+    if file_format == 'csv':
+        return pd.read_csv(path)
+    if file_format == 'parquet':
+        return pd.read_parquet(path)
+    if file_format == 'feather':
+        return pd.read_feather(path)
+    return pd.read_json(path, lines=True)
+
+def write_table(df, path, excel_engine=None):
+    """
+    Write a DataFrame to an Excel, CSV, Parquet, Feather or JSONL file, chosen by file extension.
+    
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        DataFrame to write
+    path : str
+        Path to the output file
+    excel_engine : str, default=None
+        Excel writer ('xlsxwriter' or 'openpyxl'); None picks the fastest installed one
     """
+    writer = ChunkedOutputWriter(path, excel_engine=excel_engine)
+    try:
+        writer.write(df)
+    finally:
+        writer.close()
+
+def iter_input_chunks(path, chunk_size):
+    """
+    Read an Excel, CSV, Parquet, Feather or JSONL file in chunks of a fixed number of records.
+    Excel files are read with openpyxl's read-only streaming mode.
+    
+    Parameters:
+    -----------
+    path : str
+        Path to the input file
+    chunk_size : int
+        Number of records per chunk
+        
+    Yields:
+    -------
+    pandas.DataFrame
+        The next chunk of records
+    """
+    file_format = _file_format(path)
+    
+    if file_format == 'csv':
+        yield from pd.read_csv(path, chunksize=chunk_size)
+    elif file_format == 'jsonl':
+        yield from pd.read_json(path, lines=True, chunksize=chunk_size)
+    elif file_format == 'parquet':
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    elif file_format == 'feather':
+        import pyarrow as pa
+        # Read one record batch at a time, so that only the batches of the current chunk
+        # are decompressed, and re-slice them into chunks of chunk_size records
+        reader = pa.ipc.open_file(pa.memory_map(str(path)))
+        pending = []
+        pending_rows = 0
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            pending.append(batch)
+            pending_rows += batch.num_rows
+            while pending_rows >= chunk_size:
+                table = pa.Table.from_batches(pending, schema=reader.schema)
+                yield table.slice(0, chunk_size).to_pandas()
+                rest = table.slice(chunk_size)
+                pending = rest.to_batches()
+                pending_rows = rest.num_rows
+        if pending_rows:
+            yield pa.Table.from_batches(pending, schema=reader.schema).to_pandas()
+    else:
+        import openpyxl
+        workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            columns = [
+                name if name is not None else f"Unnamed: {i}"
+                for i, name in enumerate(header)
+            ]
+            chunk = []
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) == chunk_size:
+                    yield pd.DataFrame(chunk, columns=columns)
+                    chunk = []
+            if chunk:
+                yield pd.DataFrame(chunk, columns=columns)
+        finally:
+            workbook.close()
+
+class ChunkedOutputWriter:
+    """
+    Append DataFrame chunks to an Excel, CSV, Parquet, Feather or JSONL output file.
+    Excel output is written row by row in xlsxwriter's constant-memory mode or
+    openpyxl's write-only mode.
+    
+    Parquet and Feather files have one schema for all chunks. It is taken from the first
+    chunk, except that string_columns, and columns without any values in the first chunk,
+    are stored as strings, so that later chunks with text in them still fit the schema.
+    """
+    
+    def __init__(self, path, excel_engine=None, string_columns=()):
+        """
+        Initialize the writer. The output file is created on the first write.
+        
+        Parameters:
+        -----------
+        path : str
+            Path to the output file
+        excel_engine : str, default=None
+            Excel writer ('xlsxwriter' or 'openpyxl'); None picks the fastest installed one
+        string_columns : iterable, default=()
+            Columns stored as strings in Parquet and Feather output; names not in the
+            chunks are ignored
+        """
+        self.path = path
+        self.file_format = _file_format(path)
+        self.excel_engine = excel_engine or _default_excel_write_engine()
+        self.string_columns = set(string_columns)
+        self._started = False
+        self._arrow_writer = None
+        self._arrow_schema = None
+        self._workbook = None
+        self._worksheet = None
+        self._excel_rows = 0
+    
+    def write(self, df):
+        """
+        Append a chunk to the output file.
+        
+        Parameters:
+        -----------
+        df : pandas.DataFrame
+            Chunk to append
+        """
+        first_chunk = not self._started
+        self._started = True
+        
+        if self.file_format == 'csv':
+            df.to_csv(self.path, mode='w' if first_chunk else 'a', header=first_chunk, index=False)
+        elif self.file_format == 'jsonl':
+            with open(self.path, 'w' if first_chunk else 'a', encoding='utf-8') as f:
+                df.to_json(f, orient='records', lines=True, double_precision=15)
+        elif self.file_format in ('parquet', 'feather'):
+            import pyarrow as pa
+            table = self._arrow_table(df)
+            if self._arrow_writer is None:
+                if self.file_format == 'parquet':
+                    import pyarrow.parquet as pq
+                    self._arrow_writer = pq.ParquetWriter(self.path, self._arrow_schema)
+                else:
+                    self._arrow_writer = pa.ipc.new_file(str(self.path), self._arrow_schema)
+            self._arrow_writer.write_table(table)
+        else:
+            self._write_excel_rows(df, first_chunk)
+    
+    def _arrow_table(self, df):
+        """Convert a chunk to an Arrow table with the output schema, fixing the schema on the first chunk."""
+        import pyarrow as pa
+        if self._arrow_schema is None:
+            schema = pa.Schema.from_pandas(df, preserve_index=False)
+            self._arrow_schema = pa.schema([
+                field.with_type(pa.string())
+                if column in self.string_columns or pa.types.is_null(field.type) or df[column].isna().all()
+                else field
+                for column, field in zip(df.columns, schema)
+            ])
+        
+        df = df.copy()
+        for position, field in enumerate(self._arrow_schema):
+            if pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+                values = df.iloc[:, position].astype(object)
+                df.isetitem(position, values.where(values.notna(), None).map(
+                    lambda value: value if value is None or isinstance(value, str) else str(value)
+                ))
+        return pa.Table.from_pandas(df, schema=self._arrow_schema, preserve_index=False)
+    
+    def _write_excel_rows(self, df, first_chunk):
+        """Append the rows of a chunk to the Excel output, starting the workbook on the first chunk."""
+        if first_chunk:
+            if self.excel_engine == 'xlsxwriter':
+                import xlsxwriter
+                self._workbook = xlsxwriter.Workbook(self.path, {
+                    'constant_memory': True,
+                    'strings_to_formulas': False,
+                    'strings_to_urls': False,
+                    'nan_inf_to_errors': True
+                })
+                self._worksheet = self._workbook.add_worksheet()
+                self._datetime_format = self._workbook.add_format({'num_format': 'yyyy-mm-dd hh:mm:ss'})
+            else:
+                import openpyxl
+                self._workbook = openpyxl.Workbook(write_only=True)
+                self._worksheet = self._workbook.create_sheet()
+            self._append_excel_row([str(column) for column in df.columns])
+        
+        values = df.astype(object).where(df.notna(), None).to_numpy()
+        for row in values:
+            self._append_excel_row(row)
+    
+    def _append_excel_row(self, row):
+        """Append one row of values to the Excel worksheet."""
+        if self.excel_engine == 'xlsxwriter':
+            for col, value in enumerate(row):
+                if isinstance(value, datetime.datetime):
+                    self._worksheet.write_datetime(self._excel_rows, col, value, self._datetime_format)
+                elif value is not None:
+                    self._worksheet.write(self._excel_rows, col, value)
+        else:
+            self._worksheet.append(list(row))
+        self._excel_rows += 1
+    
+    def close(self):
+        """Finish the output file."""
+        if self._arrow_writer is not None:
+            self._arrow_writer.close()
+            self._arrow_writer = None
+        if self._workbook is not None:
+            if self.excel_engine == 'xlsxwriter':
+                self._workbook.close()
+            else:
+                self._workbook.save(self.path)
+            self._workbook = None
+
+class LRUCache:
+    """
+    A bounded, thread-safe mapping that evicts the least recently used entry when full.
+    Counts hits, misses and evictions.
+    """
+    
+    def __init__(self, maxsize=100000):
+        """
+        Initialize an empty cache.
+        
+        Parameters:
+        -----------
+        maxsize : int, default=100000
+            Maximum number of entries; 0 disables caching
+        """
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def get(self, key, default=None):
+        """Get the value of a key and mark it as recently used, or default if it is not cached."""
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def put(self, key, value):
+        """Cache a value, evicting least recently used entries beyond maxsize."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        """Remove all entries. Counters are kept."""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        """
+        Get the cache counters.
+        
+        Returns:
+        --------
+        dict
+            hits, misses, evictions, size and maxsize
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'maxsize': self.maxsize
+            }
+    
+    def __getstate__(self):
+        # Locks cannot be pickled; worker processes get a fresh one
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+class MatchProfiler:
+    """
+    Cumulative timers and counters of the stages of EnhancedNameMatcher.match_name and
+    correct_names_df.
+    
+    Each stage keeps its number of calls, total and maximum seconds, and a histogram of
+    call durations in logarithmic buckets, from which percentiles are estimated. Memory
+    use does not grow with the number of calls, and profilers of worker processes are
+    combined with merge.
+    """
+    
+    def __init__(self):
+        """Initialize an empty profiler."""
+        # Mapping of stage to [calls, seconds, max_seconds, histogram]
+        self.stages = {}
+        # Mapping of counter name to a Counter of keys
+        self.counters = defaultdict(Counter)
+    
+    def record(self, stage, seconds):
+        """
+        Add a timed call of a stage.
+        
+        Parameters:
+        -----------
+        stage : str
+            Name of the stage
+        seconds : float
+            Duration of the call
+        """
+        timer = self.stages.get(stage)
+        if timer is None:
+            timer = self.stages[stage] = [0, 0.0, 0.0, []]
+        timer[0] += 1
+        timer[1] += seconds
+        if seconds > timer[2]:
+            timer[2] = seconds
+        
+        microseconds = seconds * 1e6
+        bucket = int(math.log2(microseconds) * PROFILE_BUCKETS_PER_DOUBLING) + 1 if microseconds > 1 else 0
+        histogram = timer[3]
+        if bucket >= len(histogram):
+            histogram.extend([0] * (bucket + 1 - len(histogram)))
+        histogram[bucket] += 1
+    
+    def lap(self, stage, start):
+        """
+        Record a stage that started at a time.perf_counter() value and ended now.
+        
+        Returns:
+        --------
+        float
+            The current time.perf_counter() value, the start of the next stage
+        """
+        now = time.perf_counter()
+        self.record(stage, now - start)
+        return now
+    
+    def count(self, counter, key, n=1):
+        """Add n to the count of a key of a counter."""
+        self.counters[counter][key] += n
+    
+    def merge(self, other):
+        """
+        Add the timers and counters of another profiler to this one.
+        
+        Parameters:
+        -----------
+        other : MatchProfiler
+            Profiler to add, e.g. of a worker process
+        """
+        for stage, (calls, seconds, max_seconds, histogram) in other.stages.items():
+            timer = self.stages.get(stage)
+            if timer is None:
+                timer = self.stages[stage] = [0, 0.0, 0.0, []]
+            timer[0] += calls
+            timer[1] += seconds
+            timer[2] = max(timer[2], max_seconds)
+            if len(histogram) > len(timer[3]):
+                timer[3].extend([0] * (len(histogram) - len(timer[3])))
+            for bucket, bucket_count in enumerate(histogram):
+                timer[3][bucket] += bucket_count
+        for counter, counts in other.counters.items():
+            self.counters[counter].update(counts)
+    
+    @staticmethod
+    def _percentile_ms(histogram, calls, fraction):
+        """Estimate a percentile of call durations in milliseconds from a histogram."""
+        rank = fraction * calls
+        seen = 0
+        for bucket, bucket_count in enumerate(histogram):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                # Geometric middle of the bucket; bucket 0 holds calls of up to 1 microsecond
+                if bucket == 0:
+                    return 0.001
+                return 2 ** ((bucket - 0.5) / PROFILE_BUCKETS_PER_DOUBLING) / 1000
+        return None
+    
+    def report(self):
+        """
+        Get the timers and counters as JSON-serializable data.
+        
+        Returns:
+        --------
+        dict
+            'stages' with calls, total seconds, mean, estimated p50/p95/p99 and maximum
+            milliseconds per call of each stage, and 'counters' with the counts of each counter
+        """
+        stages = {}
+        for stage, (calls, seconds, max_seconds, histogram) in self.stages.items():
+            stages[stage] = {
+                'calls': calls,
+                'seconds': seconds,
+                'mean_ms': seconds / calls * 1000 if calls else None,
+                'p50_ms': self._percentile_ms(histogram, calls, 0.50),
+                'p95_ms': self._percentile_ms(histogram, calls, 0.95),
+                'p99_ms': self._percentile_ms(histogram, calls, 0.99),
+                'max_ms': max_seconds * 1000
+            }
+        return {
+            'stages': stages,
+            'counters': {
+                counter: {
+                    str(key): count
+                    # Numeric keys such as blocking tiers in numeric order, then text keys
+                    for key, count in sorted(counts.items(), key=lambda item: (
+                        isinstance(item[0], str), 0 if isinstance(item[0], str) else item[0], str(item[0])
+                    ))
+                }
+                for counter, counts in self.counters.items()
+            }
+        }
+
+class BlockingDiagnostics:
+    """
+    Histograms of how the blocking steps of EnhancedNameMatcher._get_candidate_indices
+    behave over many queries.
+    
+    For each blocking tier it counts the queries where the step fired, histograms of the
+    candidates the step returned and of the new candidates it contributed, and how often
+    the final best match came from it. Over all queries it histograms the number of steps
+    fired and the candidate set size before and after the candidate_budget cap.
+    Candidate counts are bucketed by powers of two.
+    """
+    
+    def __init__(self):
+        """Initialize empty diagnostics."""
+        self.queries = 0
+        self.capped_queries = 0
+        self.steps_fired = Counter()
+        self.candidates = Counter()
+        self.scored_candidates = Counter()
+        self.best_match_confidence = Counter()
+        # Mapping of tier to Counters 'fired', 'returned', 'contributed', 'removed' and 'best_match'
+        self.tiers = defaultdict(lambda: defaultdict(Counter))
+    
+    def __getstate__(self):
+        # defaultdicts with lambda factories cannot be pickled
+        state = self.__dict__.copy()
+        state['tiers'] = {tier: dict(counters) for tier, counters in self.tiers.items()}
+        return state
+    
+    def __setstate__(self, state):
+        tiers = state.pop('tiers')
+        self.__dict__.update(state)
+        self.tiers = defaultdict(lambda: defaultdict(Counter))
+        for tier, counters in tiers.items():
+            self.tiers[tier].update(counters)
+    
+    @staticmethod
+    def new_trace():
+        """
+        Get an empty trace of one query's blocking steps, filled in by _get_candidate_indices.
+        
+        Returns:
+        --------
+        dict
+            'steps', a list of (tier, returned, contributed, removed) candidate counts, and
+            'tiers', the mapping of candidate index to tier before the candidate_budget cap
+        """
+        return {'steps': [], 'tiers': {}}
+    
+    @staticmethod
+    def bucket(count):
+        """Get the power-of-two histogram bucket of a count: '0', '1', '2-3', '4-7', ..."""
+        if count <= 1:
+            return str(count)
+        low = 1 << (count.bit_length() - 1)
+        return f"{low}-{2 * low - 1}"
+    
+    def record(self, trace, n_scored, best_idx, confidence):
+        """
+        Add the blocking trace of a query.
+        
+        Parameters:
+        -----------
+        trace : dict
+            Trace from new_trace, filled in by _get_candidate_indices
+        n_scored : int
+            Number of candidates left after the candidate_budget cap
+        best_idx : int
+            Record index of the final best match, or None if there is none
+        confidence : str
+            Confidence of the final match
+        """
+        self.queries += 1
+        candidate_tiers = trace['tiers']
+        n_candidates = len(candidate_tiers)
+        self.capped_queries += n_scored < n_candidates
+        self.candidates[self.bucket(n_candidates)] += 1
+        self.scored_candidates[self.bucket(n_scored)] += 1
+        self.steps_fired[len(trace['steps'])] += 1
+        self.best_match_confidence[confidence] += 1
+        
+        for tier, returned, contributed, removed in trace['steps']:
+            counters = self.tiers[tier]
+            counters['fired'][confidence] += 1
+            counters['returned'][self.bucket(returned)] += 1
+            counters['contributed'][self.bucket(contributed)] += 1
+            if removed:
+                counters['removed'][self.bucket(removed)] += 1
+        if best_idx is not None:
+            self.tiers[candidate_tiers[best_idx]]['best_match'][confidence] += 1
+    
+    def merge(self, other):
+        """
+        Add the histograms of other diagnostics to these.
+        
+        Parameters:
+        -----------
+        other : BlockingDiagnostics
+            Diagnostics to add, e.g. of a worker process
+        """
+        self.queries += other.queries
+        self.capped_queries += other.capped_queries
+        for name in ('steps_fired', 'candidates', 'scored_candidates', 'best_match_confidence'):
+            getattr(self, name).update(getattr(other, name))
+        for tier, counters in other.tiers.items():
+            for name, counts in counters.items():
+                self.tiers[tier][name].update(counts)
+    
+    @staticmethod
+    def _histogram(counts):
+        """Order a bucket histogram by bucket size."""
+        return {
+            str(bucket): counts[bucket]
+            for bucket in sorted(counts, key=lambda bucket: int(str(bucket).split('-')[0]))
+        }
+    
+    def report(self):
+        """
+        Get the histograms as JSON-serializable data.
+        
+        Returns:
+        --------
+        dict
+            Overall histograms, and per tier (by name) the queries where the step fired,
+            by final confidence, the histograms of returned, contributed and removed
+            candidates, and the best matches it produced, by confidence
+        """
+        tiers = {}
+        for tier in sorted(self.tiers):
+            counters = self.tiers[tier]
+            fired = sum(counters['fired'].values())
+            best_matches = sum(counters['best_match'].values())
+            tiers[BLOCKING_TIER_NAMES.get(tier, str(tier))] = {
+                'tier': tier,
+                'fired': fired,
+                'fired_by_confidence': dict(counters['fired']),
+                'returned_candidates': self._histogram(counters['returned']),
+                'contributed_candidates': self._histogram(counters['contributed']),
+                'removed_candidates': self._histogram(counters['removed']),
+                'best_matches': best_matches,
+                'best_matches_by_confidence': dict(counters['best_match']),
+                'best_match_rate': best_matches / fired if fired else None
+            }
+        return {
+            'queries': self.queries,
+            'capped_queries': self.capped_queries,
+            'steps_fired': self._histogram(self.steps_fired),
+            'candidates_before_cap': self._histogram(self.candidates),
+            'candidates_after_cap': self._histogram(self.scored_candidates),
+            'confidence': dict(self.best_match_confidence),
+            'tiers': tiers
+        }
+
+class CSRIndex:
+    """
+    A blocking index in CSR layout: a key table, int64 offsets and int32 postings.
+    The postings of the key in slot i are postings[offsets[i]:offsets[i + 1]].
+    Saved indices are opened with np.memmap, so loading is near-instant and the
+    OS page cache is shared between processes.
+    
+    The CSR arrays are never modified. Incremental updates go to a delta overlay holding
+    the full current postings of each changed key, including keys new to the index;
+    compacted merges the overlay back into fresh CSR arrays.
+    """
+    
+    def __init__(self, keys, offsets, postings):
+        """
+        Initialize the index from its CSR arrays.
+        
+        Parameters:
+        -----------
+        keys : list
+            Index keys, one per slot
+        offsets : numpy.ndarray
+            int64 array of len(keys) + 1 posting offsets
+        postings : numpy.ndarray
+            int32 array of record indices
+        """
+        self.keys = list(keys)
+        self.offsets = offsets
+        self.postings = postings
+        self._slots = {key: slot for slot, key in enumerate(self.keys)}
+        # Delta overlay: slot -> current postings of keys changed since the CSR arrays were built
+        self._overlay = {}
+    
+    @classmethod
+    def from_dict(cls, index):
+        """
+        Build an index from a mapping of keys to lists of record indices.
+        
+        Parameters:
+        -----------
+        index : dict
+            Mapping of keys to lists of record indices
+            
+        Returns:
+        --------
+        CSRIndex
+            The index, with keys and postings in the mapping's order
+        """
+        keys = list(index)
+        lengths = np.fromiter((len(index[key]) for key in keys), dtype=np.int64, count=len(keys))
+        offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        postings = np.fromiter(
+            (idx for key in keys for idx in index[key]), dtype=np.int32, count=int(offsets[-1])
+        )
+        return cls(keys, offsets, postings)
+    
+    @classmethod
+    def from_codes(cls, keys, codes, rows=None):
+        """
+        Build an index from integer key codes, as returned by pandas.factorize.
+        
+        Parameters:
+        -----------
+        keys : list
+            Index keys; code i refers to keys[i]
+        codes : numpy.ndarray
+            Key code of each posting; negative codes are not indexed
+        rows : numpy.ndarray, default=None
+            Record index of each posting. If None, posting i is record i.
+            
+        Returns:
+        --------
+        CSRIndex
+            The index, with each key's postings in ascending record order
+        """
+        codes = np.asarray(codes, dtype=np.int64)
+        rows = np.arange(len(codes), dtype=np.int64) if rows is None else np.asarray(rows, dtype=np.int64)
+        indexed = codes >= 0
+        codes, rows = codes[indexed], rows[indexed]
+        
+        order = np.lexsort((rows, codes))
+        offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes, minlength=len(keys)), out=offsets[1:])
+        return cls(keys, offsets, rows[order].astype(np.int32))
+    
+    def __len__(self):
+        return len(self.keys)
+    
+    def __contains__(self, key):
+        return key in self._slots
+    
+    def slot_of(self, key):
+        """Get the slot of a key, or None if the key is not indexed."""
+        return self._slots.get(key)
+    
+    def __getitem__(self, key):
+        """Get the postings of a key, or an empty array if the key is not indexed."""
+        slot = self._slots.get(key)
+        if slot is None:
+            return self.postings[:0]
+        return self.slot_postings(slot)
+    
+    def slot_postings(self, slot):
+        """Get the postings of the key in a slot."""
+        if self._overlay and slot in self._overlay:
+            return self._overlay[slot]
+        return self.postings[self.offsets[slot]:self.offsets[slot + 1]]
+    
+    def get(self, key, default=None):
+        """Get the postings of a key, or default if the key is not indexed."""
+        if key not in self._slots:
+            return default
+        return self[key]
+    
+    def items(self):
+        """Iterate over (key, postings) pairs in slot order."""
+        for slot, key in enumerate(self.keys):
+            yield key, self.slot_postings(slot)
+    
+    @property
+    def modified(self):
+        """Whether the index has changes in its delta overlay."""
+        return bool(self._overlay)
+    
+    def set_postings(self, key, postings):
+        """
+        Replace the postings of a key, adding the key if it is not indexed.
+        
+        Parameters:
+        -----------
+        key : hashable
+            The key
+        postings : array-like
+            The key's record indices, in ascending order
+        """
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = len(self.keys)
+            self.keys.append(key)
+            self._slots[key] = slot
+        self._overlay[slot] = np.asarray(postings, dtype=np.int32)
+    
+    def add_postings(self, key, indices):
+        """
+        Append record indices to the postings of a key.
+        
+        Parameters:
+        -----------
+        key : hashable
+            The key
+        indices : list
+            Record indices not already in the key's postings
+        """
+        current = self[key]
+        indices = np.sort(np.asarray(indices, dtype=np.int32))
+        postings = np.concatenate([current, indices])
+        if len(current) and len(indices) and indices[0] < current[-1]:
+            postings.sort()
+        self.set_postings(key, postings)
+    
+    def remove_postings(self, key, indices):
+        """
+        Remove record indices from the postings of a key.
+        
+        Parameters:
+        -----------
+        key : hashable
+            The key
+        indices : list
+            Record indices to remove
+        """
+        if key in self._slots:
+            postings = self[key]
+            self.set_postings(key, postings[~np.isin(postings, indices)])
+    
+    def compacted(self, remap=None):
+        """
+        Merge the delta overlay into new CSR arrays, dropping keys without postings.
+        
+        Parameters:
+        -----------
+        remap : numpy.ndarray, default=None
+            New record index of each old record index, negative for dropped records.
+            If None, record indices are kept.
+            
+        Returns:
+        --------
+        tuple
+            (CSRIndex, slot_remap) where slot_remap gives the new slot of each old slot,
+            -1 for dropped keys
+        """
+        n_slots = len(self.keys)
+        n_base = len(self.offsets) - 1
+        codes = np.repeat(np.arange(n_base, dtype=np.int64), np.diff(np.asarray(self.offsets)))
+        rows = np.asarray(self.postings, dtype=np.int64)
+        if self._overlay:
+            overlaid = np.array(sorted(self._overlay), dtype=np.int64)
+            keep = ~np.isin(codes, overlaid)
+            overlay_postings = [self._overlay[slot] for slot in overlaid.tolist()]
+            codes = np.concatenate([codes[keep], np.repeat(overlaid, [len(p) for p in overlay_postings])])
+            rows = np.concatenate([rows[keep]] + [np.asarray(p, dtype=np.int64) for p in overlay_postings])
+        if remap is not None:
+            rows = np.asarray(remap, dtype=np.int64)[rows]
+            codes = np.where(rows >= 0, codes, -1)
+        
+        indexed = codes >= 0
+        codes, rows = codes[indexed], rows[indexed]
+        counts = np.bincount(codes, minlength=n_slots)
+        used = counts > 0
+        slot_remap = np.where(used, np.cumsum(used) - 1, -1)
+        keys = [key for key, is_used in zip(self.keys, used.tolist()) if is_used]
+        
+        # Each slot's postings come from one ascending source and are mostly in slot
+        # order already, so a stable sort by slot is close to linear
+        order = np.argsort(codes, kind='stable')
+        offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum(counts[used], out=offsets[1:])
+        return CSRIndex(keys, offsets, rows[order].astype(np.int32)), slot_remap
+    
+    def save(self, directory, name):
+        """
+        Save the offsets and postings arrays as .npy files.
+        
+        Parameters:
+        -----------
+        directory : str
+            Directory to write to
+        name : str
+            Name of the index, used as the file name prefix
+            
+        Returns:
+        --------
+        list
+            The key table, to be stored with the index metadata
+        """
+        if self._overlay:
+            return self.compacted()[0].save(directory, name)
+        np.save(os.path.join(directory, f"{name}.offsets.npy"), self.offsets)
+        np.save(os.path.join(directory, f"{name}.postings.npy"), self.postings)
+        return self.keys
+    
+    @classmethod
+    def load(cls, directory, name, keys):
+        """
+        Open a saved index with memory-mapped offsets and postings.
+        
+        Parameters:
+        -----------
+        directory : str
+            Directory the index was saved to
+        name : str
+            Name of the index
+        keys : list
+            The key table returned by save
+            
+        Returns:
+        --------
+        CSRIndex
+            The memory-mapped index
+        """
+        offsets = np.load(os.path.join(directory, f"{name}.offsets.npy"), mmap_mode='r')
+        postings = np.load(os.path.join(directory, f"{name}.postings.npy"), mmap_mode='r')
+        return cls(keys, offsets, postings)
+
+class NgramIndex:
+    """
+    A character n-gram inverted index over the distinct values of a reference column.
+    Finds the values sharing the most n-grams with a query string, so that values a typo
+    away are retrieved even when their prefixes or phonetic keys differ.
+    
+    Two CSR indices back it: n-gram to the distinct values containing it, and distinct
+    value to the records carrying it.
+    """
+    
+    def __init__(self, grams, values, gram_counts):
+        """
+        Initialize the index from its CSR parts.
+        
+        Parameters:
+        -----------
+        grams : CSRIndex
+            Mapping of n-gram to the slots of the distinct values containing it
+        values : CSRIndex
+            Mapping of distinct value to its records
+        gram_counts : numpy.ndarray
+            int32 number of distinct n-grams of each distinct value
+        """
+        self.grams = grams
+        self.values = values
+        self.gram_counts = gram_counts
+    
+    @staticmethod
+    def ngrams(value):
+        """
+        Get the distinct character n-grams of a value, padded with a space on each side
+        so that the first and last characters carry their own n-grams.
+        
+        Parameters:
+        -----------
+        value : str
+            The value
+            
+        Returns:
+        --------
+        set
+            The value's n-grams, empty for an empty value
+        """
+        if not value:
+            return set()
+        padded = f" {value} "
+        return {padded[i:i + NGRAM_SIZE] for i in range(max(len(padded) - NGRAM_SIZE + 1, 1))}
+    
+    @classmethod
+    def from_values(cls, values):
+        """
+        Build an index over a column of values.
+        
+        Parameters:
+        -----------
+        values : pandas.Series
+            Value of each record; empty and missing values are not indexed
+            
+        Returns:
+        --------
+        NgramIndex
+            The index
+        """
+        value_codes, uniques = pd.factorize(values.where(values != ""))
+        
+        gram_codes = {}
+        posting_codes = []
+        posting_values = []
+        gram_counts = np.zeros(len(uniques), dtype=np.int32)
+        for value_code, value in enumerate(uniques):
+            grams = cls.ngrams(value)
+            gram_counts[value_code] = len(grams)
+            for gram in grams:
+                posting_codes.append(gram_codes.setdefault(gram, len(gram_codes)))
+                posting_values.append(value_code)
+        
+        grams = CSRIndex.from_codes(list(gram_codes), np.array(posting_codes, dtype=np.int64),
+                                    np.array(posting_values, dtype=np.int64))
+        return cls(grams, CSRIndex.from_codes(list(uniques), value_codes), gram_counts)
+    
+    def search(self, value, limit=NGRAM_CANDIDATE_VALUES, min_similarity=NGRAM_MIN_SIMILARITY):
+        """
+        Find the records whose values share the most n-grams with a query value.
+        
+        Parameters:
+        -----------
+        value : str
+            The query value
+        limit : int, default=NGRAM_CANDIDATE_VALUES
+            Number of most similar distinct values whose records are returned
+        min_similarity : float, default=NGRAM_MIN_SIMILARITY
+            Minimum Jaccard similarity of a value's n-grams with the query's
+            
+        Returns:
+        --------
+        numpy.ndarray
+            Record indices of the most similar values, most similar value first
+        """
+        query_grams = self.ngrams(value)
+        postings = [self.grams[gram] for gram in query_grams if gram in self.grams]
+        if not postings:
+            return np.empty(0, dtype=np.int32)
+        
+        # Count the query n-grams each distinct value shares
+        overlap = np.bincount(np.concatenate(postings))
+        slots = np.flatnonzero(overlap)
+        overlap = overlap[slots]
+        similarity = overlap / (len(query_grams) + self.gram_counts[slots] - overlap)
+        
+        keep = similarity >= min_similarity
+        slots, similarity = slots[keep], similarity[keep]
+        if len(slots) > limit:
+            top = np.argpartition(-similarity, limit - 1)[:limit]
+            slots, similarity = slots[top], similarity[top]
+        # Most similar first, ties in slot order
+        slots = slots[np.lexsort((slots, -similarity))]
+        
+        return np.concatenate(
+            [self.values.slot_postings(slot) for slot in slots.tolist()] or [np.empty(0, dtype=np.int32)]
+        )
+    
+    @property
+    def modified(self):
+        """Whether the index has changes in its delta overlays."""
+        return self.grams.modified or self.values.modified
+    
+    @staticmethod
+    def _group_rows(values, rows):
+        """Group record indices by non-empty value."""
+        grouped = defaultdict(list)
+        for value, row in zip(values, rows):
+            if isinstance(value, str) and value:
+                grouped[value].append(row)
+        return grouped
+    
+    def add_records(self, values, rows):
+        """
+        Index new records.
+        
+        Parameters:
+        -----------
+        values : iterable
+            Value of each record
+        rows : iterable
+            Record index of each record, greater than all indexed record indices
+        """
+        new_gram_counts = []
+        for value, value_rows in self._group_rows(values, rows).items():
+            slot = self.values.slot_of(value)
+            if slot is None or not len(self.values.slot_postings(slot)):
+                # The value is new, or all its records were removed along with its n-grams
+                if slot is None:
+                    slot = len(self.values)
+                    new_gram_counts.append(len(self.ngrams(value)))
+                for gram in self.ngrams(value):
+                    self.grams.add_postings(gram, [slot])
+            self.values.add_postings(value, value_rows)
+        
+        if new_gram_counts:
+            self.gram_counts = np.concatenate([self.gram_counts, np.array(new_gram_counts, dtype=np.int32)])
+    
+    def remove_records(self, values, rows):
+        """
+        Remove records from the index.
+        
+        Parameters:
+        -----------
+        values : iterable
+            Value of each record
+        rows : iterable
+            Record index of each record
+        """
+        for value, value_rows in self._group_rows(values, rows).items():
+            slot = self.values.slot_of(value)
+            if slot is None:
+                continue
+            self.values.remove_postings(value, value_rows)
+            # Stop retrieving values that no longer have records
+            if not len(self.values.slot_postings(slot)):
+                for gram in self.ngrams(value):
+                    self.grams.remove_postings(gram, [slot])
+    
+    def compacted(self, remap=None):
+        """
+        Merge the delta overlays into new CSR arrays, dropping values without records.
+        
+        Parameters:
+        -----------
+        remap : numpy.ndarray, default=None
+            New record index of each old record index, negative for dropped records
+            
+        Returns:
+        --------
+        NgramIndex
+            The compacted index
+        """
+        values, slot_remap = self.values.compacted(remap)
+        grams, _ = self.grams.compacted(slot_remap)
+        return NgramIndex(grams, values, np.asarray(self.gram_counts)[slot_remap >= 0])
+    
+    def save(self, directory, name):
+        """
+        Save the index's arrays as .npy files.
+        
+        Parameters:
+        -----------
+        directory : str
+            Directory to write to
+        name : str
+            Name of the index, used as the file name prefix
+            
+        Returns:
+        --------
+        dict
+            The key tables, to be stored with the index metadata
+        """
+        if self.modified:
+            return self.compacted().save(directory, name)
+        np.save(os.path.join(directory, f"{name}.gram_counts.npy"), self.gram_counts)
+        return {
+            'grams': self.grams.save(directory, f"{name}.grams"),
+            'values': self.values.save(directory, f"{name}.values")
+        }
+    
+    @classmethod
+    def load(cls, directory, name, keys):
+        """
+        Open a saved index with memory-mapped arrays.
+        
+        Parameters:
+        -----------
+        directory : str
+            Directory the index was saved to
+        name : str
+            Name of the index
+        keys : dict
+            The key tables returned by save
+            
+        Returns:
+        --------
+        NgramIndex
+            The memory-mapped index
+        """
+        return cls(
+            CSRIndex.load(directory, f"{name}.grams", keys['grams']),
+            CSRIndex.load(directory, f"{name}.values", keys['values']),
+            np.load(os.path.join(directory, f"{name}.gram_counts.npy"), mmap_mode='r')
+        )
+
+class ReferenceStore:
+    """
+    A columnar, array-backed copy of the preprocessed distribution list.
+    Gives O(1) positional access to reference records without building pandas objects.
+    """
+    
+    # Columns of the preprocessed distribution list held as contiguous arrays
+    COLUMNS = (
+        'first_name', 'last_name', 'company',
+        'first_name_std', 'last_name_std', 'company_std',
+        'first_name_soundex', 'last_name_soundex',
+        'first_name_initial', 'last_name_initial',
+        'first_name_two_chars', 'last_name_two_chars'
+    )
+    
+    def __init__(self, dist_list_df):
+        """
+        Build the store from a preprocessed distribution list.
+        
+        Parameters:
+        -----------
+        dist_list_df : pandas.DataFrame
+            Distribution list after EnhancedNameMatcher._preprocess_dist_list
+        """
+        for column in self.COLUMNS:
+            setattr(self, column, dist_list_df[column].to_numpy(dtype=object))
+        
+        # Lowercased original names, as compared by the exact match checks
+        self.first_name_lower = np.array([str(name).lower() for name in self.first_name], dtype=object)
+        self.last_name_lower = np.array([str(name).lower() for name in self.last_name], dtype=object)
+        
+        # Integer company IDs with one word set per distinct standardized company
+        company_id, company_values = pd.factorize(dist_list_df['company_std'])
+        self.company_id = company_id.astype(np.int32)
+        self.company_values = np.asarray(company_values, dtype=object)
+        self.company_word_sets = [set(company.split()) if company else set() for company in self.company_values]
+        self.company_ids = {company: company_id for company_id, company in enumerate(self.company_values)}
+    
+    def __len__(self):
+        return len(self.first_name)
+    
+    def append(self, records_df):
+        """
+        Append preprocessed records, giving new standardized companies new company IDs.
+        
+        Parameters:
+        -----------
+        records_df : pandas.DataFrame
+            Records after EnhancedNameMatcher._add_derived_columns
+        """
+        for column in self.COLUMNS:
+            setattr(self, column, np.concatenate([getattr(self, column), records_df[column].to_numpy(dtype=object)]))
+        
+        self.first_name_lower = np.concatenate([
+            self.first_name_lower, np.array([str(name).lower() for name in records_df['first_name']], dtype=object)
+        ])
+        self.last_name_lower = np.concatenate([
+            self.last_name_lower, np.array([str(name).lower() for name in records_df['last_name']], dtype=object)
+        ])
+        
+        company_id = []
+        new_companies = []
+        for company in records_df['company_std']:
+            if company not in self.company_ids:
+                self.company_ids[company] = len(self.company_ids)
+                new_companies.append(company)
+            company_id.append(self.company_ids[company])
+        self.company_id = np.concatenate([self.company_id, np.array(company_id, dtype=np.int32)])
+        self.company_values = np.concatenate([self.company_values, np.array(new_companies, dtype=object)])
+        self.company_word_sets.extend(set(company.split()) if company else set() for company in new_companies)
+    
+    def record(self, idx):
+        """
+        Get the original first name, last name and company of a reference record.
+        
+        Parameters:
+        -----------
+        idx : int
+            Positional index of the record
+            
+        Returns:
+        --------
+        tuple
+            (first_name, last_name, company)
+        """
+        return self.first_name[idx], self.last_name[idx], self.company[idx]
+
+class SQLiteDatabase:
+    """
+    A read-only SQLite reference database, opened lazily with one connection per
+    process and thread so that it can be shared with forked and threaded workers.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE meta (name TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE records (
+            record INTEGER PRIMARY KEY,
+            first_name, last_name, company,
+            first_name_std TEXT, last_name_std TEXT, company_std TEXT,
+            first_name_soundex TEXT, last_name_soundex TEXT,
+            first_name_initial TEXT, last_name_initial TEXT,
+            first_name_two_chars TEXT, last_name_two_chars TEXT,
+            first_name_lower TEXT, last_name_lower TEXT,
+            company_id INTEGER
+        );
+        CREATE TABLE companies (company_id INTEGER PRIMARY KEY, company_std TEXT);
+        CREATE TABLE posting_lists (
+            index_name TEXT, slot INTEGER, key TEXT, postings BLOB,
+            PRIMARY KEY (index_name, slot)
+        ) WITHOUT ROWID;
+        CREATE TABLE arrays (name TEXT PRIMARY KEY, data BLOB);
+    """
+    
+    # Indices created after the bulk load
+    INDICES = """
+        CREATE INDEX records_last_name ON records (last_name_lower, first_name_lower, record);
+        CREATE UNIQUE INDEX posting_lists_key ON posting_lists (index_name, key);
+    """
+    
+    def __init__(self, path):
+        """
+        Initialize the database.
+        
+        Parameters:
+        -----------
+        path : str
+            Path of the database file
+        """
+        self.path = path
+        self._local = threading.local()
+    
+    def __getstate__(self):
+        # Connections cannot be pickled; each process opens its own
+        return {'path': self.path}
+    
+    def __setstate__(self, state):
+        self.path = state['path']
+        self._local = threading.local()
+    
+    @property
+    def connection(self):
+        """The calling thread's connection, reopened after a fork."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+    
+    def execute(self, sql, parameters=()):
+        """Run a query on the calling thread's connection."""
+        return self.connection.execute(sql, parameters)
+    
+    def meta(self):
+        """Get the meta table as a dict."""
+        return dict(self.execute("SELECT name, value FROM meta").fetchall())
+    
+    def array(self, name, dtype):
+        """Get an array stored in the arrays table."""
+        data, = self.execute("SELECT data FROM arrays WHERE name = ?", (name,)).fetchone()
+        return np.frombuffer(data, dtype=dtype)
+
+class SQLiteDatabaseWriter:
+    """
+    Writes a SQLiteDatabase one chunk of records at a time. Records are inserted as they
+    come and each chunk's postings are staged in a temporary table, which SQLite groups
+    into posting lists on disk, so a build holds about one chunk and one posting list in
+    memory. The database replaces any existing file atomically when it is finished.
+    """
+    
+    def __init__(self, path):
+        """
+        Start writing a database.
+        
+        Parameters:
+        -----------
+        path : str
+            Path of the database file
+        """
+        self.path = path
+        self.temp_path = f"{path}.tmp-{os.getpid()}"
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+        self.connection = sqlite3.connect(self.temp_path)
+        # The file is discarded on failure, so it needs no journal; staging spills to temporary
+        # files through a bounded page cache
+        self.connection.execute("PRAGMA journal_mode = OFF")
+        self.connection.execute("PRAGMA synchronous = OFF")
+        self.connection.execute("PRAGMA temp_store = FILE")
+        self.connection.execute(f"PRAGMA cache_size = -{SQLITE_BUILD_CACHE_KB}")
+        self.connection.executescript(SQLiteDatabase.SCHEMA)
+        self.connection.execute(
+            "CREATE TEMP TABLE staged_postings (index_id INTEGER, key TEXT, first_record INTEGER, postings BLOB)"
+        )
+        self._index_ids = {}
+        self._staging_indexed = False
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.abort()
+    
+    def add_records(self, rows):
+        """Insert rows of the records table, in column order."""
+        self.connection.executemany(f"INSERT INTO records VALUES ({', '.join(['?'] * 16)})", rows)
+    
+    def stage_postings(self, index_name, keys, records):
+        """
+        Stage postings of an index, grouped by key into one row per key and call.
+        
+        Parameters:
+        -----------
+        index_name : str
+            Name of the index
+        keys : array-like
+            Key of each posting; missing keys are skipped
+        records : array-like
+            Record index of each posting, greater than those of earlier calls
+        """
+        index_id = self._index_ids.setdefault(index_name, len(self._index_ids))
+        codes, uniques = pd.factorize(np.asarray(keys, dtype=object))
+        index = CSRIndex.from_codes(list(uniques), codes, records)
+        offsets = index.offsets.tolist()
+        self.connection.executemany(
+            "INSERT INTO staged_postings VALUES (?, ?, ?, ?)",
+            ((index_id, key, int(index.postings[start]), index.postings[start:end].tobytes())
+             for key, start, end in zip(index.keys, offsets[:-1], offsets[1:]))
+        )
+    
+    def write_postings(self, index_name, last_only=False):
+        """
+        Join the staged postings of an index into its posting lists, with keys in slot
+        order of their first record and each key's records in ascending order, as built
+        by CSRIndex.from_codes.
+        
+        Parameters:
+        -----------
+        index_name : str
+            Name of the index
+        last_only : bool, default=False
+            Keep only the last record of each key
+        """
+        if not self._staging_indexed:
+            self.connection.execute(
+                "CREATE INDEX temp.staged_postings_key ON staged_postings (index_id, key, first_record)"
+            )
+            self._staging_indexed = True
+        
+        rows = self.connection.execute(
+            "SELECT key, postings FROM ("
+            "    SELECT key, first_record, postings, MIN(first_record) OVER (PARTITION BY key) AS key_first_record"
+            "    FROM staged_postings WHERE index_id = ?"
+            ") ORDER BY key_first_record, key, first_record", (self._index_ids.get(index_name, -1),)
+        )
+        
+        def posting_list(key, slot, parts):
+            postings = b''.join(parts)
+            return index_name, slot, key, postings[-4:] if last_only else postings
+        
+        def posting_lists():
+            slot, key, parts = 0, None, []
+            for row_key, postings in rows:
+                if row_key != key and parts:
+                    yield posting_list(key, slot, parts)
+                    slot, parts = slot + 1, []
+                key = row_key
+                parts.append(postings)
+            if parts:
+                yield posting_list(key, slot, parts)
+        
+        self.connection.executemany("INSERT INTO posting_lists VALUES (?, ?, ?, ?)", posting_lists())
+    
+    def keys(self, index_name):
+        """Iterate over the keys of a written index in slot order."""
+        for key, in self.connection.execute(
+            "SELECT key FROM posting_lists WHERE index_name = ? ORDER BY slot", (index_name,)
+        ):
+            yield key
+    
+    def finish(self, meta, companies, arrays):
+        """
+        Write the remaining tables and indices and move the database into place.
+        
+        Parameters:
+        -----------
+        meta : dict
+            Meta values, stored as text
+        companies : iterable
+            (company_id, company_std) rows
+        arrays : dict
+            Mapping of array name to numpy array
+        """
+        try:
+            self.connection.execute("DROP TABLE staged_postings")
+            self.connection.executemany(
+                "INSERT INTO meta VALUES (?, ?)", [(name, str(value)) for name, value in meta.items()]
+            )
+            self.connection.executemany("INSERT INTO companies VALUES (?, ?)", companies)
+            self.connection.executemany(
+                "INSERT INTO arrays VALUES (?, ?)",
+                [(name, np.ascontiguousarray(array).tobytes()) for name, array in arrays.items()]
+            )
+            self.connection.executescript(SQLiteDatabase.INDICES)
+            self.connection.commit()
+            self.connection.close()
+            os.replace(self.temp_path, self.path)
+        except BaseException:
+            self.abort()
+            raise
+    
+    def abort(self):
+        """Discard the partially written database."""
+        self.connection.close()
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+class SQLitePostingIndex:
+    """
+    A blocking index stored in the posting_lists table of a SQLiteDatabase, with the
+    read interface of CSRIndex. Each key's postings are one int32 BLOB, and recently
+    used posting lists are kept in a shared LRU cache.
+    """
+    
+    def __init__(self, database, name, cache):
+        """
+        Initialize the index.
+        
+        Parameters:
+        -----------
+        database : SQLiteDatabase
+            The reference database
+        name : str
+            Name of the index in posting_lists
+        cache : LRUCache
+            Hot set of posting lists, keyed by (index name, key)
+        """
+        self.database = database
+        self.name = name
+        self.cache = cache
+        self.modified = False
+    
+    def __len__(self):
+        return self.database.execute(
+            "SELECT COUNT(*) FROM posting_lists WHERE index_name = ?", (self.name,)
+        ).fetchone()[0]
+    
+    def _fetch(self, column, value):
+        """Get the postings of the row with a key or slot, or None if there is none."""
+        cache_key = (self.name, column, value)
+        postings = self.cache.get(cache_key)
+        if postings is None:
+            row = self.database.execute(
+                f"SELECT postings FROM posting_lists WHERE index_name = ? AND {column} = ?", (self.name, value)
+            ).fetchone()
+            postings = np.frombuffer(row[0], dtype=np.int32) if row is not None else False
+            self.cache.put(cache_key, postings)
+        return postings if postings is not False else None
+    
+    def __contains__(self, key):
+        return self._fetch('key', key) is not None
+    
+    def __getitem__(self, key):
+        """Get the postings of a key, or an empty array if the key is not indexed."""
+        postings = self._fetch('key', key)
+        return postings if postings is not None else np.empty(0, dtype=np.int32)
+    
+    def get(self, key, default=None):
+        """Get the postings of a key, or default if the key is not indexed."""
+        postings = self._fetch('key', key)
+        return postings if postings is not None else default
+    
+    def slot_postings(self, slot):
+        """Get the postings of the key in a slot."""
+        postings = self._fetch('slot', slot)
+        return postings if postings is not None else np.empty(0, dtype=np.int32)
+    
+    def items(self):
+        """Iterate over (key, postings) pairs in slot order."""
+        for key, postings in self.database.execute(
+            "SELECT key, postings FROM posting_lists WHERE index_name = ? ORDER BY slot", (self.name,)
+        ):
+            yield key, np.frombuffer(postings, dtype=np.int32)
+
+class SQLiteColumn:
+    """A column of a SQLiteReferenceStore, indexed by record index or array of record indices."""
+    
+    def __init__(self, store, position):
+        self.store = store
+        self.position = position
+    
+    def __getitem__(self, indices):
+        if np.ndim(indices) == 0:
+            return self.store.row(int(indices))[self.position]
+        return self.store.rows_block(indices)[self.position]
+
+class SQLiteReferenceStore:
+    """
+    A reference store kept in the records table of a SQLiteDatabase, with the interface
+    of ReferenceStore. Records are fetched by primary key for each block of candidates,
+    and recently used records are kept in an LRU hot set. The company dimension is small
+    and held in memory.
+    """
+    
+    # Columns of the records table after the record index, in table order
+    COLUMNS = ReferenceStore.COLUMNS + ('first_name_lower', 'last_name_lower', 'company_id')
+    
+    # Original value columns, whose missing values are stored as NULL
+    RAW_COLUMNS = ('first_name', 'last_name', 'company')
+    
+    def __init__(self, database, hot_set_size=100000):
+        """
+        Initialize the store.
+        
+        Parameters:
+        -----------
+        database : SQLiteDatabase
+            The reference database
+        hot_set_size : int, default=100000
+            Number of records kept in the LRU hot set
+        """
+        self.database = database
+        self.hot_set = LRUCache(hot_set_size)
+        self._n_records = int(database.meta()['record_count'])
+        self._last_block = None
+        
+        for position, column in enumerate(self.COLUMNS):
+            setattr(self, column, SQLiteColumn(self, position))
+        
+        companies = database.execute("SELECT company_std FROM companies ORDER BY company_id").fetchall()
+        self.company_values = np.array([company for company, in companies], dtype=object)
+        self.company_word_sets = [set(company.split()) if company else set() for company in self.company_values]
+        self.company_ids = {company: company_id for company_id, company in enumerate(self.company_values)}
+    
+    def __len__(self):
+        return self._n_records
+    
+    def _convert(self, row):
+        """Restore missing original values as NaN, as read into the in-memory store."""
+        return tuple(np.nan if value is None and column in self.RAW_COLUMNS else value
+                     for column, value in zip(self.COLUMNS, row))
+    
+    def _fetch_rows(self, indices):
+        """Get the rows of a list of record indices, reading hot set misses in one query."""
+        rows = {}
+        missing = []
+        for idx in set(indices):
+            row = self.hot_set.get(idx)
+            if row is None:
+                missing.append(idx)
+            else:
+                rows[idx] = row
+        
+        if missing:
+            for row in self.database.execute(
+                f"SELECT record, {', '.join(self.COLUMNS)} FROM records "
+                "WHERE record IN (SELECT value FROM json_each(?))", (json.dumps(missing),)
+            ):
+                idx, values = row[0], self._convert(row[1:])
+                rows[idx] = values
+                self.hot_set.put(idx, values)
+        return rows
+    
+    def row(self, idx):
+        """Get the row of one record, as a tuple in COLUMNS order."""
+        return self._fetch_rows([idx])[idx]
+    
+    def rows_block(self, indices):
+        """
+        Get the columns of a block of records as arrays. The last block is kept, since
+        scoring reads several columns of the same candidates.
+        
+        Parameters:
+        -----------
+        indices : array-like
+            Record indices
+            
+        Returns:
+        --------
+        list
+            One array per column in COLUMNS order
+        """
+        indices = np.asarray(indices)
+        last_block = self._last_block
+        if last_block is not None and np.array_equal(last_block[0], indices):
+            return last_block[1]
+        
+        rows = self._fetch_rows(indices.tolist())
+        ordered = [rows[idx] for idx in indices.tolist()]
+        block = [np.array([row[position] for row in ordered], dtype=object) for position in range(len(self.COLUMNS))]
+        block[-1] = block[-1].astype(np.int32)
+        self._last_block = (indices.copy(), block)
+        return block
+    
+    def record(self, idx):
+        """
+        Get the original first name, last name and company of a reference record.
+        
+        Parameters:
+        -----------
+        idx : int
+            Positional index of the record
+            
+        Returns:
+        --------
+        tuple
+            (first_name, last_name, company)
+        """
+        return self.row(int(idx))[:3]
+
+class SQLiteLastNameIndex:
+    """
+    The last_name_index of EnhancedNameMatcher served from the records table: maps a
+    lowercased last name to the sorted lowercased first names and record indices carrying it.
+    """
+    
+    def __init__(self, database, cache):
+        """
+        Initialize the index.
+        
+        Parameters:
+        -----------
+        database : SQLiteDatabase
+            The reference database
+        cache : LRUCache
+            Hot set of entries, keyed by ('last_name', last name)
+        """
+        self.database = database
+        self.cache = cache
+    
+    def get(self, last_name, default=None):
+        """Get the (first_names, indices) entry of a lowercased last name, or default."""
+        cache_key = ('last_name', last_name)
+        entry = self.cache.get(cache_key)
+        if entry is None:
+            rows = self.database.execute(
+                "SELECT first_name_lower, record FROM records WHERE last_name_lower = ? "
+                "ORDER BY first_name_lower, record", (last_name,)
+            ).fetchall()
+            entry = ([first_name for first_name, _ in rows], [idx for _, idx in rows]) if rows else False
+            self.cache.put(cache_key, entry)
+        return entry if entry is not False else default
+
+class NameQuery:
+    """
+    An input row prepared for matching: the raw values plus everything derived from them
+    that the exact match checks, candidate generation and scoring need, computed once.
+    """
+    
+    __slots__ = (
+        'first_name', 'last_name', 'company',
+        'first_lower', 'last_lower', 'first_name_is_initial',
+        'first_std', 'last_std', 'company_std', 'company_id', 'company_words',
+        'is_first_initial', 'is_last_initial',
+        'first_soundex', 'last_soundex',
+        'first_initial', 'last_initial',
+        'first_two_chars', 'last_two_chars'
+    )
+    
+    def __init__(self, first_name, last_name, company, first_std, last_std, company_std, company_id):
+        """
+        Initialize the query from raw and standardized input values.
+        
+        Parameters:
+        -----------
+        first_name : str
+            First name as given
+        last_name : str
+            Last name as given
+        company : str
+            Company name as given
+        first_std : str
+            Standardized first name
+        last_std : str
+            Standardized last name
+        company_std : str
+            Standardized company name
+        company_id : int
+            ReferenceStore company ID of company_std, or -1 if no reference record has it
+        """
+        self.first_name = first_name
+        self.last_name = last_name
+        self.company = company
+        
+        # Lowercased raw names, as compared by the exact match checks
+        self.first_lower = str(first_name).lower()
+        self.last_lower = str(last_name).lower()
+        self.first_name_is_initial = len(str(first_name).strip()) == 1
+        
+        self.first_std = first_std
+        self.last_std = last_std
+        self.company_std = company_std
+        self.company_id = company_id
+        self.company_words = set(company_std.split()) if company_std else set()
+        
+        # Check if first or last name is an initial
+        self.is_first_initial = len(first_std) == 1
+        self.is_last_initial = len(last_std) == 1
+        
+        # Get phonetic keys
+        try:
+            self.first_soundex = jellyfish.soundex(first_std) if first_std and not self.is_first_initial else ""
+            self.last_soundex = jellyfish.soundex(last_std) if last_std and not self.is_last_initial else ""
+        except:
+            self.first_soundex = ""
+            self.last_soundex = ""
+        
+        # Get name initials
+        self.first_initial = first_std[0:1] if first_std else ""
+        self.last_initial = last_std[0:1] if last_std else ""
+        
+        # Get first two characters (for more precise blocking)
+        self.first_two_chars = first_std[0:2] if len(first_std) >= 2 else ""
+        self.last_two_chars = last_std[0:2] if len(last_std) >= 2 else ""
+
+class EnhancedNameMatcher:
+    """
+    An enhanced class to match and correct wholesaler agent names against a standard distribution list.
+    Incorporates company name mapping and improved name swap detection.
+    """
+    
+    def __init__(self, dist_list_df, cache_dir=None, cache_key=None, max_cache_entries=5,
+                 standardization_cache_size=100000, candidate_budget=1000, backend='memory',
+                 sqlite_path=None, hot_set_size=100000, profile=True, blocking_diagnostics=False,
+                 dist_list_chunks=None):
+        """
+        Initialize the EnhancedNameMatcher with a standard distribution list.
+        
+        Parameters:
+        -----------
+        dist_list_df : pandas.DataFrame
+            DataFrame containing the standard distribution list with columns 'first_name', 'last_name', and 'company'.
+            May be None if indices for cache_key exist in cache_dir.
+        cache_dir : str, default=None
+            Directory to store cache files. If None, no caching is used.
+        cache_key : str, default=None
+            Key of the cached indices, from index_cache_key. If None, it is derived
+            from the contents of dist_list_df.
+        max_cache_entries : int, default=5
+            Number of cached index sets kept in cache_dir; least recently used ones are evicted
+        standardization_cache_size : int, default=100000
+            Number of standardized input names and companies kept in each of the
+            matcher's LRU caches
+        candidate_budget : int, default=1000
+            Maximum number of candidates scored per input name; the best ranked are kept
+        backend : str, default='memory'
+            'memory' to hold the reference records and indices in memory, or 'sqlite' to
+            serve them from an embedded SQLite database with a bounded in-memory hot set.
+            Both backends give the same results.
+        sqlite_path : str, default=None
+            Path of the SQLite database of the 'sqlite' backend. If None, it is kept in
+            cache_dir under the cache key. The database is built when it is missing or stale.
+        hot_set_size : int, default=100000
+            Number of reference records, and separately of posting lists, kept in memory
+            by the 'sqlite' backend
+        profile : bool, default=True
+            Time the stages of match_name and correct_names_df and count match types,
+            blocking tiers and candidates in self.profiler. When False, profiler is None
+            and matching only checks for it once per stage.
+        blocking_diagnostics : bool, default=False
+            Record which blocking steps fire for each fuzzy match, how many candidates
+            they contribute and which produced the best match, in self.blocking_diagnostics
+        dist_list_chunks : iterable, default=None
+            DataFrames holding the distribution list in order, read instead of dist_list_df
+            when the 'sqlite' backend builds its database. Needs a cache_key.
+        """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}, expected one of {', '.join(self.BACKENDS)}")
+        if backend == 'sqlite' and sqlite_path is None and not cache_dir:
+            raise ValueError("The sqlite backend needs a sqlite_path or a cache_dir")
+        if dist_list_chunks is not None and (backend != 'sqlite' or cache_key is None):
+            raise ValueError("dist_list_chunks needs the sqlite backend and a cache_key")
+        
+        self.candidate_budget = candidate_budget
+        self.backend = backend
+        self.hot_set_size = hot_set_size
+        
+        # Per-matcher caches of standardized input names and companies
+        self.name_cache = LRUCache(standardization_cache_size)
+        self.company_cache = LRUCache(standardization_cache_size)
+        
+        # Use a positional index so that record indices are also array positions
+        self.dist_list_df = dist_list_df.reset_index(drop=True) if dist_list_df is not None else None
+        self.cache_dir = cache_dir
+        self.max_cache_entries = max_cache_entries
+        
+        if cache_key is None and (cache_dir or backend == 'sqlite') and self.dist_list_df is not None:
+            cache_key = index_cache_key(dataframe_content_hash(self.dist_list_df))
+        self.cache_key = cache_key
+        
+        if backend == 'sqlite' and sqlite_path is None:
+            sqlite_path = self._sqlite_file_path(cache_dir, cache_key)
+        self.sqlite_path = sqlite_path
+        
+        # Create cache directory if specified
+        if self.cache_dir and not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+        
+        # Seconds spent building each index; empty when indices are loaded from cache
+        self.index_build_times = {}
+        
+        # Records deleted since the indices were built; their record indices are not reused
+        self.deleted_records = set()
+        
+        # Full cache entry that incremental updates are saved as a delta of:
+        # (cache key, record count, deleted records), or None when there is none
+        self._cache_base = None
+        
+        # Records added and deleted by a delta cache entry, replayed once the base entry is loaded
+        self._cached_delta = None
+        
+        if backend == 'sqlite':
+            # Serve records and indices from the SQLite database, building it first if needed
+            if not self._open_sqlite_database():
+                if dist_list_chunks is None and self.dist_list_df is None:
+                    # Build from the records of cached indices
+                    self._create_memory_backend()
+                    self.compact()
+                if dist_list_chunks is None:
+                    dist_list_chunks = (
+                        self.dist_list_df.iloc[start:start + SQLITE_BUILD_CHUNK_SIZE]
+                        for start in range(0, len(self.dist_list_df), SQLITE_BUILD_CHUNK_SIZE)
+                    )
+                self._write_sqlite_database(dist_list_chunks)
+                if not self._open_sqlite_database():
+                    raise ValueError(f"Could not open SQLite reference database {self.sqlite_path}")
+        else:
+            self._create_memory_backend()
+        
+        # Candidates scored exactly and pruned by score bounds in match_name
+        self.pruning_stats = {'scored': 0, 'pruned': 0}
+        
+        # Statistics of the most recent correct_names_df run
+        self.last_run_stats = None
+        
+        # Stage timers and counters, or None when profiling is disabled
+        self.profiler = MatchProfiler() if profile else None
+        
+        # Blocking step histograms, or None when blocking diagnostics are disabled
+        self.blocking_diagnostics = BlockingDiagnostics() if blocking_diagnostics else None
+        
+        # Process pool shared by parallel correct_names_df calls inside worker_pool
+        self._worker_pool = None
+    
+    def _create_memory_backend(self):
+        """Load or create the in-memory indices, reference store and last name index."""
+        # Load or create blocking indices and exact match lookups
+        self._load_or_create_indices()
+        
+        # Create columnar reference store for hot-path record access
+        self.reference_store = ReferenceStore(self.dist_list_df)
+        
+        # Create exact last name index for initial + last name lookups
+        self._create_last_name_index()
+        
+        # Replay the changes saved in a delta cache entry on top of its base entry
+        if self._cached_delta is not None:
+            added_df, deleted = self._cached_delta
+            self._cached_delta = None
+            self.add_records(added_df)
+            self.delete_records(deleted)
+    
+    @staticmethod
+    def _compute_standardized_name(name):
+        """Standardize a name without caching; see _standardize_name."""
+        if not isinstance(name, str) or name.strip() == "":
+            return ""
+        
+        # Convert to lowercase
+        result = name.lower()
+        
+        # Remove punctuation and extra spaces
+        result = re.sub(r'[^\w\s]', '', result)
+        result = re.sub(r'\s+', ' ', result).strip()
+        
+        # Handle common nicknames
+        if result in NICKNAME_MAP:
+            result = NICKNAME_MAP[result]
+        return result
+    
+    @staticmethod
+    def _compute_standardized_company(company):
+        """Standardize a company name without caching; see _standardize_company."""
+        if not isinstance(company, str) or company.strip() == "":
+            return ""
+        
+        # Convert to lowercase for matching purposes only
+        company_lower = company.lower().strip()
+        
+        # Apply company mapping if it exists in the map
+        if company_lower in COMPANY_MAP:
+            return COMPANY_MAP[company_lower]
+        
+        # If not in mapping, keep original
+        return company.strip()
+    
+    def _standardize_name(self, name):
+        """
+        Standardize a name by converting to lowercase, removing punctuation,
+        and handling common nicknames.
+        
+        Parameters:
+        -----------
+        name : str
+            The name to standardize
+            
+        Returns:
+        --------
+        str
+            Standardized name
+        """
+        # Missing and non-string values standardize to "" and are not cached
+        if not isinstance(name, str):
+            return ""
+        
+        # Check cache first
+        result = self.name_cache.get(name)
+        if result is None:
+            result = self._compute_standardized_name(name)
+            self.name_cache.put(name, result)
+        return result
+    
+    def _standardize_company(self, company):
+        """
+        Standardize a company name by applying only the company mapping dictionary.
+        No other changes are made to the company name.
+        
+        Parameters:
+        -----------
+        company : str
+            The company name to standardize
+                
+        Returns:
+        --------
+        str
+            Standardized company name
+        """
+        # Missing and non-string values standardize to "" and are not cached
+        if not isinstance(company, str):
+            return ""
+        
+        # Check cache first
+        result = self.company_cache.get(company)
+        if result is None:
+            result = self._compute_standardized_company(company)
+            self.company_cache.put(company, result)
+        return result
+    
+    def cache_stats(self):
+        """
+        Get the counters of the standardization caches.
+        
+        Returns:
+        --------
+        dict
+            LRUCache.stats of the 'name' and 'company' caches
+        """
+        return {'name': self.name_cache.stats(), 'company': self.company_cache.stats()}
+    
+    @staticmethod
+    def _lookup_key(left, right):
+        """Join two lowercased names or a name and a company into an exact match lookup key."""
+        return left + LOOKUP_KEY_SEPARATOR + right
+    
+    def _create_exact_match_lookups(self):
+        """
+        Create lookups for exact matches.
+        
+        Keys are interned strings joining the two key parts, built in one vectorized pass
+        over the distribution list; postings are int32 record indices in CSR layout.
+        exact_name_lookup keeps the last record of each (first name, last name) key;
+        the company lookups keep all records in order. Swapped names are looked up in
+        exact_name_lookup with the parts reversed.
+        """
+        logger.info("Creating exact match lookups...")
+        start_time = time.time()
+        
+        def lookup(keys, keep_last=False):
+            rows = np.flatnonzero(keys.notna().to_numpy())
+            codes, uniques = pd.factorize(keys.to_numpy(dtype=object)[rows])
+            index = CSRIndex.from_codes([sys.intern(key) for key in uniques], codes, rows)
+            if keep_last:
+                # Later records overwrite earlier ones, as in a dict built in row order
+                postings = index.postings[index.offsets[1:] - 1]
+                index = CSRIndex(index.keys, np.arange(len(postings) + 1, dtype=np.int64), postings)
+            return index
+        
+        lookup_keys = self._exact_lookup_keys(self.dist_list_df)
+        
+        # Lookup for exact first name + last name matches
+        self.exact_name_lookup = lookup(lookup_keys['exact_name_lookup'], keep_last=True)
+        
+        # Lookups for exact last name + company and first name + company matches
+        self.last_name_company_lookup = lookup(lookup_keys['last_name_company_lookup'])
+        self.first_name_company_lookup = lookup(lookup_keys['first_name_company_lookup'])
+        
+        self.index_build_times['exact_match_lookups'] = time.time() - start_time
+    
+    def _exact_lookup_keys(self, df):
+        """
+        Get the key of each record in the exact match lookups.
+        
+        Parameters:
+        -----------
+        df : pandas.DataFrame
+            Records after _add_derived_columns
+            
+        Returns:
+        --------
+        dict
+            Mapping of lookup name to a Series of keys, missing where a record is not indexed
+        """
+        # Lowercased names, empty for missing or non-string values
+        first_lower = self._map_unique(df['first_name'], lambda name: name.lower() if isinstance(name, str) else "")
+        last_lower = self._map_unique(df['last_name'], lambda name: name.lower() if isinstance(name, str) else "")
+        company_std = df['company_std'].astype(object)
+        has_first, has_last, has_company = first_lower != "", last_lower != "", company_std != ""
+        
+        return {
+            'exact_name_lookup': (first_lower + LOOKUP_KEY_SEPARATOR + last_lower).where(has_first & has_last),
+            'last_name_company_lookup': (last_lower + LOOKUP_KEY_SEPARATOR + company_std).where(has_last & has_company),
+            'first_name_company_lookup': (first_lower + LOOKUP_KEY_SEPARATOR + company_std).where(has_first & has_company)
+        }
+    
+    @classmethod
+    def from_cache(cls, cache_dir, cache_key, max_cache_entries=5, standardization_cache_size=100000,
+                   candidate_budget=1000, backend='memory', sqlite_path=None, hot_set_size=100000):
+        """
+        Create a matcher from cached indices without reading the distribution list.
+        
+        Parameters:
+        -----------
+        cache_dir : str
+            Directory with cached indices
+        cache_key : str
+            Key of the cached indices, from index_cache_key
+        max_cache_entries : int, default=5
+            Number of cached index sets kept in cache_dir
+        standardization_cache_size : int, default=100000
+            Number of standardized input names and companies kept in each LRU cache
+        candidate_budget : int, default=1000
+            Maximum number of candidates scored per input name
+        backend : str, default='memory'
+            'memory' or 'sqlite'; see __init__
+        sqlite_path : str, default=None
+            Path of the SQLite database of the 'sqlite' backend
+        hot_set_size : int, default=100000
+            Number of records and posting lists kept in memory by the 'sqlite' backend
+            
+        Returns:
+        --------
+        EnhancedNameMatcher or None
+            The matcher, or None if no usable cached indices exist for cache_key
+        """
+        if not cache_dir:
+            return None
+        if backend == 'sqlite' and sqlite_path is None:
+            sqlite_path = cls._sqlite_file_path(cache_dir, cache_key)
+        if not os.path.exists(cls._cache_file_path(cache_dir, cache_key)) and not (
+                backend == 'sqlite' and os.path.exists(sqlite_path)):
+            return None
+        try:
+            return cls(
+                None, cache_dir=cache_dir, cache_key=cache_key, max_cache_entries=max_cache_entries,
+                standardization_cache_size=standardization_cache_size, candidate_budget=candidate_budget,
+                backend=backend, sqlite_path=sqlite_path, hot_set_size=hot_set_size
+            )
+        except ValueError:
+            return None
+    
+    # Storage backends of the reference records and indices
+    BACKENDS = ('memory', 'sqlite')
+    
+    # Blocking indices saved in CSR layout in each cache entry
+    BLOCKING_INDEX_NAMES = (
+        'last_initial_index', 'first_initial_index',
+        'last_soundex_index', 'first_soundex_index',
+        'first_two_chars_index', 'last_two_chars_index',
+        'company_word_index'
+    )
+    
+    # Exact match lookups saved alongside the blocking indices
+    EXACT_LOOKUP_NAMES = (
+        'exact_name_lookup', 'last_name_company_lookup', 'first_name_company_lookup'
+    )
+    
+    # Character n-gram indices and the standardized columns they cover
+    NGRAM_INDEX_COLUMNS = {
+        'last_name_ngram_index': 'last_name_std',
+        'first_name_ngram_index': 'first_name_std',
+        'company_ngram_index': 'company_std'
+    }
+    NGRAM_INDEX_NAMES = tuple(NGRAM_INDEX_COLUMNS)
+    
+    # Incremental updates are cached as a delta of the last full cache entry while the
+    # records added and deleted since stay within this fraction of its records
+    MAX_CACHED_DELTA_FRACTION = 0.1
+    
+    @staticmethod
+    def _cache_file_path(cache_dir, cache_key):
+        """Get the path of the cache entry directory holding the indices for a cache key."""
+        return os.path.join(cache_dir, f"enhanced_name_matcher_indices-{cache_key[:32]}")
+    
+    def _load_or_create_indices(self):
+        """Load indices from cache or create them if not available."""
+        cache_file = None
+        if self.cache_dir and self.cache_key:
+            cache_file = self._cache_file_path(self.cache_dir, self.cache_key)
+        
+        if cache_file and self._load_cached_indices(cache_file):
+            return
+        
+        if self.dist_list_df is None:
+            raise ValueError(f"No cached indices found for cache key {self.cache_key}")
+        
+        # Create indices from scratch
+        logger.info("Creating indices...")
+        start_time = time.time()
+        
+        # Preprocess the distribution list
+        self._preprocess_dist_list()
+        
+        # Create blocking indices
+        self._create_blocking_indices()
+        
+        # Create exact match lookups
+        self._create_exact_match_lookups()
+        
+        # Save indices to cache if cache_dir is specified
+        if cache_file:
+            self._save_cached_indices(cache_file)
+        
+        logger.info(f"Indices created in {time.time() - start_time:.2f} seconds")
+    
+    def _load_cached_indices(self, cache_file):
+        """
+        Load indices from a cache entry directory. Blocking index and exact match lookup
+        postings are memory-mapped.
+        
+        A delta entry loads its base entry instead and leaves the records added and deleted
+        since in _cached_delta, to be replayed once the reference store exists.
+        
+        Parameters:
+        -----------
+        cache_file : str
+            Path to the cache entry directory
+            
+        Returns:
+        --------
+        bool
+            True if the indices were loaded, False if the entry is missing, unreadable or stale
+        """
+        cache_data = self._read_cache_meta(cache_file, self.cache_key)
+        if cache_data is None:
+            return False
+        
+        delta = None
+        if 'base_cache_key' in cache_data:
+            delta = cache_data
+            delta_file = cache_file
+            cache_file = self._cache_file_path(self.cache_dir, delta['base_cache_key'])
+            cache_data = self._read_cache_meta(cache_file, delta['base_cache_key'])
+            if cache_data is None or 'base_cache_key' in cache_data or (
+                    len(cache_data['dist_list_df']) != delta['base_record_count']):
+                # Remove the orphaned delta so that a rebuilt entry can be saved in its place
+                logger.warning(f"Removing index cache {delta_file} without its base entry {cache_file}")
+                shutil.rmtree(delta_file, ignore_errors=True)
+                return False
+        
+        try:
+            logger.info(f"Loading indices from cache: {cache_file}")
+            indices = {
+                name: CSRIndex.load(cache_file, name, cache_data['index_keys'][name])
+                for name in self.BLOCKING_INDEX_NAMES + self.EXACT_LOOKUP_NAMES
+            }
+            indices.update({
+                name: NgramIndex.load(cache_file, name, cache_data['index_keys'][name])
+                for name in self.NGRAM_INDEX_NAMES
+            })
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable index cache {cache_file}: {str(e)}")
+            return False
+        
+        self.dist_list_df = cache_data['dist_list_df']
+        self.deleted_records = set(cache_data.get('deleted_records', ()))
+        for name, index in indices.items():
+            setattr(self, name, index)
+        self._cache_base = (cache_data['cache_key'], len(self.dist_list_df), frozenset(self.deleted_records))
+        
+        used_entries = [cache_file]
+        if delta is not None:
+            logger.info(
+                f"Applying {len(delta['added_records'])} added and {len(delta['deleted_records'])} "
+                f"deleted records from cache: {delta_file}"
+            )
+            self._cached_delta = (delta['added_records'], delta['deleted_records'])
+            used_entries.append(delta_file)
+        
+        # Mark the entries as recently used for LRU eviction, a delta after its base
+        for path in used_entries:
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        return True
+    
+    @staticmethod
+    def _read_cache_meta(cache_file, cache_key):
+        """
+        Read the metadata of a cache entry directory.
+        
+        Parameters:
+        -----------
+        cache_file : str
+            Path to the cache entry directory
+        cache_key : str
+            Cache key the entry must have been saved under
+            
+        Returns:
+        --------
+        dict
+            The metadata, or None if the entry is missing, unreadable or stale
+        """
+        try:
+            with open(os.path.join(cache_file, 'meta.pkl'), 'rb') as f:
+                cache_data = pickle.load(f)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable index cache {cache_file}: {str(e)}")
+            return None
+        
+        if cache_data.get('format_version') != INDEX_FORMAT_VERSION or cache_data.get('cache_key') != cache_key:
+            logger.warning(f"Ignoring stale index cache {cache_file}")
+            return None
+        return cache_data
+    
+    def _save_cached_indices(self, cache_file):
+        """
+        Save indices to a cache entry directory and evict least recently used cache entries.
+        
+        Parameters:
+        -----------
+        cache_file : str
+            Path to the cache entry directory
+        """
+        logger.info(f"Saving indices to cache: {cache_file}")
+        
+        def save_indices(directory):
+            return {
+                'dist_list_df': self.dist_list_df,
+                'deleted_records': sorted(self.deleted_records),
+                'index_keys': {
+                    name: getattr(self, name).save(directory, name)
+                    for name in self.BLOCKING_INDEX_NAMES + self.EXACT_LOOKUP_NAMES + self.NGRAM_INDEX_NAMES
+                }
+            }
+        
+        self._write_cache_entry(cache_file, save_indices)
+        self._cache_base = (self.cache_key, len(self.dist_list_df), frozenset(self.deleted_records))
+    
+    def _save_cached_delta(self, cache_file):
+        """
+        Save the records added and deleted since the base cache entry was saved as a delta
+        entry, which is loaded by replaying them on top of the base entry's indices.
+        
+        Parameters:
+        -----------
+        cache_file : str
+            Path to the cache entry directory
+            
+        Returns:
+        --------
+        bool
+            True if the delta entry was saved, False if there is no base entry or the changes
+            exceed MAX_CACHED_DELTA_FRACTION of its records
+        """
+        if self._cache_base is None:
+            return False
+        base_cache_key, base_record_count, base_deleted = self._cache_base
+        base_file = self._cache_file_path(self.cache_dir, base_cache_key)
+        added_df = self.dist_list_df.iloc[base_record_count:][['first_name', 'last_name', 'company']]
+        deleted = sorted(self.deleted_records - base_deleted)
+        if len(added_df) + len(deleted) > self.MAX_CACHED_DELTA_FRACTION * max(base_record_count, 1):
+            return False
+        
+        # Keep the base entry ahead of older entries for LRU eviction
+        try:
+            os.utime(base_file)
+        except OSError:
+            return False
+        
+        logger.info(f"Saving {len(added_df)} added and {len(deleted)} deleted records to cache: {cache_file}")
+        self._write_cache_entry(cache_file, lambda directory: {
+            'base_cache_key': base_cache_key,
+            'base_record_count': base_record_count,
+            'added_records': added_df,
+            'deleted_records': deleted
+        })
+        return True
+    
+    def _write_cache_entry(self, cache_file, write):
+        """
+        Write a cache entry directory and evict least recently used cache entries.
+        
+        The entry is written to a temporary directory and atomically renamed, so concurrent
+        processes never read a partially written cache.
+        
+        Parameters:
+        -----------
+        cache_file : str
+            Path to the cache entry directory
+        write : callable
+            Called with the temporary directory; writes the entry's array files and returns
+            the metadata to pickle with them
+        """
+        temp_dir = tempfile.mkdtemp(dir=self.cache_dir, prefix='.tmp-indices-')
+        try:
+            meta = write(temp_dir)
+            with open(os.path.join(temp_dir, 'cache_key'), 'w') as f:
+                f.write(self.cache_key)
+            if 'base_cache_key' in meta:
+                with open(os.path.join(temp_dir, 'base_cache_key'), 'w') as f:
+                    f.write(meta['base_cache_key'])
+            with open(os.path.join(temp_dir, 'meta.pkl'), 'wb') as f:
+                pickle.dump(
+                    dict(meta, format_version=INDEX_FORMAT_VERSION, cache_key=self.cache_key),
+                    f, protocol=pickle.HIGHEST_PROTOCOL
+                )
+            try:
+                os.rename(temp_dir, cache_file)
+            except OSError:
+                # Another process saved the same entry first
+                shutil.rmtree(temp_dir, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
+        
+        self._evict_cached_indices()
+    
+    @classmethod
+    def latest_cache_key(cls, cache_dir):
+        """
+        Get the cache key of the most recently used index set in a cache directory.
+        
+        Parameters:
+        -----------
+        cache_dir : str
+            Directory of cached indices
+            
+        Returns:
+        --------
+        str
+            The cache key, or None if the directory holds no index sets
+        """
+        cache_entries = glob.glob(os.path.join(cache_dir, 'enhanced_name_matcher_indices-*'))
+        
+        def last_used(path):
+            try:
+                return os.path.getmtime(path)
+            except OSError:
+                return 0
+        
+        for path in sorted(cache_entries, key=last_used, reverse=True):
+            try:
+                with open(os.path.join(path, 'cache_key')) as f:
+                    return f.read().strip()
+            except OSError:
+                continue
+        return None
+    
+    def _evict_cached_indices(self):
+        """
+        Remove the least recently used cached index sets, and separately SQLite reference
+        databases, beyond max_cache_entries. Base entries of kept delta entries are kept.
+        """
+        def last_used(path):
+            try:
+                return os.path.getmtime(path)
+            except OSError:
+                return 0
+        
+        def base_entry(path):
+            try:
+                with open(os.path.join(path, 'base_cache_key')) as f:
+                    return self._cache_file_path(self.cache_dir, f.read().strip())
+            except OSError:
+                return None
+        
+        for pattern in ('enhanced_name_matcher_indices-*', 'enhanced_name_matcher_reference-*.sqlite'):
+            cache_entries = glob.glob(os.path.join(self.cache_dir, pattern))
+            cache_entries.sort(key=last_used, reverse=True)
+            kept = cache_entries[:max(self.max_cache_entries, 1)]
+            bases = {base_entry(path) for path in kept if os.path.isdir(path)}
+            for path in cache_entries[len(kept):]:
+                if path in bases:
+                    continue
+                logger.info(f"Evicting cached indices: {path}")
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+    
+    @staticmethod
+    def _sqlite_file_path(cache_dir, cache_key):
+        """Get the path of the SQLite reference database for a cache key."""
+        return os.path.join(cache_dir, f"enhanced_name_matcher_reference-{cache_key[:32]}.sqlite")
+    
+    def _open_sqlite_database(self):
+        """
+        Serve the reference records and indices from the SQLite database at sqlite_path.
+        
+        Returns:
+        --------
+        bool
+            True if the database was opened, False if it is missing, unreadable or stale
+        """
+        if not os.path.exists(self.sqlite_path):
+            return False
+        try:
+            database = SQLiteDatabase(self.sqlite_path)
+            meta = database.meta()
+            if meta.get('format_version') != str(SQLITE_SCHEMA_VERSION) or (
+                    self.cache_key is not None and meta.get('cache_key') != self.cache_key):
+                logger.warning(f"Ignoring stale SQLite reference database {self.sqlite_path}")
+                return False
+            
+            logger.info(f"Opening SQLite reference database: {self.sqlite_path}")
+            posting_cache = LRUCache(self.hot_set_size)
+            indices = {
+                name: SQLitePostingIndex(database, name, posting_cache)
+                for name in self.BLOCKING_INDEX_NAMES + self.EXACT_LOOKUP_NAMES
+            }
+            indices.update({
+                name: NgramIndex(
+                    SQLitePostingIndex(database, f"{name}.grams", posting_cache),
+                    SQLitePostingIndex(database, f"{name}.values", posting_cache),
+                    database.array(f"{name}.gram_counts", np.int32)
+                )
+                for name in self.NGRAM_INDEX_NAMES
+            })
+            reference_store = SQLiteReferenceStore(database, self.hot_set_size)
+        except sqlite3.Error as e:
+            logger.warning(f"Ignoring unreadable SQLite reference database {self.sqlite_path}: {str(e)}")
+            return False
+        
+        self.cache_key = meta['cache_key']
+        self.dist_list_df = None
+        self.deleted_records = set()
+        for name, index in indices.items():
+            setattr(self, name, index)
+        self.reference_store = reference_store
+        self.last_name_index = SQLiteLastNameIndex(database, posting_cache)
+        
+        # Mark the database as recently used for LRU eviction
+        try:
+            os.utime(self.sqlite_path)
+        except OSError:
+            pass
+        return True
+    
+    def _write_sqlite_database(self, chunks):
+        """
+        Write the reference records and indices to a SQLite database at sqlite_path,
+        preprocessing the distribution list one chunk at a time.
+        
+        Parameters:
+        -----------
+        chunks : iterable
+            DataFrames holding the distribution list in order, with columns 'first_name',
+            'last_name', and 'company'
+        """
+        logger.info(f"Writing SQLite reference database: {self.sqlite_path}")
+        start_time = time.time()
+        
+        def value(item):
+            # Store numpy scalars as Python values and other unsupported types as text
+            if isinstance(item, np.generic):
+                item = item.item()
+            if item is None or isinstance(item, (str, int, float)):
+                return item
+            return str(item)
+        
+        company_ids = {}
+        record_count = 0
+        with SQLiteDatabaseWriter(self.sqlite_path) as writer:
+            for chunk in chunks:
+                df = chunk[['first_name', 'last_name', 'company']].copy()
+                df.index = pd.RangeIndex(record_count, record_count + len(df))
+                record_count += len(df)
+                self._add_derived_columns(df)
+                rows = df.index.tolist()
+                
+                # Company IDs in order of first appearance, as in ReferenceStore
+                columns = [
+                    # Derived columns are always strings; only original values need converting
+                    [value(item) for item in df[column]] if column in SQLiteReferenceStore.RAW_COLUMNS
+                    else df[column].tolist()
+                    for column in ReferenceStore.COLUMNS
+                ]
+                columns.append([str(name).lower() for name in df['first_name']])
+                columns.append([str(name).lower() for name in df['last_name']])
+                columns.append([company_ids.setdefault(company, len(company_ids)) for company in df['company_std']])
+                writer.add_records(zip(rows, *columns))
+                
+                for name, keys in self._blocking_keys(df).items():
+                    writer.stage_postings(name, keys, rows)
+                for name, keys in self._exact_lookup_keys(df).items():
+                    writer.stage_postings(name, keys, rows)
+                company_words = [(word, row) for company, row in zip(df['company_std'], rows)
+                                 for word in self._company_index_words(company)]
+                writer.stage_postings('company_word_index', [word for word, _ in company_words],
+                                      [row for _, row in company_words])
+                for name, column in self.NGRAM_INDEX_COLUMNS.items():
+                    writer.stage_postings(f"{name}.values", df[column].where(df[column] != ""), rows)
+            
+            for name in self.BLOCKING_INDEX_NAMES + self.EXACT_LOOKUP_NAMES:
+                # exact_name_lookup keeps the last record of each name
+                writer.write_postings(name, last_only=name == 'exact_name_lookup')
+            
+            # N-gram indices map each n-gram to the slots of the distinct values containing it
+            arrays = {}
+            for name in self.NGRAM_INDEX_NAMES:
+                writer.write_postings(f"{name}.values")
+                gram_counts = []
+                gram_slots = []
+                for slot, key in enumerate(writer.keys(f"{name}.values")):
+                    grams = NgramIndex.ngrams(key)
+                    gram_counts.append(len(grams))
+                    gram_slots.extend((gram, slot) for gram in grams)
+                writer.stage_postings(f"{name}.grams", [gram for gram, _ in gram_slots], [slot for _, slot in gram_slots])
+                writer.write_postings(f"{name}.grams")
+                arrays[f"{name}.gram_counts"] = np.array(gram_counts, dtype=np.int32)
+            
+            writer.finish(
+                meta={
+                    'format_version': SQLITE_SCHEMA_VERSION,
+                    'cache_key': self.cache_key,
+                    'record_count': record_count
+                },
+                companies=((company_id, company) for company, company_id in company_ids.items()),
+                arrays=arrays
+            )
+        self.index_build_times['sqlite_database'] = time.time() - start_time
+        logger.info(f"SQLite reference database written in {self.index_build_times['sqlite_database']:.2f} seconds")
+        
+        if self.cache_dir:
+            self._evict_cached_indices()
+    
+    def _require_memory_backend(self, operation):
+        """Raise ValueError when records are served from the read-only SQLite database."""
+        if isinstance(self.reference_store, SQLiteReferenceStore):
+            raise ValueError(
+                f"{operation} needs the memory backend; the sqlite backend's reference database is read-only"
+            )
+    
+    @staticmethod
+    def _map_unique(values, func):
+        """
+        Apply a function once per distinct value of a Series.
+        
+        Parameters:
+        -----------
+        values : pandas.Series
+            Values to map
+        func : callable
+            Function of a single value
+            
+        Returns:
+        --------
+        pandas.Series
+            func applied to each value, with the index of values
+        """
+        codes, uniques = pd.factorize(values, use_na_sentinel=False)
+        mapped = np.array([func(value) for value in uniques], dtype=object)
+        return pd.Series(mapped[codes], index=values.index, dtype=object)
+    
+    def _preprocess_dist_list(self):
+        """Preprocess the distribution list for efficient matching."""
+        logger.info("Preprocessing distribution list...")
+        start_time = time.time()
+        self._add_derived_columns(self.dist_list_df)
+        self.index_build_times['preprocessing'] = time.time() - start_time
+    
+    def _add_derived_columns(self, df):
+        """
+        Add the standardized names and blocking key columns to distribution list records.
+        
+        Parameters:
+        -----------
+        df : pandas.DataFrame
+            Records with 'first_name', 'last_name' and 'company' columns; modified in place
+        """
+        # Create standardized versions of names, once per distinct value
+        df['first_name_std'] = self._map_unique(df['first_name'], self._compute_standardized_name)
+        df['last_name_std'] = self._map_unique(df['last_name'], self._compute_standardized_name)
+        df['company_std'] = self._map_unique(df['company'], self._compute_standardized_company)
+        
+        # Create phonetic keys, once per distinct standardized name
+        def soundex(name):
+            return jellyfish.soundex(name) if name else ""
+        
+        df['first_name_soundex'] = self._map_unique(df['first_name_std'], soundex)
+        df['last_name_soundex'] = self._map_unique(df['last_name_std'], soundex)
+        
+        # Create first letter indices
+        df['first_name_initial'] = df['first_name_std'].str[0:1]
+        df['last_name_initial'] = df['last_name_std'].str[0:1]
+        
+        # Create first two characters indices (for more precise blocking)
+        df['first_name_two_chars'] = df['first_name_std'].str[0:2]
+        df['last_name_two_chars'] = df['last_name_std'].str[0:2]
+    
+    def _create_blocking_indices(self):
+        """
+        Create indices for blocking to reduce comparison space.
+        
+        Each index is built in a single vectorized pass: keys are factorized in order of
+        first appearance and postings are grouped with a stable sort, so every key lists
+        its records in ascending order. Build times are recorded in index_build_times.
+        """
+        logger.info("Creating blocking indices...")
+        df = self.dist_list_df
+        
+        def key_index(keys):
+            # Records with a missing key get code -1 and are not indexed
+            codes, uniques = pd.factorize(keys)
+            return CSRIndex.from_codes(list(uniques), codes)
+        
+        for name, keys in self._blocking_keys(df).items():
+            start_time = time.time()
+            setattr(self, name, key_index(keys))
+            self.index_build_times[name] = time.time() - start_time
+        
+        # Company word index, built from the words of each distinct standardized company
+        start_time = time.time()
+        company_codes, companies = pd.factorize(df['company_std'])
+        company_rows = CSRIndex.from_codes(list(range(len(companies))), company_codes)
+        
+        word_codes = {}
+        posting_codes = []
+        posting_rows = []
+        for company_code, company in enumerate(companies):
+            rows = company_rows.postings[company_rows.offsets[company_code]:company_rows.offsets[company_code + 1]]
+            for word in self._company_index_words(company):
+                posting_codes.append(np.full(len(rows), word_codes.setdefault(word, len(word_codes)), dtype=np.int64))
+                posting_rows.append(rows)
+        
+        self.company_word_index = CSRIndex.from_codes(
+            list(word_codes),
+            np.concatenate(posting_codes) if posting_codes else np.empty(0, dtype=np.int64),
+            np.concatenate(posting_rows) if posting_rows else np.empty(0, dtype=np.int64)
+        )
+        self.index_build_times['company_word_index'] = time.time() - start_time
+        
+        # Character n-gram indices for retrieving values a typo away
+        for name, column in self.NGRAM_INDEX_COLUMNS.items():
+            start_time = time.time()
+            setattr(self, name, NgramIndex.from_values(df[column]))
+            self.index_build_times[name] = time.time() - start_time
+        
+        for name, seconds in self.index_build_times.items():
+            logger.info(f"  {name} built in {seconds:.3f} seconds")
     
-    def __init__(self, dist_list_df, cache_dir=None):
+    @staticmethod
+    def _blocking_keys(df):
         """
-        Initialize the EnhancedNameMatcher with a standard distribution list.
+        Get the key of each record in the single-key blocking indices.
         
         Parameters:
         -----------
-        dist_list_df : pandas.DataFrame
-            DataFrame containing the standard distribution list with columns 'first_name', 'last_name', and 'company'
-        cache_dir : str, default=None
-            Directory to store cache files. If None, no caching is used.
+        df : pandas.DataFrame
+            Records after _add_derived_columns
+            
+        Returns:
+        --------
+        dict
+            Mapping of index name to a Series of keys, missing where a record is not indexed
         """
-        self.dist_list_df = dist_list_df
-        self.cache_dir = cache_dir
-        
-        # Create cache directory if specified
-        if self.cache_dir and not os.path.exists(self.cache_dir):
-            os.makedirs(self.cache_dir)
-        
-        # Create exact match lookup dictionaries
-        self._create_exact_match_lookups()
+        first_std_length = df['first_name_std'].str.len()
+        last_std_length = df['last_name_std'].str.len()
+        return {
+            # Last and first name initial indices
+            'last_initial_index': df['last_name_initial'].where(df['last_name_initial'] != ""),
+            'first_initial_index': df['first_name_initial'].where(df['first_name_initial'] != ""),
+            # Soundex indices
+            'last_soundex_index': df['last_name_soundex'].where(df['last_name_soundex'] != ""),
+            'first_soundex_index': df['first_name_soundex'].where(df['first_name_soundex'] != ""),
+            # First two characters indices (for more precise blocking)
+            'first_two_chars_index': df['first_name_two_chars'].where(first_std_length >= 2),
+            'last_two_chars_index': df['last_name_two_chars'].where(last_std_length >= 2)
+        }
+    
+    @staticmethod
+    def _company_index_words(company):
+        """Get the words of a standardized company indexed in company_word_index."""
+        # Only index words with at least 2 characters
+        return [word for word in set(company.split()) if len(word) >= 2] if company else []
+    
+    def _create_last_name_index(self):
+        """
+        Create an index from lowercased last name to the records carrying it.
+        Each entry holds the records' lowercased first names in sorted order, so that
+        first name prefixes can be resolved with a binary search.
+        """
+        store = self.reference_store
+        last_codes, last_names = pd.factorize(store.last_name_lower)
+        # Sorted factorization, so first name codes compare like the names
+        first_codes, _ = pd.factorize(store.first_name_lower, sort=True)
+        order = np.lexsort((np.arange(len(last_codes)), first_codes, last_codes))
+        if self.deleted_records:
+            order = order[~np.isin(order, list(self.deleted_records))]
         
-        # Load or create indices
-        self._load_or_create_indices()
+        sorted_first_names = store.first_name_lower[order]
+        bounds = np.flatnonzero(np.diff(last_codes[order])) + 1
+        starts = np.concatenate([[0], bounds]).tolist()
+        ends = np.concatenate([bounds, [len(order)]]).tolist()
+        self.last_name_index = {
+            last_names[last_codes[order[start]]]: (sorted_first_names[start:end].tolist(), order[start:end].tolist())
+            for start, end in zip(starts, ends)
+        } if len(order) else {}
     
-    def _standardize_name(self, name):
+    def add_records(self, records_df):
         """
-        Standardize a name by converting to lowercase, removing punctuation,
-        and handling common nicknames.
+        Add reference records, updating every index and lookup in place.
+        
+        Added records get record indices after all existing ones.
         
         Parameters:
         -----------
-        name : str
-            The name to standardize
+        records_df : pandas.DataFrame
+            Records with 'first_name', 'last_name' and 'company' columns
             
         Returns:
         --------
-        str
-            Standardized name
+        numpy.ndarray
+            Record indices of the added records
         """
-        # Check cache first
-        if name in name_standardization_cache:
-            return name_standardization_cache[name]
+        self._require_memory_backend('add_records')
+        records_df = records_df[['first_name', 'last_name', 'company']].copy()
+        rows = np.arange(len(self.dist_list_df), len(self.dist_list_df) + len(records_df), dtype=np.int64)
+        if not len(rows):
+            return rows
         
-        if not isinstance(name, str) or pd.isna(name) or name == "" or str(name).strip() == "":
-            result = ""
-        else:
-            # Convert to lowercase
-            result = str(name).lower()
-            
-            # Remove punctuation and extra spaces
-            result = re.sub(r'[^\w\s]', '', result)
-            result = re.sub(r'\s+', ' ', result).strip()
-            
-            # Handle common nicknames
-            if result in NICKNAME_MAP:
-                result = NICKNAME_MAP[result]
+        records_df.index = rows
+        self._add_derived_columns(records_df)
+        self.dist_list_df = pd.concat([self.dist_list_df, records_df])
+        self.reference_store.append(records_df)
         
-        # Cache the result
-        name_standardization_cache[name] = result
-        return result
+        for row, last_name, first_name in zip(rows.tolist(), records_df['last_name'], records_df['first_name']):
+            first_names, indices = self.last_name_index.setdefault(str(last_name).lower(), ([], []))
+            # New record indices are the largest, so they go after equal first names
+            pos = bisect.bisect_right(first_names, str(first_name).lower())
+            first_names.insert(pos, str(first_name).lower())
+            indices.insert(pos, row)
+        
+        self._update_indices(records_df, rows, add=True)
+        return rows
     
-    def _standardize_company(self, company):
+    def delete_records(self, indices):
         """
-        Standardize a company name by applying only the company mapping dictionary.
-        No other changes are made to the company name.
+        Delete reference records, removing them from every index and lookup in place.
+        
+        Deleted records keep their record indices as tombstones until compact is called.
         
         Parameters:
         -----------
-        company : str
-            The company name to standardize
-                
+        indices : iterable
+            Record indices of the records to delete
+        """
+        self._require_memory_backend('delete_records')
+        indices = sorted(set(int(idx) for idx in indices) - self.deleted_records)
+        if not indices:
+            return
+        if indices[0] < 0 or indices[-1] >= len(self.dist_list_df):
+            raise IndexError(f"Record index out of range: {indices[0] if indices[0] < 0 else indices[-1]}")
+        
+        records_df = self.dist_list_df.iloc[indices]
+        self.deleted_records.update(indices)
+        
+        store = self.reference_store
+        for row in indices:
+            first_names, entry_indices = self.last_name_index[store.last_name_lower[row]]
+            pos = entry_indices.index(row)
+            del first_names[pos], entry_indices[pos]
+            if not entry_indices:
+                del self.last_name_index[store.last_name_lower[row]]
+        
+        self._update_indices(records_df, np.array(indices, dtype=np.int64), add=False)
+    
+    def update_records(self, indices, records_df):
+        """
+        Replace reference records with new values.
+        
+        Each record is deleted and its new values are added under a new record index.
+        
+        Parameters:
+        -----------
+        indices : iterable
+            Record indices of the records to replace
+        records_df : pandas.DataFrame
+            New values, one row per record index, with 'first_name', 'last_name' and 'company' columns
+            
         Returns:
         --------
-        str
-            Standardized company name
+        numpy.ndarray
+            New record indices of the updated records
         """
-        # Check cache first
-        # if company in company_standardization_cache:
-        #     return company_standardization_cache[company]
+        self._require_memory_backend('update_records')
+        indices = list(indices)
+        if len(indices) != len(records_df):
+            raise ValueError(f"Got {len(records_df)} records for {len(indices)} record indices")
+        self.delete_records(indices)
+        return self.add_records(records_df)
+    
+    def _update_indices(self, records_df, rows, add):
+        """
+        Add records to or remove them from every blocking index and exact match lookup.
         
-        if not isinstance(company, str) or pd.isna(company) or company == "" or str(company).strip() == "":
-            result = ""
-        else:
-            # Convert to lowercase for matching purposes only
-            company_lower = str(company).lower().strip()
-            
-            # Apply company mapping if it exists in the map
-            if company_lower in COMPANY_MAP:
-                result = COMPANY_MAP[company_lower]
-            else:
-                # If not in mapping, keep original
-                result = str(company).strip()
+        Parameters:
+        -----------
+        records_df : pandas.DataFrame
+            The records, after _add_derived_columns
+        rows : numpy.ndarray
+            Record index of each record
+        add : bool
+            True to add the records, False to remove them
+        """
+        rows = rows.tolist()
         
-        # Cache the result
-        company_standardization_cache[company] = result
-        return result
+        def update(index, grouped):
+            for key, key_rows in grouped.items():
+                if add:
+                    index.add_postings(key, key_rows)
+                else:
+                    index.remove_postings(key, key_rows)
+        
+        def group(keys):
+            grouped = defaultdict(list)
+            for key, row in zip(keys, rows):
+                if not pd.isna(key):
+                    grouped[key].append(row)
+            return grouped
+        
+        for name, keys in self._blocking_keys(records_df).items():
+            update(getattr(self, name), group(keys))
+        
+        company_words = defaultdict(list)
+        for company, row in zip(records_df['company_std'], rows):
+            for word in self._company_index_words(company):
+                company_words[word].append(row)
+        update(self.company_word_index, company_words)
+        
+        lookup_keys = self._exact_lookup_keys(records_df)
+        update(self.last_name_company_lookup, group(lookup_keys['last_name_company_lookup']))
+        update(self.first_name_company_lookup, group(lookup_keys['first_name_company_lookup']))
+        
+        # exact_name_lookup holds the last live record of each name, found through last_name_index
+        store = self.reference_store
+        for key in set(key for key in lookup_keys['exact_name_lookup'] if not pd.isna(key)):
+            first_lower, last_lower = key.split(LOOKUP_KEY_SEPARATOR)
+            first_names, indices = self.last_name_index.get(last_lower, ([], []))
+            pos = bisect.bisect_left(first_names, first_lower)
+            winner = None
+            while pos < len(first_names) and first_names[pos] == first_lower:
+                if isinstance(store.first_name[indices[pos]], str) and isinstance(store.last_name[indices[pos]], str):
+                    winner = indices[pos] if winner is None else max(winner, indices[pos])
+                pos += 1
+            self.exact_name_lookup.set_postings(sys.intern(key), [] if winner is None else [winner])
+        
+        for name, column in self.NGRAM_INDEX_COLUMNS.items():
+            if add:
+                getattr(self, name).add_records(records_df[column], rows)
+            else:
+                getattr(self, name).remove_records(records_df[column], rows)
     
-    def _create_exact_match_lookups(self):
-        """Create lookup dictionaries for exact matches."""
-        logger.info("Creating exact match lookups...")
+    def apply_distribution_list(self, dist_list_df, cache_key=None, max_changed_fraction=None):
+        """
+        Bring the indices up to date with a new version of the distribution list by
+        applying only the records added and deleted since the current version.
         
-        # Create lookup for exact first name + last name matches
-        self.exact_name_lookup = {}
-        for idx, row in self.dist_list_df.iterrows():
-            first_name = row['first_name'] if isinstance(row['first_name'], str) else ""
-            last_name = row['last_name'] if isinstance(row['last_name'], str) else ""
-            
-            if first_name and last_name:
-                key = (str(first_name).lower(), str(last_name).lower())
-                self.exact_name_lookup[key] = idx
-        
-        # Create lookup for exact last name + company matches
-        self.last_name_company_lookup = {}
-        for idx, row in self.dist_list_df.iterrows():
-            last_name = row['last_name'] if isinstance(row['last_name'], str) else ""
-            company = row['company'] if isinstance(row['company'], str) else ""
-            
-            if last_name and company:
-                std_company = self._standardize_company(company)
-                if std_company:
-                    key = (str(last_name).lower(), std_company)
-                    if key not in self.last_name_company_lookup:
-                        self.last_name_company_lookup[key] = []
-                    self.last_name_company_lookup[key].append(idx)
-        
-        # Create lookup for exact first name + company matches
-        self.first_name_company_lookup = {}
-        for idx, row in self.dist_list_df.iterrows():
-            first_name = row['first_name'] if isinstance(row['first_name'], str) else ""
-            company = row['company'] if isinstance(row['company'], str) else ""
-            
-            if first_name and company:
-                std_company = self._standardize_company(company)
-                if std_company:
-                    key = (str(first_name).lower(), std_company)
-                    if key not in self.first_name_company_lookup:
-                        self.first_name_company_lookup[key] = []
-                    self.first_name_company_lookup[key].append(idx)
-        
-        # Create lookup for swapped name matches (first name as last name and vice versa)
-        self.swapped_name_lookup = {}
-        for idx, row in self.dist_list_df.iterrows():
-            first_name = row['first_name'] if isinstance(row['first_name'], str) else ""
-            last_name = row['last_name'] if isinstance(row['last_name'], str) else ""
-            
-            if first_name and last_name:
-                key = (str(last_name).lower(), str(first_name).lower())  # Swapped order
-                self.swapped_name_lookup[key] = idx
-    def _load_or_create_indices(self):
-        """Load indices from cache or create them if not available."""
-        cache_file = None
-        if self.cache_dir:
-            cache_file = os.path.join(self.cache_dir, 'enhanced_name_matcher_indices.pkl')
+        If the matcher has a cache directory, the updated indices are saved under the
+        cache key of the new version: as a delta entry holding the records added and deleted
+        since the last full cache entry, or while the changes exceed MAX_CACHED_DELTA_FRACTION,
+        as a full entry with deleted records kept as tombstones.
         
-        if cache_file and os.path.exists(cache_file):
-            # Load indices from cache
-            logger.info(f"Loading indices from cache: {cache_file}")
-            with open(cache_file, 'rb') as f:
-                cache_data = pickle.load(f)
-                self.dist_list_df = cache_data['dist_list_df']
-                self.last_initial_index = cache_data['last_initial_index']
-                self.first_initial_index = cache_data.get('first_initial_index', defaultdict(list))
-                self.last_soundex_index = cache_data['last_soundex_index']
-                self.first_soundex_index = cache_data['first_soundex_index']
-                self.first_two_chars_index = cache_data['first_two_chars_index']
-                self.last_two_chars_index = cache_data['last_two_chars_index']
-                self.company_word_index = cache_data['company_word_index']
-        else:
-            # Create indices from scratch
-            logger.info("Creating indices...")
-            start_time = time.time()
+        Parameters:
+        -----------
+        dist_list_df : pandas.DataFrame
+            The new distribution list with columns 'first_name', 'last_name', and 'company'
+        cache_key : str, default=None
+            Cache key of the new version. If None, it is derived from the contents of dist_list_df.
+        max_changed_fraction : float, default=None
+            If the added and deleted records, or all tombstones including earlier ones,
+            exceed this fraction of the new version, nothing is applied so that the caller
+            can rebuild instead
             
-            # Preprocess the distribution list
-            self._preprocess_dist_list()
-            
-            # Create blocking indices
-            self._create_blocking_indices()
-            
-            # Save indices to cache if cache_dir is specified
-            if cache_file:
-                logger.info(f"Saving indices to cache: {cache_file}")
-                with open(cache_file, 'wb') as f:
-                    pickle.dump({
-                        'dist_list_df': self.dist_list_df,
-                        'last_initial_index': self.last_initial_index,
-                        'first_initial_index': self.first_initial_index,
-                        'last_soundex_index': self.last_soundex_index,
-                        'first_soundex_index': self.first_soundex_index,
-                        'first_two_chars_index': self.first_two_chars_index,
-                        'last_two_chars_index': self.last_two_chars_index,
-                        'company_word_index': self.company_word_index
-                    }, f)
-            
-            logger.info(f"Indices created in {time.time() - start_time:.2f} seconds")
-    
-    def _preprocess_dist_list(self):
-        """Preprocess the distribution list for efficient matching."""
-        logger.info("Preprocessing distribution list...")
+        Returns:
+        --------
+        dict
+            Numbers of 'added', 'deleted' and 'unchanged' records, or None if the change
+            exceeded max_changed_fraction
+        """
+        self._require_memory_backend('apply_distribution_list')
+        live = np.ones(len(self.dist_list_df), dtype=bool)
+        live[list(self.deleted_records)] = False
+        added_df, deleted = diff_distribution_lists(self.dist_list_df[live], dist_list_df)
         
-        # Create standardized versions of names
-        self.dist_list_df['first_name_std'] = self.dist_list_df['first_name'].apply(self._standardize_name)
-        self.dist_list_df['last_name_std'] = self.dist_list_df['last_name'].apply(self._standardize_name)
-        self.dist_list_df['company_std'] = self.dist_list_df['company'].apply(self._standardize_company)
+        if max_changed_fraction is not None:
+            max_changes = max_changed_fraction * max(len(dist_list_df), 1)
+            if len(added_df) + len(deleted) > max_changes or len(self.deleted_records) + len(deleted) > max_changes:
+                return None
         
-        # Create phonetic keys
-        self.dist_list_df['first_name_soundex'] = self.dist_list_df['first_name_std'].apply(
-            lambda x: jellyfish.soundex(x) if x else ""
-        )
-        self.dist_list_df['last_name_soundex'] = self.dist_list_df['last_name_std'].apply(
-            lambda x: jellyfish.soundex(x) if x else ""
+        start_time = time.time()
+        self.delete_records(deleted)
+        self.add_records(added_df)
+        logger.info(
+            f"Applied {len(added_df)} added and {len(deleted)} deleted records in {time.time() - start_time:.2f} seconds"
         )
         
-        # Create first letter indices
-        self.dist_list_df['first_name_initial'] = self.dist_list_df['first_name_std'].str[0:1]
-        self.dist_list_df['last_name_initial'] = self.dist_list_df['last_name_std'].str[0:1]
+        if cache_key is None and self.cache_dir:
+            cache_key = index_cache_key(dataframe_content_hash(dist_list_df.reset_index(drop=True)))
+        self.cache_key = cache_key
+        if self.cache_dir and self.cache_key:
+            cache_file = self._cache_file_path(self.cache_dir, self.cache_key)
+            if not self._save_cached_delta(cache_file):
+                self.compact(drop_deleted=False)
+                self._save_cached_indices(cache_file)
         
-        # Create first two characters indices (for more precise blocking)
-        self.dist_list_df['first_name_two_chars'] = self.dist_list_df['first_name_std'].str[0:2]
-        self.dist_list_df['last_name_two_chars'] = self.dist_list_df['last_name_std'].str[0:2]
+        return {
+            'added': len(added_df),
+            'deleted': len(deleted),
+            'unchanged': int(live.sum()) - len(deleted)
+        }
+    
+    def compact(self, drop_deleted=True):
+        """
+        Merge the delta overlay of every index into new CSR arrays.
         
-        # Create company words for indexing
-        self.dist_list_df['company_words'] = self.dist_list_df['company_std'].apply(
-            lambda x: set(x.split()) if x else set()
-        )
+        Parameters:
+        -----------
+        drop_deleted : bool, default=True
+            Also drop the tombstones of deleted records. The remaining records are
+            renumbered in order, so record indices from before the call are no longer valid.
+        """
+        self._require_memory_backend('compact')
+        remap = None
+        if drop_deleted and self.deleted_records:
+            live = np.ones(len(self.dist_list_df), dtype=bool)
+            live[list(self.deleted_records)] = False
+            remap = np.where(live, np.cumsum(live) - 1, -1)
+            self.dist_list_df = self.dist_list_df[live].reset_index(drop=True)
+        
+        for name in self.BLOCKING_INDEX_NAMES + self.EXACT_LOOKUP_NAMES:
+            index = getattr(self, name)
+            if index.modified or remap is not None:
+                setattr(self, name, index.compacted(remap)[0])
+        for name in self.NGRAM_INDEX_NAMES:
+            index = getattr(self, name)
+            if index.modified or remap is not None:
+                setattr(self, name, index.compacted(remap))
+        
+        if remap is not None:
+            self.deleted_records = set()
+            self.reference_store = ReferenceStore(self.dist_list_df)
+            self._create_last_name_index()
+            # Record indices no longer match any cache entry
+            self._cache_base = None
     
-    def _create_blocking_indices(self):
-        """Create indices for blocking to reduce comparison space."""
-        logger.info("Creating blocking indices...")
+    def _find_last_name_prefix_matches(self, last_name, first_name_prefix):
+        """
+        Find records with an exact (case-insensitive) last name whose first name starts with a prefix.
         
-        # Last name initial index
-        self.last_initial_index = defaultdict(list)
-        for idx, row in self.dist_list_df.iterrows():
-            if row['last_name_initial']:
-                self.last_initial_index[row['last_name_initial']].append(idx)
-                
-        # First name initial index
-        self.first_initial_index = defaultdict(list)
-        for idx, row in self.dist_list_df.iterrows():
-            if row['first_name_initial']:
-                self.first_initial_index[row['first_name_initial']].append(idx)
-        
-        # Soundex indices
-        self.last_soundex_index = defaultdict(list)
-        for idx, row in self.dist_list_df.iterrows():
-            if row['last_name_soundex']:
-                self.last_soundex_index[row['last_name_soundex']].append(idx)
-        
-        self.first_soundex_index = defaultdict(list)
-        for idx, row in self.dist_list_df.iterrows():
-            if row['first_name_soundex']:
-                self.first_soundex_index[row['first_name_soundex']].append(idx)
-        
-        # First two characters indices (for more precise blocking)
-        self.first_two_chars_index = defaultdict(list)
-        for idx, row in self.dist_list_df.iterrows():
-            if len(row['first_name_std']) >= 2:
-                self.first_two_chars_index[row['first_name_two_chars']].append(idx)
-        
-        self.last_two_chars_index = defaultdict(list)
-        for idx, row in self.dist_list_df.iterrows():
-            if len(row['last_name_std']) >= 2:
-                self.last_two_chars_index[row['last_name_two_chars']].append(idx)
-        
-        # Company word index
-        self.company_word_index = defaultdict(list)
-        for idx, row in self.dist_list_df.iterrows():
-            for word in row['company_words']:
-                if len(word) >= 2:  # Only index words with at least 2 characters
-                    self.company_word_index[word].append(idx)
+        Parameters:
+        -----------
+        last_name : str
+            Last name to match
+        first_name_prefix : str
+            Lowercased prefix the record's first name must start with
+            
+        Returns:
+        --------
+        list
+            Indices of matching records in distribution list order
+        """
+        entry = self.last_name_index.get(str(last_name).lower())
+        if entry is None:
+            return []
+        
+        first_names, indices = entry
+        matches = []
+        for pos in range(bisect.bisect_left(first_names, first_name_prefix), len(first_names)):
+            if not first_names[pos].startswith(first_name_prefix):
+                break
+            matches.append(indices[pos])
+        matches.sort()
+        return matches
     
     def _expand_initial(self, initial):
         """
@@ -1204,10 +4611,10 @@ class EnhancedNameMatcher:
             return []
         
         initial = str(initial)[0].lower()
-        return self.dist_list_df[self.dist_list_df['first_name_initial'] == initial].index.tolist()
-    def _check_exact_match(self, first_name, last_name, company):
+        return self.first_initial_index[initial].tolist()
+    def _prepare_query(self, first_name, last_name, company):
         """
-        Check for exact matches in the distribution list.
+        Standardize an input row once for all matching stages.
         
         Parameters:
         -----------
@@ -1218,36 +4625,58 @@ class EnhancedNameMatcher:
         company : str
             Company name to match
             
+        Returns:
+        --------
+        NameQuery
+            The prepared query
+        """
+        company_std = self._standardize_company(company)
+        return NameQuery(
+            first_name, last_name, company,
+            self._standardize_name(first_name),
+            self._standardize_name(last_name),
+            company_std,
+            self.reference_store.company_ids.get(company_std, -1)
+        )
+    
+    def _check_exact_match(self, query):
+        """
+        Check for exact matches in the distribution list.
+        
+        Parameters:
+        -----------
+        query : NameQuery
+            The prepared input row
+            
         Returns:
         --------
         tuple
             (match_found, match_idx, match_type)
         """
+        first_name, last_name, company = query.first_name, query.last_name, query.company
+        
         # Check for exact first name + last name match
         if first_name and last_name:
-            key = (str(first_name).lower(), str(last_name).lower())
-            if key in self.exact_name_lookup:
-                idx = self.exact_name_lookup[key]
-                return True, idx, "exact_name"
+            matches = self.exact_name_lookup[self._lookup_key(query.first_lower, query.last_lower)]
+            if len(matches):
+                return True, int(matches[0]), "exact_name"
         
         # Check for swapped name match (first name as last name and vice versa)
         if first_name and last_name:
-            key = (str(first_name).lower(), str(last_name).lower())  # Swapped order
-            if key in self.swapped_name_lookup:
-                idx = self.swapped_name_lookup[key]
-                return True, idx, "swapped_name"
+            matches = self.exact_name_lookup[self._lookup_key(query.last_lower, query.first_lower)]
+            if len(matches):
+                return True, int(matches[0]), "swapped_name"
         
         # Check for exact last name + company match
         if last_name and company:
-            std_company = self._standardize_company(company)
+            std_company = query.company_std
             if std_company:
-                key = (str(last_name).lower(), std_company)
-                if key in self.last_name_company_lookup:
+                matches = self.last_name_company_lookup[self._lookup_key(query.last_lower, std_company)].tolist()
+                if matches:
                     # If multiple matches, prefer the one with matching first name if available
-                    matches = self.last_name_company_lookup[key]
                     if first_name and len(matches) > 1:
                         for idx in matches:
-                            if str(self.dist_list_df.loc[idx, 'first_name']).lower() == str(first_name).lower():
+                            if self.reference_store.first_name_lower[idx] == query.first_lower:
                                 return True, idx, "exact_last_name_company_first_name"
                     
                     # Otherwise return the first match
@@ -1255,196 +4684,241 @@ class EnhancedNameMatcher:
         
         # Check for exact first name + company match (for cases with missing last name)
         if first_name and company and not last_name:
-            std_company = self._standardize_company(company)
+            std_company = query.company_std
             if std_company:
-                key = (str(first_name).lower(), std_company)
-                if key in self.first_name_company_lookup:
+                matches = self.first_name_company_lookup[self._lookup_key(query.first_lower, std_company)]
+                if len(matches):
                     # Return the first match
-                    matches = self.first_name_company_lookup[key]
-                    return True, matches[0], "exact_first_name_company"
+                    return True, int(matches[0]), "exact_first_name_company"
         
         # Check for initial + last name + company match
-        if len(str(first_name).strip()) == 1 and last_name and company:
-            std_company = self._standardize_company(company)
+        if query.first_name_is_initial and last_name and company:
+            std_company = query.company_std
             if std_company:
                 # Get all records with matching last name and company
-                key = (str(last_name).lower(), std_company)
-                if key in self.last_name_company_lookup:
-                    matches = self.last_name_company_lookup[key]
+                matches = self.last_name_company_lookup[self._lookup_key(query.last_lower, std_company)].tolist()
+                if matches:
                     # Check if any match has a first name starting with the initial
                     for idx in matches:
-                        dist_first_name = str(self.dist_list_df.loc[idx, 'first_name']).lower()
-                        if dist_first_name.startswith(str(first_name).lower()):
+                        dist_first_name = self.reference_store.first_name_lower[idx]
+                        if dist_first_name.startswith(query.first_lower):
                             return True, idx, "initial_last_name_company"
                 
                 # If no match found with company, try just last name + initial
-                last_name_matches = []
-                for idx, row in self.dist_list_df.iterrows():
-                    if str(row['last_name']).lower() == str(last_name).lower():
-                        last_name_matches.append(idx)
-                
-                for idx in last_name_matches:
-                    dist_first_name = str(self.dist_list_df.loc[idx, 'first_name']).lower()
-                    if dist_first_name.startswith(str(first_name).lower()):
-                        return True, idx, "initial_last_name"
+                initial_matches = self._find_last_name_prefix_matches(last_name, query.first_lower)
+                if initial_matches:
+                    return True, initial_matches[0], "initial_last_name"
         
         return False, None, None
-    def _get_candidate_indices(self, first_name, last_name, company):
+    def _get_candidate_indices(self, query, trace=None):
         """
         Get candidate indices from the distribution list for a given name.
         Uses multiple blocking strategies to reduce comparison space.
         
+        Each candidate keeps the first blocking tier that produced it. When candidates
+        have to be cut, they are ranked by _rank_candidates and the best ranked are kept,
+        up to candidate_budget candidates.
+        
         Parameters:
         -----------
-        first_name : str
-            First name to match
-        last_name : str
-            Last name to match
-        company : str
-            Company name to match
+        query : NameQuery
+            The prepared input row
+        trace : dict, default=None
+            Trace from BlockingDiagnostics.new_trace to record the blocking steps in
             
         Returns:
         --------
-        set
-            Set of candidate indices
+        numpy.ndarray
+            Candidate indices in distribution list order
         """
-        candidates = set()
-        
-        # Standardize input names
-        first_std = self._standardize_name(first_name)
-        last_std = self._standardize_name(last_name)
-        company_std = self._standardize_company(company)
-        
-        # Check if first name is an initial
-        is_first_initial = len(first_std) == 1
-        
-        # Check if last name is an initial
-        is_last_initial = len(last_std) == 1
-        
-        # Get phonetic keys
-        try:
-            first_soundex = jellyfish.soundex(first_std) if first_std and not is_first_initial else ""
-            last_soundex = jellyfish.soundex(last_std) if last_std and not is_last_initial else ""
-        except:
-            first_soundex = ""
-            last_soundex = ""
-        
-        # Get name initials
-        first_initial = first_std[0:1] if first_std else ""
-        last_initial = last_std[0:1] if last_std else ""
+        # Mapping of candidate index to the first blocking tier that produced it
+        candidates = {}
         
-        # Get first two characters (for more precise blocking)
-        first_two_chars = first_std[0:2] if len(first_std) >= 2 else ""
-        last_two_chars = last_std[0:2] if len(last_std) >= 2 else ""
+        def add(indices, tier):
+            nonlocal candidates
+            n_candidates = len(candidates)
+            # Existing entries override the new ones, so earlier tiers are kept
+            candidates = {**dict.fromkeys(indices, tier), **candidates}
+            if trace is not None:
+                trace['steps'].append((tier, len(indices), len(candidates) - n_candidates, 0))
         
-        # Get company words
-        company_words = set(company_std.split()) if company_std else set()
+        first_std, last_std = query.first_std, query.last_std
+        is_first_initial = query.is_first_initial
+        first_soundex, last_soundex = query.first_soundex, query.last_soundex
+        first_initial, last_initial = query.first_initial, query.last_initial
+        first_two_chars, last_two_chars = query.first_two_chars, query.last_two_chars
+        company_words = query.company_words
         
         # Special handling for initial first name
         if is_first_initial and last_std:
-            # First try to find exact matches for last name
-            last_name_matches = []
-            for idx, row in self.dist_list_df.iterrows():
-                if str(row['last_name']).lower() == str(last_name).lower():
-                    last_name_matches.append(idx)
-            
-            # Then filter by first initial
-            initial_matches = []
-            for idx in last_name_matches:
-                dist_first_name = str(self.dist_list_df.loc[idx, 'first_name']).lower()
-                if dist_first_name.startswith(first_initial):
-                    initial_matches.append(idx)
+            # Find exact matches for last name whose first name starts with the initial
+            initial_matches = self._find_last_name_prefix_matches(query.last_name, first_initial)
             
+            add(initial_matches, 0)
             if initial_matches:
-                candidates.update(initial_matches)
                 # If we found good matches, return early to prioritize these
-                if len(candidates) > 0:
-                    return candidates
+                if self.profiler is not None:
+                    self.profiler.count('deepest_blocking_tier', 0)
+                if trace is not None:
+                    trace['tiers'] = candidates
+                return self._cap_candidates(query, candidates)
         
         # Multi-level blocking strategy
         
         # 1. Try most restrictive blocking first (both first and last two chars)
         if first_two_chars and last_two_chars:
-            first_candidates = set(self.first_two_chars_index.get(first_two_chars, []))
-            last_candidates = set(self.last_two_chars_index.get(last_two_chars, []))
-            combined = first_candidates.intersection(last_candidates)
-            if combined:
-                candidates.update(combined)
+            first_candidates = set(self.first_two_chars_index[first_two_chars].tolist())
+            last_candidates = set(self.last_two_chars_index[last_two_chars].tolist())
+            add(first_candidates.intersection(last_candidates), 1)
         
         # 2. If not enough candidates, try soundex blocking
         if len(candidates) < 50 and first_soundex and last_soundex:
-            first_candidates = set(self.first_soundex_index.get(first_soundex, []))
-            last_candidates = set(self.last_soundex_index.get(last_soundex, []))
-            combined = first_candidates.intersection(last_candidates)
-            if combined:
-                candidates.update(combined)
+            first_candidates = set(self.first_soundex_index[first_soundex].tolist())
+            last_candidates = set(self.last_soundex_index[last_soundex].tolist())
+            add(first_candidates.intersection(last_candidates), 2)
         
         # 3. If still not enough candidates, try last name initial + first name soundex
         if len(candidates) < 50 and last_initial and first_soundex:
-            last_candidates = set(self.last_initial_index.get(last_initial, []))
-            first_candidates = set(self.first_soundex_index.get(first_soundex, []))
-            combined = last_candidates.intersection(first_candidates)
-            if combined:
-                candidates.update(combined)
+            last_candidates = set(self.last_initial_index[last_initial].tolist())
+            first_candidates = set(self.first_soundex_index[first_soundex].tolist())
+            add(last_candidates.intersection(first_candidates), 3)
         
         # 4. If still not enough candidates, try first name initial + last name soundex
         if len(candidates) < 50 and first_initial and last_soundex:
-            first_candidates = set(self.first_initial_index.get(first_initial, []))
-            last_candidates = set(self.last_soundex_index.get(last_soundex, []))
-            combined = first_candidates.intersection(last_candidates)
-            if combined:
-                candidates.update(combined)
+            first_candidates = set(self.first_initial_index[first_initial].tolist())
+            last_candidates = set(self.last_soundex_index[last_soundex].tolist())
+            add(first_candidates.intersection(last_candidates), 4)
         
-        # 5. If still not enough candidates, use just last name initial
+        # 5. If still not enough candidates, find last names a typo away by shared trigrams
+        if len(candidates) < 50 and last_std and not query.is_last_initial:
+            add(self.last_name_ngram_index.search(last_std).tolist(), 5)
+        
+        # 6. If still not enough candidates, use just last name initial
         if len(candidates) < 50 and last_initial:
-            candidates.update(self.last_initial_index.get(last_initial, []))
+            add(self.last_initial_index[last_initial].tolist(), 6)
         
-        # 6. If still not enough candidates, use just first name initial
+        # 7. If still not enough candidates, use just first name initial
         if len(candidates) < 50 and first_initial:
-            candidates.update(self.first_initial_index.get(first_initial, []))
+            add(self.first_initial_index[first_initial].tolist(), 7)
         
-        # 7. Handle first name initial
+        # 8. Handle first name initial
         if is_first_initial:
             initial_candidates = set(self._expand_initial(first_std))
             if last_initial:
-                last_candidates = set(self.last_initial_index.get(last_initial, []))
+                last_candidates = set(self.last_initial_index[last_initial].tolist())
                 initial_candidates = initial_candidates.intersection(last_candidates)
-            candidates.update(initial_candidates)
+            add(initial_candidates, 8)
         
-        # 8. Use company words to find additional candidates
+        # 9. Use company words to find additional candidates
         if len(candidates) < 100 and company_words:
             company_candidates = set()
             for word in company_words:
                 if len(word) >= 2:  # Only use words with at least 2 characters
-                    company_candidates.update(self.company_word_index.get(word, []))
+                    company_candidates.update(self.company_word_index[word].tolist())
             
             # If we have both company candidates and name candidates, prioritize their intersection
             if company_candidates and candidates:
                 intersection = company_candidates.intersection(candidates)
+                n_candidates = len(candidates)
                 if intersection:
-                    # Prioritize the intersection but keep some other candidates
-                    candidates = intersection.union(set(list(candidates)[:50]))
+                    # Prioritize the intersection but keep the best ranked other candidates
+                    keep = intersection.union(self._rank_candidates(query, candidates)[:50].tolist())
+                    candidates = {idx: tier for idx, tier in candidates.items() if idx in keep}
+                if trace is not None:
+                    trace['steps'].append((9, len(company_candidates), 0, n_candidates - len(candidates)))
             elif company_candidates:
-                candidates.update(company_candidates)
+                add(company_candidates, 9)
+            elif trace is not None:
+                trace['steps'].append((9, 0, 0, 0))
         
-        # 9. If no candidates found, use last name soundex as fallback
+        # 10. If no candidates found, use last name soundex as fallback
         if not candidates and last_soundex:
-            candidates.update(self.last_soundex_index.get(last_soundex, []))
+            add(self.last_soundex_index[last_soundex].tolist(), 10)
         
-        # 10. If still no candidates, use first name soundex as fallback
+        # 11. If still no candidates, use first name soundex as fallback
         if not candidates and first_soundex:
-            candidates.update(self.first_soundex_index.get(first_soundex, []))
+            add(self.first_soundex_index[first_soundex].tolist(), 11)
+        
+        # 12. If still no candidates, find first names or companies a typo away by shared trigrams
+        if not candidates and first_std and not is_first_initial:
+            add(self.first_name_ngram_index.search(first_std).tolist(), 12)
+        if not candidates and query.company_std:
+            add(self.company_ngram_index.search(query.company_std).tolist(), 12)
         
-        # 11. If still no candidates, return a limited set of random indices as last resort
+        # 13. If still no candidates, spread a fixed sample evenly over the distribution list
         if not candidates:
-            # Return a random sample of indices to avoid comparing against the entire dataset
-            candidates = set(np.random.choice(len(self.dist_list_df), min(500, len(self.dist_list_df)), replace=False))
+            n_records = len(self.reference_store)
+            sample = np.unique(np.linspace(0, n_records - 1, num=min(FALLBACK_SAMPLE_SIZE, n_records), dtype=np.int64))
+            add([idx for idx in sample.tolist() if idx not in self.deleted_records], 13)
+        
+        if self.profiler is not None:
+            self.profiler.count('deepest_blocking_tier', max(candidates.values(), default='none'))
+        if trace is not None:
+            trace['tiers'] = candidates
         
         # Limit the number of candidates to prevent performance issues
-        if len(candidates) > 1000:
-            candidates = set(list(candidates)[:1000])
+        return self._cap_candidates(query, candidates)
+    
+    def _rank_candidates(self, query, candidates):
+        """
+        Rank candidates by how many of the query's blocking keys they agree with, then
+        by the blocking tier that produced them, then by distribution list order.
+        
+        The blocking keys are the first and last name two-character prefixes, soundex
+        codes and initials, and the standardized company.
+        
+        Parameters:
+        -----------
+        query : NameQuery
+            The prepared input row
+        candidates : dict
+            Mapping of candidate index to blocking tier
+            
+        Returns:
+        --------
+        numpy.ndarray
+            Candidate indices, best ranked first
+        """
+        store = self.reference_store
+        indices = np.fromiter(candidates.keys(), dtype=np.int64, count=len(candidates))
+        tiers = np.fromiter(candidates.values(), dtype=np.int64, count=len(candidates))
+        
+        agreements = np.zeros(len(indices), dtype=np.int64)
+        for query_key, reference_keys in (
+            (query.first_two_chars, store.first_name_two_chars),
+            (query.last_two_chars, store.last_name_two_chars),
+            (query.first_soundex, store.first_name_soundex),
+            (query.last_soundex, store.last_name_soundex),
+            (query.first_initial, store.first_name_initial),
+            (query.last_initial, store.last_name_initial)
+        ):
+            if query_key:
+                agreements += reference_keys[indices] == query_key
+        if query.company_id >= 0:
+            agreements += store.company_id[indices] == query.company_id
         
-        return candidates
+        return indices[np.lexsort((indices, tiers, -agreements))]
+    
+    def _cap_candidates(self, query, candidates):
+        """
+        Keep the candidate_budget best ranked candidates.
+        
+        Parameters:
+        -----------
+        query : NameQuery
+            The prepared input row
+        candidates : dict
+            Mapping of candidate index to blocking tier
+            
+        Returns:
+        --------
+        numpy.ndarray
+            The kept candidate indices in distribution list order
+        """
+        if len(candidates) > self.candidate_budget:
+            return np.sort(self._rank_candidates(query, candidates)[:self.candidate_budget])
+        return np.sort(np.fromiter(candidates.keys(), dtype=np.int64, count=len(candidates)))
+    
     def _calculate_similarity_scores(self, first_name, last_name, company, candidate_idx):
         """
         Calculate similarity scores between input name and a candidate.
@@ -1465,131 +4939,423 @@ class EnhancedNameMatcher:
         dict
             Dictionary of similarity scores
         """
-        candidate = self.dist_list_df.iloc[candidate_idx]
+        batch_scores = self._calculate_similarity_scores_batch(
+            self._prepare_query(first_name, last_name, company), [candidate_idx]
+        )
+        return self._build_candidate_result(batch_scores, 0)
+    
+    @staticmethod
+    def _batch_similarity(query, choices, scorer):
+        """
+        Score one query string against a block of choices with a rapidfuzz batch kernel.
         
-        # Standardize input names
-        first_std = self._standardize_name(first_name)
-        last_std = self._standardize_name(last_name)
-        company_std = self._standardize_company(company)
+        Parameters:
+        -----------
+        query : str
+            The query string
+        choices : numpy.ndarray
+            Array of candidate strings
+        scorer : callable
+            rapidfuzz scorer to apply
+            
+        Returns:
+        --------
+        numpy.ndarray
+            Array of float64 scores aligned with choices
+        """
+        if not query or len(choices) == 0:
+            return np.zeros(len(choices), dtype=np.float64)
+        return process.cdist([query], choices, scorer=scorer, dtype=np.float64)[0]
+    
+    def _calculate_similarity_scores_batch(self, query, candidate_indices):
+        """
+        Calculate similarity scores between input name and a block of candidates.
+        Every metric is computed as a NumPy array with rapidfuzz batch kernels, and the
+        composite weights are applied as vector operations.
+        
+        Parameters:
+        -----------
+        query : NameQuery
+            The prepared input row
+        candidate_indices : list
+            Positional indices of candidates in distribution list
+            
+        Returns:
+        --------
+        dict
+            Dictionary of score arrays aligned with candidate_indices
+        """
+        bound_scores = self._calculate_score_bounds(query, candidate_indices)
+        return self._complete_similarity_scores(query, bound_scores, np.arange(len(bound_scores['candidate_idx'])))
+    
+    def _calculate_score_bounds(self, query, candidate_indices):
+        """
+        First stage of the cascade scorer: compute the cheap metrics of a block of
+        candidates and an upper bound of each candidate's composite score.
+        
+        Jaro-Winkler, exact match, company and initial metrics are computed exactly.
+        Levenshtein and token sort similarities are bounded by the string lengths alone:
+        the edit distance is at least the length difference, and the common subsequence
+        is at most the shorter length.
+        
+        Parameters:
+        -----------
+        query : NameQuery
+            The prepared input row
+        candidate_indices : list
+            Positional indices of candidates in distribution list
+            
+        Returns:
+        --------
+        dict
+            Metric arrays aligned with candidate_indices, including 'composite_bound'
+        """
+        candidate_indices = np.asarray(candidate_indices, dtype=np.int64)
+        n_candidates = len(candidate_indices)
+        
+        first_std, last_std, company_std = query.first_std, query.last_std, query.company_std
         
         # Get candidate standardized names
-        candidate_first_std = candidate['first_name_std']
-        candidate_last_std = candidate['last_name_std']
-        candidate_company_std = candidate['company_std']
+        store = self.reference_store
+        candidate_first_std = store.first_name_std[candidate_indices]
+        candidate_last_std = store.last_name_std[candidate_indices]
+        
+        # Company metrics are computed once per distinct candidate company
+        block_company_ids, candidate_company_pos = np.unique(store.company_id[candidate_indices], return_inverse=True)
+        block_company_std = store.company_values[block_company_ids]
+        
+        candidate_first_len = np.fromiter(map(len, candidate_first_std), dtype=np.int64, count=n_candidates)
+        candidate_last_len = np.fromiter(map(len, candidate_last_std), dtype=np.int64, count=n_candidates)
+        has_candidate_first = candidate_first_len > 0
+        has_candidate_last = candidate_last_len > 0
         
-        # Calculate various similarity metrics
-        scores = {}
+        scores = {
+            'candidate_idx': candidate_indices,
+            'candidate_first_std': candidate_first_std,
+            'candidate_last_std': candidate_last_std,
+            'candidate_first_len': candidate_first_len,
+            'candidate_last_len': candidate_last_len
+        }
         
         # Exact match checks (with higher weights)
-        scores['exact_first_match'] = 1.0 if first_std and first_std == candidate_first_std else 0.0
-        scores['exact_last_match'] = 1.0 if last_std and last_std == candidate_last_std else 0.0
-        scores['exact_company_match'] = 1.0 if company_std and company_std == candidate_company_std else 0.0
+        scores['exact_first_match'] = ((candidate_first_std == first_std) & bool(first_std)).astype(np.float64)
+        scores['exact_last_match'] = ((candidate_last_std == last_std) & bool(last_std)).astype(np.float64)
+        scores['exact_company_match'] = ((block_company_ids == query.company_id) & bool(company_std)).astype(np.float64)[candidate_company_pos]
         
         # Jaro-Winkler similarity (good for names)
-        scores['first_jaro'] = jellyfish.jaro_winkler_similarity(first_std, candidate_first_std) if first_std and candidate_first_std else 0
-        scores['last_jaro'] = jellyfish.jaro_winkler_similarity(last_std, candidate_last_std) if last_std and candidate_last_std else 0
+        scores['first_jaro'] = np.where(
+            has_candidate_first, self._batch_similarity(first_std, candidate_first_std, JaroWinkler.normalized_similarity), 0.0
+        )
+        scores['last_jaro'] = np.where(
+            has_candidate_last, self._batch_similarity(last_std, candidate_last_std, JaroWinkler.normalized_similarity), 0.0
+        )
         
         # Company similarity
-        if company_std and candidate_company_std:
-            scores['company_jaro'] = jellyfish.jaro_winkler_similarity(company_std, candidate_company_std)
+        if company_std:
+            has_block_company = np.fromiter(map(bool, block_company_std), dtype=bool, count=len(block_company_std))
+            company_jaro = np.where(
+                has_block_company,
+                self._batch_similarity(company_std, block_company_std, JaroWinkler.normalized_similarity),
+                0.0
+            )
+            scores['company_jaro'] = company_jaro[candidate_company_pos]
             
             # Check for company word overlap
-            company_words = set(company_std.split())
-            candidate_company_words = set(candidate_company_std.split())
-            if company_words and candidate_company_words:
-                overlap = len(company_words.intersection(candidate_company_words))
-                total = len(company_words.union(candidate_company_words))
-                scores['company_word_overlap'] = overlap / total if total > 0 else 0
-            else:
-                scores['company_word_overlap'] = 0
+            company_words = query.company_words
+            company_word_overlap = np.fromiter(
+                (
+                    len(company_words & words) / len(company_words | words) if company_words and words else 0.0
+                    for words in (store.company_word_sets[company_id] for company_id in block_company_ids)
+                ),
+                dtype=np.float64,
+                count=len(block_company_ids)
+            )
+            scores['company_word_overlap'] = company_word_overlap[candidate_company_pos]
+        else:
+            scores['company_jaro'] = np.zeros(n_candidates, dtype=np.float64)
+            scores['company_word_overlap'] = np.zeros(n_candidates, dtype=np.float64)
+        
+        # Handle first name initial case
+        if len(first_std) == 1:
+            scores['first_initial_match'] = (store.first_name_initial[candidate_indices] == first_std).astype(np.float64)
+        else:
+            scores['first_initial_match'] = np.zeros(n_candidates, dtype=np.float64)
+        
+        # Handle last name initial case
+        if len(last_std) == 1:
+            scores['last_initial_match'] = (store.last_name_initial[candidate_indices] == last_std).astype(np.float64)
         else:
-            scores['company_jaro'] = 0
-            scores['company_word_overlap'] = 0
+            scores['last_initial_match'] = np.zeros(n_candidates, dtype=np.float64)
+        
+        # Check for name order confusion (first/last swapped)
+        swapped_first_jaro = np.where(
+            has_candidate_last, self._batch_similarity(first_std, candidate_last_std, JaroWinkler.normalized_similarity), 0.0
+        )
+        swapped_last_jaro = np.where(
+            has_candidate_first, self._batch_similarity(last_std, candidate_first_std, JaroWinkler.normalized_similarity), 0.0
+        )
+        
+        if first_std and last_std:
+            normal_name_score = (scores['first_jaro'] + scores['last_jaro']) / 2
+            swapped_name_score = (swapped_first_jaro + swapped_last_jaro) / 2
+        else:
+            normal_name_score = np.zeros(n_candidates, dtype=np.float64)
+            swapped_name_score = np.zeros(n_candidates, dtype=np.float64)
+        
+        scores['possible_swap'] = swapped_name_score > normal_name_score
+        scores['swapped_score'] = swapped_name_score
+        
+        # If names are likely swapped and the swapped score is high, use swapped score
+        scores['use_swapped'] = scores['possible_swap'] & (swapped_name_score > 0.8)
+        scores['swapped_composite'] = (
+            0.3 * swapped_last_jaro +  # Original last name matched against candidate first name
+            0.3 * swapped_first_jaro +  # Original first name matched against candidate last name
+            0.1 * scores['company_jaro'] +
+            0.1 * scores['company_word_overlap'] +
+            0.1 * scores['exact_company_match']
+        )
+        
+        # Upper bounds of the normalized Levenshtein and token sort similarities
+        def length_bounds(query_len, candidate_len, has_candidate):
+            if not query_len:
+                return np.zeros(n_candidates, dtype=np.float64), np.zeros(n_candidates, dtype=np.float64)
+            shorter = np.minimum(query_len, candidate_len)
+            lev_bound = np.where(has_candidate, shorter / np.maximum(np.maximum(query_len, candidate_len), 1), 0.0)
+            ngram_bound = np.where(has_candidate, 2 * shorter / np.maximum(query_len + candidate_len, 1), 0.0)
+            return lev_bound, ngram_bound
+        
+        first_lev_bound, first_ngram_bound = length_bounds(len(first_std), candidate_first_len, has_candidate_first)
+        last_lev_bound, last_ngram_bound = length_bounds(len(last_std), candidate_last_len, has_candidate_last)
+        normal_bound = (
+            0.25 * scores['last_jaro'] +
+            0.15 * last_lev_bound +
+            0.15 * last_ngram_bound +
+            0.15 * scores['first_jaro'] +
+            0.05 * first_lev_bound +
+            0.05 * first_ngram_bound +
+            0.05 * scores['company_jaro'] +
+            0.05 * scores['company_word_overlap'] +
+            0.2 * scores['exact_last_match'] +
+            0.1 * scores['exact_first_match'] +
+            0.05 * scores['exact_company_match']
+        )
+        composite_bound = np.where(scores['use_swapped'], scores['swapped_composite'], normal_bound)
+        composite_bound = composite_bound + 0.05 * (scores['first_initial_match'] > 0) + 0.05 * (scores['last_initial_match'] > 0)
+        # Allow for floating point rounding in the exact scores
+        scores['composite_bound'] = np.minimum(1.0, composite_bound) + SCORE_BOUND_TOLERANCE
+        
+        return scores
+    
+    def _complete_similarity_scores(self, query, bound_scores, positions):
+        """
+        Second stage of the cascade scorer: compute the expensive metrics and the exact
+        composite score for selected candidates of a block.
+        
+        Parameters:
+        -----------
+        query : NameQuery
+            The prepared input row
+        bound_scores : dict
+            Metric arrays returned by _calculate_score_bounds
+        positions : numpy.ndarray
+            Positions of the candidates to score within the block
+            
+        Returns:
+        --------
+        dict
+            Dictionary of score arrays aligned with positions
+        """
+        first_std, last_std = query.first_std, query.last_std
+        n_candidates = len(positions)
+        candidate_first_std = bound_scores['candidate_first_std'][positions]
+        candidate_last_std = bound_scores['candidate_last_std'][positions]
+        candidate_first_len = bound_scores['candidate_first_len'][positions]
+        candidate_last_len = bound_scores['candidate_last_len'][positions]
+        has_candidate_first = candidate_first_len > 0
+        has_candidate_last = candidate_last_len > 0
+        
+        scores = {
+            name: bound_scores[name][positions]
+            for name in (
+                'candidate_idx', 'exact_first_match', 'exact_last_match', 'exact_company_match',
+                'first_jaro', 'last_jaro', 'company_jaro', 'company_word_overlap'
+            )
+        }
         
         # Levenshtein distance (normalized)
-        if first_std and candidate_first_std:
-            lev_dist = jellyfish.levenshtein_distance(first_std, candidate_first_std)
-            max_len = max(len(first_std), len(candidate_first_std))
-            scores['first_lev'] = 1 - (lev_dist / max_len) if max_len > 0 else 0
+        if first_std:
+            lev_dist = self._batch_similarity(first_std, candidate_first_std, Levenshtein.distance)
+            max_len = np.maximum(len(first_std), candidate_first_len)
+            scores['first_lev'] = np.where(has_candidate_first, 1 - lev_dist / np.maximum(max_len, 1), 0.0)
         else:
-            scores['first_lev'] = 0
-            
-        if last_std and candidate_last_std:
-            lev_dist = jellyfish.levenshtein_distance(last_std, candidate_last_std)
-            max_len = max(len(last_std), len(candidate_last_std))
-            scores['last_lev'] = 1 - (lev_dist / max_len) if max_len > 0 else 0
+            scores['first_lev'] = np.zeros(n_candidates, dtype=np.float64)
+        
+        if last_std:
+            lev_dist = self._batch_similarity(last_std, candidate_last_std, Levenshtein.distance)
+            max_len = np.maximum(len(last_std), candidate_last_len)
+            scores['last_lev'] = np.where(has_candidate_last, 1 - lev_dist / np.maximum(max_len, 1), 0.0)
         else:
-            scores['last_lev'] = 0
+            scores['last_lev'] = np.zeros(n_candidates, dtype=np.float64)
         
         # N-gram similarity (using rapidfuzz)
-        scores['first_ngram'] = fuzz.token_sort_ratio(first_std, candidate_first_std) / 100 if first_std and candidate_first_std else 0
-        scores['last_ngram'] = fuzz.token_sort_ratio(last_std, candidate_last_std) / 100 if last_std and candidate_last_std else 0
+        scores['first_ngram'] = np.where(
+            has_candidate_first, self._batch_similarity(first_std, candidate_first_std, fuzz.token_sort_ratio) / 100, 0.0
+        )
+        scores['last_ngram'] = np.where(
+            has_candidate_last, self._batch_similarity(last_std, candidate_last_std, fuzz.token_sort_ratio) / 100, 0.0
+        )
         
-        # Handle first name initial case
-        if len(first_std) == 1 and candidate_first_std and candidate_first_std.startswith(first_std):
-            scores['first_initial_match'] = 1.0
-        else:
-            scores['first_initial_match'] = 0.0
+        for name in ('first_initial_match', 'last_initial_match', 'possible_swap', 'swapped_score'):
+            scores[name] = bound_scores[name][positions]
         
-        # Handle last name initial case
-        if len(last_std) == 1 and candidate_last_std and candidate_last_std.startswith(last_std):
-            scores['last_initial_match'] = 1.0
-        else:
-            scores['last_initial_match'] = 0.0
+        # Calculate composite score with weights
+        # Last name is weighted more heavily than first name
+        # Exact matches get higher weights
+        # Normal scoring
+        normal_composite = (
+            0.25 * scores['last_jaro'] +
+            0.15 * scores['last_lev'] +
+            0.15 * scores['last_ngram'] +
+            0.15 * scores['first_jaro'] +
+            0.05 * scores['first_lev'] +
+            0.05 * scores['first_ngram'] +
+            0.05 * scores['company_jaro'] +
+            0.05 * scores['company_word_overlap'] +
+            0.2 * scores['exact_last_match'] +  # Bonus for exact last name match
+            0.1 * scores['exact_first_match'] +  # Bonus for exact first name match
+            0.05 * scores['exact_company_match']  # Bonus for exact company match
+        )
+        composite_score = np.where(
+            bound_scores['use_swapped'][positions], bound_scores['swapped_composite'][positions], normal_composite
+        )
         
-        # Check for name order confusion (first/last swapped)
-        swapped_first_jaro = jellyfish.jaro_winkler_similarity(first_std, candidate_last_std) if first_std and candidate_last_std else 0
-        swapped_last_jaro = jellyfish.jaro_winkler_similarity(last_std, candidate_first_std) if last_std and candidate_first_std else 0
+        # Boost score for initial matches
+        composite_score = np.where(scores['first_initial_match'] > 0, np.minimum(1.0, composite_score + 0.05), composite_score)
+        composite_score = np.where(scores['last_initial_match'] > 0, np.minimum(1.0, composite_score + 0.05), composite_score)
         
-        normal_name_score = (scores['first_jaro'] + scores['last_jaro']) / 2 if first_std and last_std else 0
-        swapped_name_score = (swapped_first_jaro + swapped_last_jaro) / 2 if first_std and last_std else 0
+        # Cap the composite score at 1.0
+        scores['composite'] = np.minimum(1.0, composite_score)
         
-        scores['possible_swap'] = swapped_name_score > normal_name_score
-        scores['swapped_score'] = swapped_name_score
+        return scores
+    
+    def _score_candidates(self, query, candidate_indices, top_n, min_score):
+        """
+        Score a block of candidates with the cascade scorer, skipping candidates that
+        cannot reach the top_n results.
         
-        # Calculate composite score with weights
-        # Last name is weighted more heavily than first name
-        # Exact matches get higher weights
-        if scores['possible_swap'] and swapped_name_score > 0.8:
-            # If names are likely swapped and the swapped score is high, use swapped score
-            composite_score = (
-                0.3 * swapped_last_jaro +  # Original last name matched against candidate first name
-                0.3 * swapped_first_jaro +  # Original first name matched against candidate last name
-                0.1 * scores['company_jaro'] +
-                0.1 * scores['company_word_overlap'] +
-                0.1 * scores['exact_company_match']
-            )
+        Exact scores are first computed for the candidates with the highest bounds. The
+        top_n-th best of those is a lower bound of the final top_n-th best score, so every
+        candidate whose bound is below it is pruned. If no candidate can reach
+        min_score, the block is pruned entirely, since match_name would discard it.
+        The best top_n candidates and their order are the same as with full scoring.
+        
+        Parameters:
+        -----------
+        query : NameQuery
+            The prepared input row
+        candidate_indices : list
+            Positional indices of candidates in distribution list
+        top_n : int
+            Number of top candidates that must be scored exactly
+        min_score : float
+            Lowest composite score match_name reports as a match
+            
+        Returns:
+        --------
+        dict
+            Score arrays of the scored candidates, in candidate_indices order
+        """
+        bound_scores = self._calculate_score_bounds(query, candidate_indices)
+        bounds = bound_scores['composite_bound']
+        n_candidates = len(bounds)
+        top_n = max(1, top_n)
+        
+        seed_count = max(top_n, PRUNING_SEED_SIZE)
+        
+        if n_candidates and bounds.max() < min_score:
+            scores = self._complete_similarity_scores(query, bound_scores, np.arange(0))
+        elif n_candidates <= seed_count:
+            scores = self._complete_similarity_scores(query, bound_scores, np.arange(n_candidates))
         else:
-            # Normal scoring
-            composite_score = (
-                0.25 * scores['last_jaro'] +
-                0.15 * scores['last_lev'] +
-                0.15 * scores['last_ngram'] +
-                0.15 * scores['first_jaro'] +
-                0.05 * scores['first_lev'] +
-                0.05 * scores['first_ngram'] +
-                0.05 * scores['company_jaro'] +
-                0.05 * scores['company_word_overlap'] +
-                0.2 * scores['exact_last_match'] +  # Bonus for exact last name match
-                0.1 * scores['exact_first_match'] +  # Bonus for exact first name match
-                0.05 * scores['exact_company_match']  # Bonus for exact company match
-            )
+            # Score the most promising candidates to find the score to beat
+            seed = np.sort(np.argpartition(-bounds, seed_count - 1)[:seed_count])
+            scores = self._complete_similarity_scores(query, bound_scores, seed)
+            seed_composite = scores['composite']
+            score_to_beat = np.partition(seed_composite, seed_count - top_n)[seed_count - top_n]
+            
+            is_seed = np.zeros(n_candidates, dtype=bool)
+            is_seed[seed] = True
+            survivors = np.flatnonzero(~is_seed & (bounds >= score_to_beat))
+            if seed_composite.max() < min_score and not (bounds[survivors] >= min_score).any():
+                # Nothing can reach min_score; match_name discards the block
+                survivors = survivors[:0]
+            
+            if len(survivors):
+                survivor_scores = self._complete_similarity_scores(query, bound_scores, survivors)
+                order = np.argsort(np.concatenate([seed, survivors]), kind='stable')
+                scores = {name: np.concatenate([scores[name], survivor_scores[name]])[order] for name in scores}
         
-        # Boost score for initial matches
-        if scores['first_initial_match'] > 0:
-            composite_score = min(1.0, composite_score + 0.05)
+        scored = len(scores['candidate_idx'])
+        self.pruning_stats['scored'] += scored
+        self.pruning_stats['pruned'] += n_candidates - scored
+        return scores
+    
+    @staticmethod
+    def _top_positions(scores, top_n):
+        """
+        Select the positions of the top_n highest scores without sorting the whole block.
         
-        if scores['last_initial_match'] > 0:
-            composite_score = min(1.0, composite_score + 0.05)
+        Parameters:
+        -----------
+        scores : numpy.ndarray
+            Composite scores of a block of candidates
+        top_n : int
+            Number of positions to select
+            
+        Returns:
+        --------
+        numpy.ndarray
+            Positions of the top_n scores in descending score order; tied scores
+            keep their block order, as with a stable sort
+        """
+        if top_n <= 0:
+            return np.arange(0)
+        if len(scores) <= top_n:
+            return np.argsort(-scores, kind='stable')
         
-        # Cap the composite score at 1.0
-        scores['composite'] = min(1.0, composite_score)
+        # Every score tied with the top_n-th best stays in contention for the tie break
+        kth_best = -np.partition(-scores, top_n - 1)[top_n - 1]
+        contenders = np.flatnonzero(scores >= kth_best)
+        return contenders[np.argsort(-scores[contenders], kind='stable')[:top_n]]
+    
+    def _build_candidate_result(self, batch_scores, position):
+        """
+        Build the result dictionary for one candidate of a scored block.
         
+        Parameters:
+        -----------
+        batch_scores : dict
+            Score arrays returned by _calculate_similarity_scores_batch
+        position : int
+            Position of the candidate within the block
+            
+        Returns:
+        --------
+        dict
+            Dictionary with the candidate's names and similarity scores
+        """
+        candidate_idx = int(batch_scores['candidate_idx'][position])
+        candidate_first_name, candidate_last_name, candidate_company = self.reference_store.record(candidate_idx)
+        scores = {
+            name: (bool(values[position]) if name == 'possible_swap' else float(values[position]))
+            for name, values in batch_scores.items()
+            if name != 'candidate_idx'
+        }
         return {
             'candidate_idx': candidate_idx,
-            'first_name': candidate['first_name'],
-            'last_name': candidate['last_name'],
-            'company': candidate['company'],
+            'first_name': candidate_first_name,
+            'last_name': candidate_last_name,
+            'company': candidate_company,
             'scores': scores
         }
     def match_name(self, first_name, last_name, company, threshold=0.95, medium_threshold=0.80, top_n=3):
@@ -1616,8 +5382,15 @@ class EnhancedNameMatcher:
         dict
             Dictionary containing match results
         """
+        profiler = self.profiler
+        if profiler is not None:
+            stage_start = time.perf_counter()
+        
         # Skip matching if company is empty or None
         if not company or pd.isna(company) or str(company).strip() == "":
+            if profiler is not None:
+                profiler.count('match_types', 'no_company')
+                profiler.count('confidence', 'no_match')
             return {
                 'input_first_name': first_name,
                 'input_last_name': last_name,
@@ -1626,17 +5399,25 @@ class EnhancedNameMatcher:
                 'confidence': 'no_match',  # Using 'no_match' to indicate we're preserving original
                 'top_candidates': []
             }
+        # Standardize the input once for all matching stages
+        query = self._prepare_query(first_name, last_name, company)
+        if profiler is not None:
+            stage_start = profiler.lap('prepare_query', stage_start)
+        
         # First check for exact matches
-        exact_match_found, exact_match_idx, exact_match_type = self._check_exact_match(first_name, last_name, company)
+        exact_match_found, exact_match_idx, exact_match_type = self._check_exact_match(query)
+        if profiler is not None:
+            stage_start = profiler.lap('exact_lookup', stage_start)
+            profiler.count('match_types', exact_match_type if exact_match_found else 'fuzzy')
         
         if exact_match_found:
             # Create a match result with perfect score for exact match
-            candidate = self.dist_list_df.iloc[exact_match_idx]
+            candidate_first_name, candidate_last_name, _ = self.reference_store.record(exact_match_idx)
             best_match = {
                 'candidate_idx': exact_match_idx,
-                'first_name': candidate['first_name'],
-                'last_name': candidate['last_name'],
-                'company': self._standardize_company(company), #keep original company name
+                'first_name': candidate_first_name,
+                'last_name': candidate_last_name,
+                'company': query.company_std, #keep original company name
                 'scores': {
                     'composite': 1.0,
                     'exact_match': True,
@@ -1644,6 +5425,9 @@ class EnhancedNameMatcher:
                     'possible_swap': exact_match_type == "swapped_name"
                 }
             }
+            if profiler is not None:
+                profiler.lap('result_building', stage_start)
+                profiler.count('confidence', 'high')
             
             return {
                 'input_first_name': first_name,
@@ -1656,21 +5440,31 @@ class EnhancedNameMatcher:
         
         # If no exact match, proceed with fuzzy matching
         # Get candidate indices
-        candidate_indices = self._get_candidate_indices(first_name, last_name, company)
-        
-        # Calculate similarity scores for all candidates
-        candidates = []
-        for idx in candidate_indices:
-            candidate = self._calculate_similarity_scores(first_name, last_name, company, idx)
-            #keep original company name
-            candidate['company'] = self._standardize_company(company)
-            candidates.append(candidate)
+        diagnostics = self.blocking_diagnostics
+        trace = diagnostics.new_trace() if diagnostics is not None else None
+        candidate_indices = self._get_candidate_indices(query, trace)
+        if profiler is not None:
+            stage_start = profiler.lap('candidate_generation', stage_start)
         
-        # Sort candidates by composite score
-        candidates.sort(key=lambda x: x['scores']['composite'], reverse=True)
+        # Calculate similarity scores, pruning candidates that cannot make the top N.
+        # A match is reported above either threshold, so prune only below the lower one
+        min_score = min(threshold, medium_threshold)
+        batch_scores = self._score_candidates(query, candidate_indices, top_n, min_score)
+        if profiler is not None:
+            stage_start = profiler.lap('scoring', stage_start)
+            scored = len(batch_scores['candidate_idx'])
+            profiler.count('candidates', 'generated', len(candidate_indices))
+            profiler.count('candidates', 'scored', scored)
+            profiler.count('candidates', 'pruned', len(candidate_indices) - scored)
         
-        # Take top N candidates
-        top_candidates = candidates[:top_n]
+        # Select the top N candidates by composite score
+        top_positions = self._top_positions(batch_scores['composite'], top_n)
+        top_candidates = []
+        for position in top_positions:
+            candidate = self._build_candidate_result(batch_scores, position)
+            #keep original company name
+            candidate['company'] = query.company_std
+            top_candidates.append(candidate)
         
         # Determine confidence level
         if not top_candidates:
@@ -1691,6 +5485,14 @@ class EnhancedNameMatcher:
                 best_match = None
                 top_candidates = []
         
+        if profiler is not None:
+            profiler.lap('result_building', stage_start)
+            profiler.count('confidence', confidence)
+        if diagnostics is not None:
+            diagnostics.record(
+                trace, len(candidate_indices), best_match['candidate_idx'] if best_match else None, confidence
+            )
+        
         return {
             'input_first_name': first_name,
             'input_last_name': last_name,
@@ -1701,7 +5503,102 @@ class EnhancedNameMatcher:
         }
 
 
-    def correct_names_df(self, df, threshold=0.95, medium_threshold=0.80, batch_size=1000):
+    def _match_key(self, first_name, last_name, company):
+        """
+        Build the deduplication key of an input row.
+        
+        Rows with the same key get the same match: names are compared case-insensitively
+        by every matching stage, and the company only enters matching in standardized form.
+        
+        Parameters:
+        -----------
+        first_name : str
+            First name to match
+        last_name : str
+            Last name to match
+        company : str
+            Company name to match
+            
+        Returns:
+        --------
+        tuple
+            Hashable key for the row
+        """
+        def name_key(name):
+            return name.lower() if isinstance(name, str) else (type(name).__name__, name)
+        
+        return name_key(first_name), name_key(last_name), self._standardize_company(company)
+    
+    def _match_outcome(self, first_name, last_name, company, threshold, medium_threshold):
+        """
+        Match a single input row with a non-empty company.
+        
+        Parameters:
+        -----------
+        first_name : str
+            First name to match
+        last_name : str
+            Last name to match
+        company : str
+            Company name to match
+        threshold : float
+            Threshold for considering a match as high confidence
+        medium_threshold : float
+            Threshold for considering a match as medium confidence
+            
+        Returns:
+        --------
+        tuple or None
+            (first_name, last_name, match_confidence, composite_score, possible_name_swap)
+            of the best match, or None if no good match was found
+        """
+        match = self.match_name(first_name, last_name, company, threshold, medium_threshold)
+        
+        if not match['best_match']:
+            return None
+        
+        return (
+            match['best_match']['first_name'],
+            match['best_match']['last_name'],
+            match['confidence'],
+            match['best_match']['scores']['composite'],
+            match['best_match']['scores'].get('possible_swap', False)
+        )
+    
+    def _match_outcomes(self, rows, threshold, medium_threshold, batch_size):
+        """
+        Match input rows sequentially in batches with a progress bar.
+        
+        Parameters:
+        -----------
+        rows : list
+            List of (first_name, last_name, company) tuples
+        threshold : float
+            Threshold for considering a match as high confidence
+        medium_threshold : float
+            Threshold for considering a match as medium confidence
+        batch_size : int
+            Size of batches for processing
+            
+        Returns:
+        --------
+        list
+            Outcomes from _match_outcome, in input order
+        """
+        outcomes = []
+        total_batches = (len(rows) - 1) // batch_size + 1
+        
+        for i in range(0, len(rows), batch_size):
+            batch_num = i // batch_size + 1
+            logger.info(f"Processing batch {batch_num}/{total_batches}...")
+            
+            # Process each name in the batch with progress bar
+            for first_name, last_name, company in tqdm(rows[i:i+batch_size], desc=f"Batch {batch_num}/{total_batches}"):
+                outcomes.append(self._match_outcome(first_name, last_name, company, threshold, medium_threshold))
+        
+        return outcomes
+    
+    def correct_names_df(self, df, threshold=0.95, medium_threshold=0.80, batch_size=1000, workers=1, deduplicate=True):
         """
         Correct names in a DataFrame against the distribution list.
         
@@ -1715,6 +5612,12 @@ class EnhancedNameMatcher:
             Threshold for considering a match as medium confidence
         batch_size : int, default=1000
             Size of batches for processing
+        workers : int, default=1
+            Number of worker processes. With more than one worker, batches are matched
+            in a process pool sharing this matcher, and results are reassembled in input order.
+        deduplicate : bool, default=True
+            Match each distinct (first name, last name, company) key once and
+            fan the result out to all rows carrying it
             
         Returns:
         --------
@@ -1723,74 +5626,560 @@ class EnhancedNameMatcher:
         """
         logger.info(f"Processing {len(df)} names...")
         start_time = time.time()
+        profiler = self.profiler
+        if profiler is not None:
+            stage_start = time.perf_counter()
         
         # Create result DataFrame
         result_df = df.copy()
         
-        # Add columns for corrected names and match information
-        result_df['corrected_first_name'] = None
-        result_df['corrected_last_name'] = None
-        result_df['corrected_company'] = None
-        result_df['match_confidence'] = None
-        result_df['composite_score'] = None
-        result_df['possible_name_swap'] = None
+        rows = [
+            (
+                first_name if pd.notna(first_name) else "",
+                last_name if pd.notna(last_name) else "",
+                company if pd.notna(company) else ""
+            )
+            for first_name, last_name, company in zip(df['first_name'], df['last_name'], df['company'])
+        ]
         
-        # Process in batches to avoid memory issues
-        total_batches = (len(df) - 1) // batch_size + 1
+        # Rows with an empty company keep their original values and are not matched
+        has_company = [bool(company) and str(company).strip() != "" for _, _, company in rows]
         
-        for i in range(0, len(df), batch_size):
-            batch_num = i // batch_size + 1
-            logger.info(f"Processing batch {batch_num}/{total_batches}...")
-            batch_df = df.iloc[i:i+batch_size]
-            
-            # Process each name in the batch with progress bar
-            for idx, row in tqdm(batch_df.iterrows(), total=len(batch_df), desc=f"Batch {batch_num}/{total_batches}"):
-                first_name = row['first_name'] if pd.notna(row['first_name']) else ""
-                last_name = row['last_name'] if pd.notna(row['last_name']) else ""
-                company = row['company'] if pd.notna(row['company']) else ""
-                
-                # Check if company is empty
-                if not company or str(company).strip() == "":
-                    # For empty company, preserve original values
-                    result_df.at[idx, 'corrected_first_name'] = first_name
-                    result_df.at[idx, 'corrected_last_name'] = last_name
-                    result_df.at[idx, 'corrected_company'] = company
-                    result_df.at[idx, 'match_confidence'] = 'no_match'
-                    result_df.at[idx, 'composite_score'] = 0.0
-                    result_df.at[idx, 'possible_name_swap'] = False
-                    continue
-                
-                match = self.match_name(first_name, last_name, company, threshold, medium_threshold)
-                
-                if match['best_match']:
-                    result_df.at[idx, 'corrected_first_name'] = match['best_match']['first_name']
-                    result_df.at[idx, 'corrected_last_name'] = match['best_match']['last_name']
-                    result_df.at[idx, 'corrected_company'] = self._standardize_company(company) #keep original company
-                    result_df.at[idx, 'match_confidence'] = match['confidence']
-                    result_df.at[idx, 'composite_score'] = match['best_match']['scores']['composite']
-                    result_df.at[idx, 'possible_name_swap'] = match['best_match']['scores'].get('possible_swap', False)
-                else:
-                    # For no match, keep original values
-                    result_df.at[idx, 'corrected_first_name'] = first_name
-                    result_df.at[idx, 'corrected_last_name'] = last_name
-                    result_df.at[idx, 'corrected_company'] = company
-                    result_df.at[idx, 'match_confidence'] = 'no_match'
-                    result_df.at[idx, 'composite_score'] = 0.0
-                    result_df.at[idx, 'possible_name_swap'] = False
+        # Group rows to match by their deduplication key
+        row_match_ids = [None] * len(rows)
+        rows_to_match = []
+        match_ids = {}
+        for i, row in enumerate(rows):
+            if not has_company[i]:
+                continue
+            if deduplicate:
+                key = self._match_key(*row)
+                if key not in match_ids:
+                    match_ids[key] = len(rows_to_match)
+                    rows_to_match.append(row)
+                row_match_ids[i] = match_ids[key]
+            else:
+                row_match_ids[i] = len(rows_to_match)
+                rows_to_match.append(row)
+        
+        matched_rows = sum(has_company)
+        self.last_run_stats = {
+            'total_records': len(rows),
+            'matched_records': matched_rows,
+            'distinct_match_keys': len(rows_to_match),
+            'dedup_ratio': 1 - len(rows_to_match) / matched_rows if matched_rows else 0.0
+        }
+        logger.info(
+            f"Distinct match keys: {len(rows_to_match)} of {matched_rows} rows with a company "
+            f"(dedup ratio {self.last_run_stats['dedup_ratio']:.1%})"
+        )
+        
+        if profiler is not None:
+            stage_start = profiler.lap('deduplication', stage_start)
+        
+        pruning_stats_before = dict(self.pruning_stats)
+        if workers > 1 and len(rows_to_match) > 1:
+            outcomes = self._match_outcomes_parallel(rows_to_match, threshold, medium_threshold, batch_size, workers)
+        else:
+            outcomes = self._match_outcomes(rows_to_match, threshold, medium_threshold, batch_size)
+        self.last_run_stats['scored_candidates'] = self.pruning_stats['scored'] - pruning_stats_before['scored']
+        self.last_run_stats['pruned_candidates'] = self.pruning_stats['pruned'] - pruning_stats_before['pruned']
+        if profiler is not None:
+            stage_start = profiler.lap('matching', stage_start)
+        
+        # Fan match outcomes back out to all rows
+        results = []
+        for (first_name, last_name, company), match_id in zip(rows, row_match_ids):
+            outcome = outcomes[match_id] if match_id is not None else None
+            if outcome is None:
+                # For empty company or no match, keep original values
+                results.append((first_name, last_name, company, 'no_match', 0.0, False))
+            else:
+                match_first_name, match_last_name, confidence, composite_score, possible_swap = outcome
+                results.append((
+                    match_first_name,
+                    match_last_name,
+                    self._standardize_company(company), #keep original company
+                    confidence,
+                    composite_score,
+                    possible_swap
+                ))
+        
+        if profiler is not None:
+            stage_start = profiler.lap('fan_out', stage_start)
+        
+        # Add columns for corrected names and match information
+        output_columns = [
+            'corrected_first_name', 'corrected_last_name', 'corrected_company',
+            'match_confidence', 'composite_score', 'possible_name_swap'
+        ]
+        for column, values in zip(output_columns, zip(*results) if results else [[]] * len(output_columns)):
+            result_df[column] = pd.Series(list(values), index=result_df.index, dtype=object)
+        if profiler is not None:
+            profiler.lap('dataframe_writes', stage_start)
 
         processing_time = time.time() - start_time
         logger.info(f"Processing completed in {processing_time:.2f} seconds")
         logger.info(f"Average time per record: {(processing_time / len(df)) * 1000:.2f} ms")
         
         return result_df
-def main():
-    """Main function with hardcoded parameters."""
+    
+    def _match_outcomes_parallel(self, rows, threshold, medium_threshold, batch_size, workers):
+        """
+        Match input rows in the process pool of the enclosing worker_pool block, or in a
+        pool started for this call.
+        
+        Parameters:
+        -----------
+        rows : list
+            List of (first_name, last_name, company) tuples
+        threshold : float
+            Threshold for considering a match as high confidence
+        medium_threshold : float
+            Threshold for considering a match as medium confidence
+        batch_size : int
+            Maximum number of rows per task
+        workers : int
+            Number of worker processes
+            
+        Returns:
+        --------
+        list
+            Outcomes from _match_outcome, in input order
+        """
+        if self._worker_pool is None:
+            with self.worker_pool(workers):
+                return self._match_outcomes_parallel(rows, threshold, medium_threshold, batch_size, workers)
+        
+        # Use several tasks per worker so that uneven batches balance out
+        chunk_size = max(1, min(batch_size, -(-len(rows) // (workers * 4))))
+        chunks = [rows[i:i+chunk_size] for i in range(0, len(rows), chunk_size)]
+        logger.info(f"Processing {len(chunks)} batches with {workers} worker processes...")
+        
+        outcomes = []
+        batch_outcomes = self._worker_pool.map(
+            _match_rows, chunks, repeat(threshold, len(chunks)), repeat(medium_threshold, len(chunks))
+        )
+        for batch_outcome, batch_pruning_stats, batch_profiler, batch_diagnostics in tqdm(
+                batch_outcomes, total=len(chunks), desc="Batches"):
+            outcomes.extend(batch_outcome)
+            for key, count in batch_pruning_stats.items():
+                self.pruning_stats[key] += count
+            if self.profiler is not None and batch_profiler is not None:
+                self.profiler.merge(batch_profiler)
+            if self.blocking_diagnostics is not None and batch_diagnostics is not None:
+                self.blocking_diagnostics.merge(batch_diagnostics)
+        
+        return outcomes
+    
+    @contextlib.contextmanager
+    def worker_pool(self, workers):
+        """
+        Keep one process pool for every parallel correct_names_df call in a with block,
+        instead of starting a pool per call. Does nothing for a single worker.
+        
+        Worker processes share this matcher through fork copy-on-write where the
+        platform supports it, and receive a pickled copy otherwise, so the matcher
+        must not change inside the block.
+        
+        Parameters:
+        -----------
+        workers : int
+            Number of worker processes
+        """
+        global _worker_matcher
+        
+        if workers <= 1 or self._worker_pool is not None:
+            yield
+            return
+        
+        if 'fork' in multiprocessing.get_all_start_methods():
+            mp_context = multiprocessing.get_context('fork')
+            _worker_matcher = self
+            initargs = (None,)
+        else:
+            mp_context = multiprocessing.get_context()
+            initargs = (self,)
+        
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context,
+                                     initializer=_init_worker, initargs=initargs) as executor:
+                self._worker_pool = executor
+                try:
+                    yield
+                finally:
+                    self._worker_pool = None
+        finally:
+            _worker_matcher = None
+    
+    def __getstate__(self):
+        # Process pools cannot be pickled; worker processes do not use one
+        state = self.__dict__.copy()
+        state['_worker_pool'] = None
+        return state
+
+# Matcher used by worker processes of EnhancedNameMatcher.correct_names_df and MatchService
+_worker_matcher = None
+
+def _init_worker(matcher):
+    """Set the matcher of a worker process; None keeps the one inherited through fork."""
+    global _worker_matcher
+    if matcher is not None:
+        _worker_matcher = matcher
+
+def _match_rows(rows, threshold, medium_threshold):
+    """
+    Match a batch of (first_name, last_name, company) rows in a worker process.
+    Returns the outcomes, the batch's pruning statistics, and its profiler and blocking
+    diagnostics (None when disabled).
+    """
+    pruning_stats_before = dict(_worker_matcher.pruning_stats)
+    # Profile each batch separately; the parent merges them
+    if _worker_matcher.profiler is not None:
+        _worker_matcher.profiler = MatchProfiler()
+    if _worker_matcher.blocking_diagnostics is not None:
+        _worker_matcher.blocking_diagnostics = BlockingDiagnostics()
+    outcomes = [
+        _worker_matcher._match_outcome(first_name, last_name, company, threshold, medium_threshold)
+        for first_name, last_name, company in rows
+    ]
+    return outcomes, {
+        key: count - pruning_stats_before[key] for key, count in _worker_matcher.pruning_stats.items()
+    }, _worker_matcher.profiler, _worker_matcher.blocking_diagnostics
+
+def _match_records(records, threshold, medium_threshold, top_n):
+    """
+    Match a batch of (first_name, last_name, company) records in a MatchService worker.
+    Returns the match_name results.
+    """
+    return [
+        _worker_matcher.match_name(first_name, last_name, company, threshold, medium_threshold, top_n)
+        for first_name, last_name, company in records
+    ]
+
+def _json_default(value):
+    """Convert numpy scalars in match results to JSON types."""
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, np.bool_):
+        return bool(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class MatchRequestError(Exception):
+    """A match service request that cannot be processed, with its HTTP status."""
+    
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class MatchService:
+    """
+    A long-running HTTP service that keeps an EnhancedNameMatcher warm.
+    
+    Endpoints (JSON in and out):
+    - GET /health: service status
+    - POST /match: one record {"first_name", "last_name", "company"}; returns the
+      match_name result
+    - POST /match/batch: {"records": [...]}; returns {"results": [...]} in input order
+    
+    Match requests may override "threshold", "medium_threshold" and "top_n". Requests are
+    matched concurrently in a pool of worker processes that share the matcher through fork
+    copy-on-write where the platform supports it; with one worker, matching runs in a
+    background thread of the service process.
+    """
+    
+    # Largest accepted request body, in bytes
+    MAX_BODY_SIZE = 16 * 1024 * 1024
+    
+    def __init__(self, matcher, threshold=0.95, medium_threshold=0.80, top_n=3, workers=1, max_batch_records=10000):
+        """
+        Initialize the service.
+        
+        Parameters:
+        -----------
+        matcher : EnhancedNameMatcher
+            The matcher to serve
+        threshold : float, default=0.95
+            Default threshold for considering a match as high confidence
+        medium_threshold : float, default=0.80
+            Default threshold for considering a match as medium confidence
+        top_n : int, default=3
+            Default number of top candidates to return
+        workers : int, default=1
+            Number of worker processes
+        max_batch_records : int, default=10000
+            Largest number of records accepted by /match/batch
+        """
+        self.matcher = matcher
+        self.threshold = threshold
+        self.medium_threshold = medium_threshold
+        self.top_n = top_n
+        self.workers = max(1, workers)
+        self.max_batch_records = max_batch_records
+        self.executor = None
+        self.requests_served = 0
+    
+    def start(self):
+        """Start the worker pool."""
+        global _worker_matcher
+        _worker_matcher = self.matcher
+        
+        if self.workers == 1:
+            self.executor = ThreadPoolExecutor(max_workers=1)
+        elif 'fork' in multiprocessing.get_all_start_methods():
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('fork'),
+                                                initializer=_init_worker, initargs=(None,))
+        else:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                initargs=(self.matcher,))
+    
+    def close(self):
+        """Shut down the worker pool."""
+        global _worker_matcher
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+        _worker_matcher = None
+    
+    async def serve(self, host='127.0.0.1', port=8765, unix_socket=None):
+        """
+        Serve requests until cancelled.
+        
+        Parameters:
+        -----------
+        host : str, default='127.0.0.1'
+            Address to listen on
+        port : int, default=8765
+            TCP port to listen on
+        unix_socket : str, default=None
+            Path of a Unix socket to listen on instead of host and port
+        """
+        self.start()
+        try:
+            if unix_socket:
+                server = await asyncio.start_unix_server(self.handle_connection, path=unix_socket)
+                logger.info(f"Match service listening on {unix_socket}")
+            else:
+                server = await asyncio.start_server(self.handle_connection, host, port)
+                logger.info(f"Match service listening on http://{host}:{port}")
+            
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+    
+    async def handle_connection(self, reader, writer):
+        """Serve the HTTP/1.1 requests of one client connection."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                    headers = {}
+                    while True:
+                        line = await reader.readline()
+                        if line in (b'\r\n', b'\n', b''):
+                            break
+                        name, _, value = line.decode('latin-1').partition(':')
+                        headers[name.strip().lower()] = value.strip()
+                    content_length = int(headers.get('content-length', 0))
+                    if content_length < 0:
+                        raise ValueError(f"Negative Content-Length {content_length}")
+                except ValueError:
+                    # The rest of the stream cannot be parsed either, so close the connection
+                    method = None
+                    keep_alive = False
+                    status, payload = HTTPStatus.BAD_REQUEST, {'error': "Malformed HTTP request"}
+                
+                if method is not None:
+                    connection = headers.get('connection', '').lower()
+                    keep_alive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+                    try:
+                        if 'transfer-encoding' in headers:
+                            # The body's length is unknown, so the connection cannot be reused
+                            keep_alive = False
+                            raise MatchRequestError(
+                                HTTPStatus.NOT_IMPLEMENTED, "Transfer-Encoding is not supported; send a Content-Length"
+                            )
+                        if content_length > self.MAX_BODY_SIZE:
+                            keep_alive = False
+                            raise MatchRequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+                        body = await reader.readexactly(content_length) if content_length > 0 else b''
+                        status, payload = await self.dispatch(method, urlsplit(target).path, body)
+                    except MatchRequestError as e:
+                        status, payload = e.status, {'error': str(e)}
+                    except Exception as e:
+                        logger.exception("Error serving match request")
+                        status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)}
+                
+                self.requests_served += 1
+                body = json.dumps(payload, default=_json_default).encode('utf-8')
+                writer.write(
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+    
+    async def dispatch(self, method, path, body):
+        """
+        Route a request to its endpoint.
+        
+        Parameters:
+        -----------
+        method : str
+            HTTP method
+        path : str
+            Request path
+        body : bytes
+            Request body
+            
+        Returns:
+        --------
+        tuple
+            (HTTPStatus, JSON-serializable payload)
+        """
+        routes = {
+            '/health': ('GET', self.health),
+            '/match': ('POST', self.match),
+            '/match/batch': ('POST', self.match_batch)
+        }
+        if path not in routes:
+            raise MatchRequestError(HTTPStatus.NOT_FOUND, f"Unknown path {path}")
+        
+        allowed_method, handler = routes[path]
+        if method != allowed_method:
+            raise MatchRequestError(HTTPStatus.METHOD_NOT_ALLOWED, f"{path} only accepts {allowed_method}")
+        
+        if allowed_method == 'GET':
+            return HTTPStatus.OK, await handler()
+        
+        try:
+            payload = json.loads(body or b'{}')
+        except json.JSONDecodeError as e:
+            raise MatchRequestError(HTTPStatus.BAD_REQUEST, f"Invalid JSON: {str(e)}")
+        if not isinstance(payload, dict):
+            raise MatchRequestError(HTTPStatus.BAD_REQUEST, "Request body must be a JSON object")
+        return HTTPStatus.OK, await handler(payload)
+    
+    async def health(self):
+        """Report service status."""
+        return {
+            'status': 'ok',
+            'records': len(self.matcher.reference_store) - len(self.matcher.deleted_records),
+            'cache_key': self.matcher.cache_key,
+            'workers': self.workers,
+            'requests_served': self.requests_served
+        }
+    
+    def _match_parameters(self, payload):
+        """
+        Get threshold, medium_threshold and top_n from a request, with the service defaults.
+        Thresholds must be numbers in [0, 1] and top_n an integer of at least 1.
+        """
+        threshold = payload.get('threshold', self.threshold)
+        medium_threshold = payload.get('medium_threshold', self.medium_threshold)
+        top_n = payload.get('top_n', self.top_n)
+        
+        for name, value in (('threshold', threshold), ('medium_threshold', medium_threshold)):
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value <= 1:
+                raise MatchRequestError(HTTPStatus.BAD_REQUEST, f"'{name}' must be a number between 0 and 1")
+        if isinstance(top_n, bool) or not isinstance(top_n, int) or top_n < 1:
+            raise MatchRequestError(HTTPStatus.BAD_REQUEST, "'top_n' must be an integer of at least 1")
+        return float(threshold), float(medium_threshold), top_n
+    
+    @staticmethod
+    def _record(payload):
+        """Get the (first_name, last_name, company) of a request record."""
+        if not isinstance(payload, dict):
+            raise MatchRequestError(HTTPStatus.BAD_REQUEST, "Each record must be a JSON object")
+        for field in ('first_name', 'last_name'):
+            if not isinstance(payload.get(field), str):
+                raise MatchRequestError(HTTPStatus.BAD_REQUEST, f"Record field '{field}' must be a string")
+        company = payload.get('company')
+        if company is not None and not isinstance(company, str):
+            raise MatchRequestError(HTTPStatus.BAD_REQUEST, "Record field 'company' must be a string")
+        return payload['first_name'], payload['last_name'], company
+    
+    async def _run(self, records, parameters):
+        """Match records in the worker pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, _match_records, records, *parameters)
+    
+    async def match(self, payload):
+        """Match one record."""
+        results = await self._run([self._record(payload)], self._match_parameters(payload))
+        return results[0]
+    
+    async def match_batch(self, payload):
+        """Match a batch of records, split across the worker pool."""
+        records = payload.get('records')
+        if not isinstance(records, list):
+            raise MatchRequestError(HTTPStatus.BAD_REQUEST, "'records' must be a list")
+        if len(records) > self.max_batch_records:
+            raise MatchRequestError(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"At most {self.max_batch_records} records per batch"
+            )
+        records = [self._record(record) for record in records]
+        parameters = self._match_parameters(payload)
+        
+        chunk_size = max(1, -(-len(records) // self.workers))
+        chunk_results = await asyncio.gather(*(
+            self._run(records[i:i+chunk_size], parameters) for i in range(0, len(records), chunk_size)
+        ))
+        return {'results': [result for results in chunk_results for result in results]}
+
+def parse_args(argv=None):
+    """Parse command line arguments; the defaults reproduce the standard correction run."""
+    parser = argparse.ArgumentParser(description="Correct wholesaler agent names against a standard distribution list")
+    parser.add_argument('--dist-list', default="Agents_Gold_Source_Unique-v1.xlsx", help="Distribution list file")
+    parser.add_argument('--input', default="EDL-Wholesaler Gifts and Entertainment-100.xlsx", help="File of names to correct")
+    parser.add_argument('--output', default="EDL-Wholesaler Gifts and Entertainment-100-model correction-v3.2.xlsx",
+                        help="File to write corrected names to")
+    parser.add_argument('--cache-dir', default="./name_correction_cache", help="Directory of cached indices")
+    parser.add_argument('--batch-size', type=int, default=5000, help="Records per batch")
+    parser.add_argument('--threshold', type=float, default=0.95, help="High confidence threshold")
+    parser.add_argument('--medium-threshold', type=float, default=0.80, help="Medium confidence threshold")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes for matching")
+    parser.add_argument('--backend', choices=EnhancedNameMatcher.BACKENDS, default='memory',
+                        help="Keep the reference records and indices in memory or in a SQLite database")
+    parser.add_argument('--hot-set-size', type=int, default=100000,
+                        help="Records and posting lists the sqlite backend keeps in memory")
+    parser.add_argument('--no-profiling', action='store_true',
+                        help="Disable stage timers and counters and the JSON profile report")
+    parser.add_argument('--profile-report', help="Path of the JSON profile report (default: next to the output file)")
+    parser.add_argument('--blocking-diagnostics', action='store_true',
+                        help="Add blocking tier and candidate set size histograms to the profile report")
+    parser.add_argument('--serve', action='store_true',
+                        help="Run a matching service over HTTP instead of correcting a file")
+    parser.add_argument('--host', default='127.0.0.1', help="Address the matching service listens on")
+    parser.add_argument('--port', type=int, default=8765, help="Port the matching service listens on")
+    parser.add_argument('--unix-socket', help="Unix socket the matching service listens on instead of host and port")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main function; parameters default to the standard correction run."""
+    args = parse_args(argv)
+    
     print("\n===== Enhanced Name Correction System =====\n")
     print("This program corrects wholesaler agent names using a standard distribution list.")
     
     # Get distribution list information
     print("=== Distribution List (Reference List) ===")
-    dist_list_path = "Agents_Gold_Source_Unique-v1.xlsx"
+    dist_list_path = args.dist_list
     dist_first_name_col = "first_name"
     dist_last_name_col = "last_name"
     dist_company_col = "Company"
@@ -1798,26 +6187,33 @@ def main():
     # Get wholesaler agent list information
     print("\n=== Wholesaler Agent List (Names to Correct) ===")
     # input_path = "EDL-Wholesaler Gifts and Entertainment-1-1-25-3-18-25.xlsx"
-    input_path = "EDL-Wholesaler Gifts and Entertainment-100.xlsx"
+    input_path = args.input
     input_first_name_col = "Attendee First Name"
     input_last_name_col = "Attendee Last Name"
     input_company_col = "Company"
     
     # Get output file path
     # output_path = "EDL-Wholesaler Gifts and Entertainment-1-1-25-3-18-25-model correction-v3.2.xlsx"
-    output_path = "EDL-Wholesaler Gifts and Entertainment-100-model correction-v3.2.xlsx"
+    output_path = args.output
     
-    batch_size = 5000
-    threshold = 0.95
-    medium_threshold = 0.80
-    cache_dir = "./name_correction_cache"
+    batch_size = args.batch_size
+    threshold = args.threshold
+    medium_threshold = args.medium_threshold
+    cache_dir = args.cache_dir
+    workers = args.workers
     
     # Create configuration
     config = {
         'cache_dir': cache_dir,
         'batch_size': batch_size,
         'threshold': threshold,
-        'medium_threshold': medium_threshold
+        'medium_threshold': medium_threshold,
+        'workers': workers,
+        'backend': args.backend,
+        'hot_set_size': args.hot_set_size,
+        'profiling': not args.no_profiling,
+        'profile_report_path': args.profile_report,
+        'blocking_diagnostics': args.blocking_diagnostics
     }
     
     # Initialize system
@@ -1831,6 +6227,13 @@ def main():
         print("Error: Failed to preprocess distribution list. Check the log file for details.")
         return 1
     
+    # Serve match requests with the warm matcher until interrupted
+    if args.serve:
+        service = MatchService(system.matcher, threshold, medium_threshold, workers=workers)
+        print(f"\nServing match requests on {args.unix_socket or f'http://{args.host}:{args.port}'} (Ctrl+C to stop)")
+        asyncio.run(service.serve(args.host, args.port, args.unix_socket))
+        return 0
+    
     # Correct names
     print(f"\nCorrecting names from: {input_path}")
     print(f"This may take some time depending on the size of your files...")
@@ -0,0 +1,36 @@
+"""
+Shared fixtures: the enhanced script loaded as a module and small synthetic distribution lists.
+Run from the repository root with: python -m pytest -q tests
+"""
+
+import logging
+
+import pytest
+
+from benchmarks import load_enhanced_module
+from benchmarks.synthetic import generate_gold_source, generate_noisy_input
+
+
+@pytest.fixture(scope='session')
+def enhanced():
+    """The name_correction_simplified-v3.2.py module, with per-batch logging silenced."""
+    module = load_enhanced_module()
+    module.logger.setLevel(logging.WARNING)
+    return module
+
+
+@pytest.fixture(scope='session')
+def gold_df(enhanced):
+    """A synthetic distribution list with the matcher's column names."""
+    return generate_gold_source(3000, enhanced.NICKNAME_MAP, enhanced.COMPANY_MAP, seed=7).rename(
+        columns={'Company': 'company'}
+    )
+
+
+@pytest.fixture(scope='session')
+def input_rows(enhanced, gold_df):
+    """Noisy (first_name, last_name, company) rows drawn from gold_df."""
+    input_df = generate_noisy_input(
+        gold_df.rename(columns={'company': 'Company'}), 400, enhanced.NICKNAME_MAP, enhanced.COMPANY_MAP, seed=8
+    )
+    return list(zip(input_df['Attendee First Name'], input_df['Attendee Last Name'], input_df['Company']))
@@ -0,0 +1,16 @@
+"""correct_names_df gives the same result in a process pool as in a single process."""
+
+import pandas as pd
+
+COLUMNS = ['first_name', 'last_name', 'company']
+
+
+def test_parallel_matching_matches_single_process(enhanced, gold_df, input_rows):
+    matcher = enhanced.EnhancedNameMatcher(gold_df.copy())
+    rows = input_rows[:60] + input_rows[:5] + [('Jane', 'Doe', '')]
+    df = pd.DataFrame(rows, columns=COLUMNS)
+
+    single = matcher.correct_names_df(df, workers=1, batch_size=16)
+    parallel = matcher.correct_names_df(df, workers=2, batch_size=16)
+
+    pd.testing.assert_frame_equal(parallel, single)
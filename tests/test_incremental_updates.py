@@ -0,0 +1,92 @@
+"""Incremental index updates and their cache entries give the same matcher as a fresh build."""
+
+import os
+
+import pandas as pd
+import pytest
+
+COLUMNS = ['first_name', 'last_name', 'company']
+
+
+def index_contents(matcher):
+    """The non-empty postings of every index, keyed by index name and key."""
+    contents = {}
+    for name in matcher.BLOCKING_INDEX_NAMES + matcher.EXACT_LOOKUP_NAMES:
+        contents[name] = {key: postings.tolist() for key, postings in getattr(matcher, name).items() if len(postings)}
+    for name in matcher.NGRAM_INDEX_NAMES:
+        index = getattr(matcher, name)
+        contents[name] = {key: postings.tolist() for key, postings in index.values.items() if len(postings)}
+        contents[f"{name}.grams"] = {
+            gram: sorted(index.values.keys[slot] for slot in postings.tolist())
+            for gram, postings in index.grams.items() if len(postings)
+        }
+    return contents
+
+
+def assert_same_matcher(matcher, fresh, input_rows):
+    pd.testing.assert_frame_equal(
+        matcher.dist_list_df.reset_index(drop=True), fresh.dist_list_df, check_dtype=False
+    )
+    assert matcher.deleted_records == set()
+    assert index_contents(matcher) == index_contents(fresh)
+    assert matcher.last_name_index == fresh.last_name_index
+    for first_name, last_name, company in input_rows:
+        assert matcher.match_name(first_name, last_name, company) == fresh.match_name(first_name, last_name, company)
+
+
+@pytest.mark.parametrize('max_delta_fraction', [0.1, 0.0])
+def test_updates_reload_from_cache_like_a_fresh_build(enhanced, gold_df, input_rows, tmp_path, max_delta_fraction):
+    cache_dir = str(tmp_path)
+    matcher = enhanced.EnhancedNameMatcher(gold_df.iloc[:2500].copy(), cache_dir=cache_dir, max_cache_entries=1)
+    matcher.MAX_CACHED_DELTA_FRACTION = max_delta_fraction
+    base_cache_key = matcher.cache_key
+    
+    matcher.add_records(gold_df.iloc[2500:2600])
+    matcher.update_records([3, 10, 2550], gold_df.iloc[2600:2603])
+    matcher.delete_records([5, 2501])
+    
+    # The next version drops some live records and brings new ones
+    live_df = matcher.dist_list_df.drop(index=list(matcher.deleted_records))[COLUMNS]
+    new_df = pd.concat([live_df.drop(index=[0, 7, 2520]), gold_df.iloc[2700:2800][COLUMNS]]).reset_index(drop=True)
+    changes = matcher.apply_distribution_list(new_df)
+    assert changes == {'added': 100, 'deleted': 3, 'unchanged': len(live_df) - 3}
+    
+    cache_file = enhanced.EnhancedNameMatcher._cache_file_path(cache_dir, matcher.cache_key)
+    assert os.path.exists(os.path.join(cache_file, 'base_cache_key')) == (max_delta_fraction > 0)
+    
+    # A delta entry keeps its base entry from being evicted
+    base_cache_file = enhanced.EnhancedNameMatcher._cache_file_path(cache_dir, base_cache_key)
+    assert os.path.isdir(base_cache_file) == (max_delta_fraction > 0)
+    
+    matcher.compact()
+    reloaded = enhanced.EnhancedNameMatcher.from_cache(cache_dir, matcher.cache_key)
+    assert reloaded is not None
+    reloaded.compact()
+    
+    fresh = enhanced.EnhancedNameMatcher(matcher.dist_list_df[COLUMNS].copy())
+    assert sorted(map(tuple, fresh.dist_list_df[COLUMNS].values)) == sorted(map(tuple, new_df.values))
+    assert_same_matcher(matcher, fresh, input_rows[:100])
+    assert_same_matcher(reloaded, fresh, input_rows[:100])
+
+
+def test_chained_updates_are_saved_against_the_same_base(enhanced, gold_df, input_rows, tmp_path):
+    cache_dir = str(tmp_path)
+    base = enhanced.EnhancedNameMatcher(gold_df.iloc[:2500].copy(), cache_dir=cache_dir)
+    
+    versions = [
+        pd.concat([gold_df.iloc[10:2500], gold_df.iloc[2500:2550]]),
+        pd.concat([gold_df.iloc[20:2500], gold_df.iloc[2500:2540], gold_df.iloc[2600:2650]])
+    ]
+    cache_key = base.cache_key
+    for version_df in versions:
+        matcher = enhanced.EnhancedNameMatcher.from_cache(cache_dir, cache_key)
+        matcher.apply_distribution_list(version_df[COLUMNS])
+        cache_key = matcher.cache_key
+        with open(os.path.join(enhanced.EnhancedNameMatcher._cache_file_path(cache_dir, cache_key), 'base_cache_key')) as f:
+            assert f.read() == base.cache_key
+    
+    reloaded = enhanced.EnhancedNameMatcher.from_cache(cache_dir, cache_key)
+    reloaded.compact()
+    fresh = enhanced.EnhancedNameMatcher(reloaded.dist_list_df[COLUMNS].copy())
+    assert sorted(map(tuple, fresh.dist_list_df[COLUMNS].values)) == sorted(map(tuple, versions[-1][COLUMNS].values))
+    assert_same_matcher(reloaded, fresh, input_rows[:100])
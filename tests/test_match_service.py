@@ -0,0 +1,146 @@
+"""Request and error paths of MatchService, served on a Unix socket."""
+
+import asyncio
+import http.client
+import json
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """An HTTP connection over a Unix socket."""
+
+    def __init__(self, path):
+        super().__init__('localhost', timeout=30)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.path)
+
+
+@pytest.fixture(scope='module')
+def service(enhanced, gold_df, tmp_path_factory):
+    """A MatchService with one worker and a small batch limit, running in a background thread."""
+    matcher = enhanced.EnhancedNameMatcher(gold_df.copy())
+    match_service = enhanced.MatchService(matcher, max_batch_records=20)
+    match_service.MAX_BODY_SIZE = 64 * 1024
+    path = str(tmp_path_factory.mktemp('service') / 'match.sock')
+
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(match_service.serve(unix_socket=path))
+    thread = threading.Thread(target=lambda: loop.run_until_complete(asyncio.gather(task, return_exceptions=True)))
+    thread.start()
+    for _ in range(500):
+        if os.path.exists(path):
+            break
+        time.sleep(0.01)
+
+    yield match_service, path
+
+    loop.call_soon_threadsafe(task.cancel)
+    thread.join(timeout=30)
+    loop.close()
+
+
+def request(path, method, target, body=None, headers=None):
+    """Send one request and get the status and decoded JSON payload."""
+    connection = UnixHTTPConnection(path)
+    try:
+        if body is not None and not isinstance(body, bytes):
+            body = json.dumps(body).encode('utf-8')
+        connection.request(method, target, body=body, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def test_health(service):
+    match_service, path = service
+    status, payload = request(path, 'GET', '/health')
+    assert status == 200
+    assert payload['status'] == 'ok'
+    assert payload['records'] == len(match_service.matcher.reference_store)
+
+
+def test_match_returns_match_name_result(enhanced, service, input_rows):
+    match_service, path = service
+    first_name, last_name, company = input_rows[0]
+    status, payload = request(path, 'POST', '/match', {
+        'first_name': first_name, 'last_name': last_name, 'company': company
+    })
+    assert status == 200
+    result = match_service.matcher.match_name(first_name, last_name, company)
+    expected = json.loads(json.dumps(result, default=enhanced._json_default))
+    assert payload == expected
+
+
+def test_batch_results_keep_input_order(service, input_rows):
+    _, path = service
+    records = [
+        {'first_name': first_name, 'last_name': last_name, 'company': company}
+        for first_name, last_name, company in input_rows[:20]
+    ]
+    status, payload = request(path, 'POST', '/match/batch', {'records': records, 'top_n': 1})
+    assert status == 200
+    assert [result['input_first_name'] for result in payload['results']] == [record['first_name'] for record in records]
+    assert [result['input_last_name'] for result in payload['results']] == [record['last_name'] for record in records]
+
+
+@pytest.mark.parametrize('body', [
+    b'{not json',
+    b'[1, 2]',
+    {'first_name': 1, 'last_name': 'Smith', 'company': 'X'},
+    {'first_name': 'Ann', 'last_name': 'Smith', 'company': 'X', 'threshold': 'nan'},
+    {'first_name': 'Ann', 'last_name': 'Smith', 'company': 'X', 'threshold': 1.5},
+    {'first_name': 'Ann', 'last_name': 'Smith', 'company': 'X', 'medium_threshold': -0.1},
+    {'first_name': 'Ann', 'last_name': 'Smith', 'company': 'X', 'top_n': -1},
+    {'first_name': 'Ann', 'last_name': 'Smith', 'company': 'X', 'top_n': 0},
+])
+def test_invalid_requests_are_rejected(service, body):
+    _, path = service
+    status, payload = request(path, 'POST', '/match', body)
+    assert status == 400
+    assert 'error' in payload
+
+
+def test_unknown_path_and_wrong_method(service):
+    _, path = service
+    assert request(path, 'GET', '/nowhere')[0] == 404
+    assert request(path, 'GET', '/match')[0] == 405
+    assert request(path, 'POST', '/health', {})[0] == 405
+
+
+def test_too_large_requests(service):
+    match_service, path = service
+    records = [{'first_name': 'Ann', 'last_name': 'Smith', 'company': 'X'}] * (match_service.max_batch_records + 1)
+    assert request(path, 'POST', '/match/batch', {'records': records})[0] == 413
+    assert request(path, 'POST', '/match', b' ' * (match_service.MAX_BODY_SIZE + 1))[0] == 413
+
+
+def test_chunked_requests_are_rejected(service):
+    _, path = service
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(30)
+        sock.connect(path)
+        # A second request follows the chunked body on the same connection
+        sock.sendall(
+            b"POST /match HTTP/1.1\r\nHost: localhost\r\nTransfer-Encoding: chunked\r\n\r\n"
+            b"5\r\nhello\r\n0\r\n\r\n"
+            b"GET /health HTTP/1.1\r\nHost: localhost\r\n\r\n"
+        )
+        response = b''
+        while True:
+            data = sock.recv(65536)
+            if not data:
+                break
+            response += data
+    assert response.startswith(b'HTTP/1.1 501 ')
+    # The connection is closed after the rejection instead of parsing the chunks as a request
+    assert response.count(b'HTTP/1.1 ') == 1
+    assert b'Connection: close' in response
@@ -0,0 +1,33 @@
+"""Cascade scoring with candidate pruning gives the same matches as scoring every candidate."""
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture(scope='module')
+def matcher(enhanced, gold_df):
+    return enhanced.EnhancedNameMatcher(gold_df.copy())
+
+
+def score_all_candidates(matcher):
+    """A _score_candidates replacement that computes exact scores for every candidate."""
+    def score_candidates(query, candidate_indices, top_n, min_score):
+        bound_scores = matcher._calculate_score_bounds(query, candidate_indices)
+        return matcher._complete_similarity_scores(query, bound_scores, np.arange(len(candidate_indices)))
+    return score_candidates
+
+
+@pytest.mark.parametrize('threshold, medium_threshold', [(0.95, 0.80), (0.3, 0.95), (0.5, 0.99)])
+def test_pruned_scoring_matches_full_scoring(matcher, input_rows, monkeypatch, threshold, medium_threshold):
+    pruned = [
+        matcher.match_name(first_name, last_name, company, threshold, medium_threshold)
+        for first_name, last_name, company in input_rows
+    ]
+    assert matcher.pruning_stats['pruned'] > 0
+
+    monkeypatch.setattr(matcher, '_score_candidates', score_all_candidates(matcher))
+    full = [
+        matcher.match_name(first_name, last_name, company, threshold, medium_threshold)
+        for first_name, last_name, company in input_rows
+    ]
+    assert pruned == full
@@ -0,0 +1,40 @@
+"""The sqlite backend built from a distribution list file one chunk at a time."""
+
+import glob
+import os
+
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def dist_list_path(gold_df, tmp_path):
+    """The gold distribution list as a CSV file with the source column names."""
+    path = str(tmp_path / 'dist_list.csv')
+    gold_df.rename(columns={'first_name': 'First Name', 'last_name': 'Last Name', 'company': 'Firm'}).to_csv(path, index=False)
+    return path
+
+
+def test_streamed_database_matches_memory_backend(enhanced, dist_list_path, input_rows, tmp_path, monkeypatch):
+    monkeypatch.setattr(enhanced, 'SQLITE_BUILD_CHUNK_SIZE', 700)
+    system = enhanced.EnhancedNameCorrectionSystem({'cache_dir': str(tmp_path / 'cache'), 'backend': 'sqlite'})
+    assert system.preprocess_distribution_list(dist_list_path, 'First Name', 'Last Name', 'Firm')
+    matcher = system.matcher
+    assert isinstance(matcher.reference_store, enhanced.SQLiteReferenceStore)
+    
+    memory = enhanced.EnhancedNameMatcher(
+        pd.read_csv(dist_list_path).rename(columns={'First Name': 'first_name', 'Last Name': 'last_name', 'Firm': 'company'})
+    )
+    assert len(matcher.reference_store) == len(memory.reference_store)
+    for first_name, last_name, company in input_rows[:100]:
+        assert matcher.match_name(first_name, last_name, company) == memory.match_name(first_name, last_name, company)
+    
+    with pytest.raises(ValueError, match='read-only'):
+        matcher.add_records(pd.DataFrame({'first_name': ['Ann'], 'last_name': ['Smith'], 'company': ['X']}))
+
+
+def test_missing_column_leaves_no_database(enhanced, dist_list_path, tmp_path):
+    cache_dir = tmp_path / 'cache'
+    system = enhanced.EnhancedNameCorrectionSystem({'cache_dir': str(cache_dir), 'backend': 'sqlite'})
+    assert not system.preprocess_distribution_list(dist_list_path, 'First Name', 'Surname', 'Firm')
+    assert glob.glob(os.path.join(str(cache_dir), '*')) == []